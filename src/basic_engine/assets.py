@@ -0,0 +1,282 @@
+"""Module for loading images and sounds in the background."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import functools
+import os
+import threading
+
+from pygame import image, mixer
+
+from . import utils
+
+
+class AssetHandle:
+    """Handle to an asset that may still be loading."""
+
+    def __init__(self, manager: "AssetManager", key: tuple,
+                 future: concurrent.futures.Future):
+        """Initialises the AssetHandle object.
+
+        Args:
+
+            manager: AssetManager object that loads the asset.
+
+            key: Key of the asset in the manager.
+
+            future: Future object resolving to the loaded asset.
+        """
+
+        self.manager = manager
+        self.key = key
+        self.future = future
+
+    @property
+    def ready(self) -> bool:
+        """Get whether the asset finished loading."""
+
+        return self.future.done()
+
+    def get(self, default=None):
+        """Gets the asset without waiting for it.
+
+        Args:
+
+            default: Value returned while the asset is loading.
+
+        Raises:
+            Exception: Whatever error happened while loading the asset.
+        """
+
+        if not self.future.done():
+            return default
+        return self.manager._finish(self.key, self.future)
+
+    def result(self, timeout: float = None):
+        """Waits for the asset to be loaded and gets it.
+
+        Args:
+
+            timeout: Maximum amount of seconds to wait. None means
+                     forever.
+
+        Raises:
+            TimeoutError: The asset didn't load in time.
+        """
+
+        self.future.result(timeout)
+        return self.manager._finish(self.key, self.future)
+
+
+class AssetManager:
+    """Loads images and sounds on a thread pool and caches them.
+
+    Loading happens in the background, while converting images to the
+    display pixel format happens on the thread that first gets them,
+    which should be the main one. Cached assets are evicted, least
+    recently used first, once their bytes go over a budget. Sounds are
+    decoded once per file and only copied for each volume they're used
+    with.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, workers: int = 4):
+        """Initialises the AssetManager object.
+
+        Args:
+
+            max_bytes: Budget for the bytes of the cached assets.
+
+            workers: Amount of threads loading assets.
+        """
+
+        self.cache = utils.LRUCache(max_bytes, self._nbytes)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            workers, thread_name_prefix="assets"
+        )
+        self._pending: dict[tuple, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _nbytes(asset) -> int:
+        if isinstance(asset, mixer.Sound):
+            return utils.sound_nbytes(asset)
+        return utils.surface_nbytes(asset)
+
+    def _request(self, key: tuple, start) -> AssetHandle:
+        """Gets a handle to an asset, starting to load it unless it's
+        cached or already loading.
+
+        Args:
+
+            key: Key of the asset in the manager.
+
+            start: Callable with no arguments returning a Future object
+                   that resolves to the loaded asset.
+        """
+
+        asset = self.cache.get(key)
+        if asset is not None:
+            future = concurrent.futures.Future()
+            future.set_result(asset)
+            return AssetHandle(self, key, future)
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = start()
+                self._pending[key] = future
+
+        return AssetHandle(self, key, future)
+
+    def _finish(self, key: tuple, future: concurrent.futures.Future):
+        """Caches a loaded asset, preparing it on the first access.
+
+        Handles sharing a future prepare it again if it was evicted
+        meanwhile.
+        """
+
+        asset = future.result()
+        with self._lock:
+            pending = self._pending.get(key) is future
+            if pending:
+                del self._pending[key]
+        if not pending:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if key[0] == "image":
+            asset = utils.convert_surface(asset)
+        elif key[2] != 1.0:
+            # The full volume sound the copy was made from is cached
+            # too, instead of being left pending.
+            decoded_key = key[:2] + (1.0,)
+            with self._lock:
+                decoded = self._pending.get(decoded_key)
+            if decoded is not None and decoded.done():
+                self._finish(decoded_key, decoded)
+
+        self.cache.put(key, asset)
+        return asset
+
+    @staticmethod
+    def _copy_sound(decoded: concurrent.futures.Future,
+                    volume: float) -> concurrent.futures.Future:
+        """Makes a copy of a sound with another volume once it's
+        decoded. The copy is done by whichever thread finishes the
+        decoding, so no loading thread is kept waiting for it.
+
+        Args:
+
+            decoded: Future object resolving to the decoded sound.
+
+            volume: Volume of the copy, from 0 to 1.
+
+        Returns:
+            A Future object resolving to the copy.
+        """
+
+        future = concurrent.futures.Future()
+
+        def copy(decoded):
+            try:
+                sound = mixer.Sound(buffer=decoded.result().get_raw())
+                sound.set_volume(volume)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(sound)
+
+        decoded.add_done_callback(copy)
+        return future
+
+    def request_image(self, path: str) -> AssetHandle:
+        """Starts loading an image in the background.
+
+        Args:
+
+            path: Image location. It can be absolute or relative.
+
+        Returns:
+            An AssetHandle object resolving to the Surface object.
+        """
+
+        return self._request(("image", path), functools.partial(
+            self._executor.submit, image.load, os.path.join(path)
+        ))
+
+    def request_sound(self, path: str, volume: float = 1.0) -> AssetHandle:
+        """Starts loading a sound in the background.
+
+        Args:
+
+            path: Sound location. It can be absolute or relative.
+
+            volume: Volume of the sound, from 0 to 1.
+
+        Returns:
+            An AssetHandle object resolving to the mixer.Sound object.
+        """
+
+        if volume == 1.0:
+            return self._request(("sound", path, 1.0), functools.partial(
+                self._executor.submit, mixer.Sound, os.path.join(path)
+            ))
+
+        # Volume variants are made from the decoded samples of the
+        # full volume sound.
+        decoded = self.request_sound(path)
+        return self._request(("sound", path, volume), functools.partial(
+            self._copy_sound, decoded.future, volume
+        ))
+
+    def load_image(self, path: str):
+        """Loads an image, waiting for it if needed."""
+
+        return self.request_image(path).result()
+
+    def load_sound(self, path: str, volume: float = 1.0):
+        """Loads a sound, waiting for it if needed."""
+
+        return self.request_sound(path, volume).result()
+
+    def preload(self, *paths: str) -> list[AssetHandle]:
+        """Starts loading the given images and sounds. Sounds are told
+        apart by their file extension.
+
+        Returns:
+            A list with an AssetHandle object for each path.
+        """
+
+        handles = []
+        for path in paths:
+            if os.path.splitext(path)[1].lower() in (".wav", ".ogg", ".mp3",
+                                                     ".flac"):
+                handles.append(self.request_sound(path))
+            else:
+                handles.append(self.request_image(path))
+        return handles
+
+    def evict(self, path: str) -> None:
+        """Drops every cached asset loaded from a path."""
+
+        for key in [key for key in self.cache.keys() if key[1] == path]:
+            self.cache.pop(key)
+
+    def stats(self) -> dict:
+        """Gets the memory usage and hit rate of the cache, along with
+        the amount of assets still loading.
+        """
+
+        return self.cache.stats() | {"pending": len(self._pending)}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the loading threads.
+
+        Args:
+
+            wait: Whether to wait for the assets being loaded.
+        """
+
+        self._executor.shutdown(wait)
@@ -0,0 +1,445 @@
+"""Module for packing many small surfaces into a few texture atlases.
+
+Every packed surface is given back as a subsurface of an atlas page,
+which can be used anywhere a Surface is accepted, e.g. as a Button
+image or a Particle image. Atlases can be built offline and cached on
+disk, either from code or from the command line:
+
+    python -m basic_engine.atlas DIRECTORY OUTPUT [--page-size N]
+                                 [--padding N]
+
+Where every image under DIRECTORY is packed and OUTPUT is the path of
+the JSON index written next to the PNG pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+from pygame import constants, image, rect as pg_rect, surface
+
+from . import utils
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga")
+
+
+class SkylinePacker:
+    """Packs rects into a fixed size area using the skyline
+    bottom-left heuristic.
+
+    The top edge of the packed rects is kept as a list of horizontal
+    segments, and each new rect is placed where its bottom, then its
+    left, is lowest.
+    """
+
+    def __init__(self, width: int, height: int):
+        """Initialises the SkylinePacker object.
+
+        Args:
+
+            width: Width of the area, in pixels.
+
+            height: Height of the area, in pixels.
+        """
+
+        self.width = width
+        self.height = height
+        # [x, y, width] segments, sorted by x, covering the whole width.
+        self.skyline = [[0, 0, width]]
+        self.used_area = 0
+
+    @property
+    def occupancy(self) -> float:
+        """Get the fraction of the area taken by packed rects."""
+
+        return self.used_area / (self.width * self.height)
+
+    def _fit(self, index, width, height):
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+
+        y = 0
+        remaining = width
+        while remaining > 0:
+            _, segment_y, segment_width = self.skyline[index]
+            y = max(y, segment_y)
+            if y + height > self.height:
+                return None
+            remaining -= segment_width
+            index += 1
+
+        return y
+
+    def insert(self, width: int, height: int):
+        """Finds room for a rect.
+
+        Args:
+
+            width: Width of the rect, in pixels.
+
+            height: Height of the rect, in pixels.
+
+        Returns:
+            The (x, y) position given to the rect, or None if it
+            doesn't fit anymore.
+        """
+
+        best = None
+        for index, (x, _, _) in enumerate(self.skyline):
+            y = self._fit(index, width, height)
+            if y is not None and (best is None
+                                  or (y + height, x) < best[0]):
+                best = ((y + height, x), index, y)
+
+        if best is None:
+            return None
+
+        _, index, y = best
+        x = self.skyline[index][0]
+        self._add_segment(index, x, y + height, width)
+        self.used_area += width * height
+        return x, y
+
+    def _add_segment(self, index, x, y, width):
+        skyline = self.skyline
+        skyline.insert(index, [x, y, width])
+
+        # Shrink or drop the segments now hidden under the new one.
+        right = x + width
+        index += 1
+        while index < len(skyline) and skyline[index][0] < right:
+            segment = skyline[index]
+            hidden = right - segment[0]
+            if hidden >= segment[2]:
+                del skyline[index]
+                continue
+            segment[0] += hidden
+            segment[2] -= hidden
+            break
+
+        # Merge neighbouring segments at the same height.
+        index = 0
+        while index < len(skyline) - 1:
+            if skyline[index][1] == skyline[index + 1][1]:
+                skyline[index][2] += skyline.pop(index + 1)[2]
+            else:
+                index += 1
+
+
+class TextureAtlas:
+    """Collection of named surfaces packed into atlas pages.
+
+    Surfaces are added with add and packed by build, biggest first.
+    After building, indexing the atlas with a name gives a subsurface
+    of the page where that surface was packed.
+    """
+
+    def __init__(self, page_size: int = 1024, padding: int = 1):
+        """Initialises the TextureAtlas object.
+
+        Args:
+
+            page_size: Width and height of each page, in pixels.
+
+            padding: Empty pixels left between packed surfaces, so that
+                     scaling or rotating them doesn't bleed the
+                     neighbours in.
+        """
+
+        self.page_size = page_size
+        self.padding = padding
+        self.pages: list[surface.Surface] = []
+        # Name -> (page index, Rect object)
+        self.regions: dict[str, tuple[int, pg_rect.Rect]] = {}
+        # Name -> modification time, in nanoseconds, of the image files
+        # packed by from_directory.
+        self.sources: dict[str, int] = {}
+
+        self._pending: dict[str, surface.Surface] = {}
+        self._handles: dict[str, surface.Surface] = {}
+        # Packer of each page. Loaded pages have none, as where their
+        # free room is was not saved.
+        self._packers: list[SkylinePacker] = []
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.regions
+
+    def __getitem__(self, name: str) -> surface.Surface:
+        """Gets the subsurface of a packed surface.
+
+        Raises:
+            KeyError: No surface was packed with that name.
+        """
+
+        handle = self._handles.get(name)
+        if handle is None:
+            page, area = self.regions[name]
+            handle = self._handles[name] = self.pages[page].subsurface(area)
+        return handle
+
+    def add(self, name: str, surface_: surface.Surface) -> None:
+        """Queues a surface to be packed by the next build.
+
+        Args:
+
+            name: Name the packed surface will be got with.
+
+            surface_: Surface object to be packed.
+
+        Raises:
+            ValueError: The surface doesn't fit in a page.
+        """
+
+        width, height = surface_.get_size()
+        if max(width, height) + self.padding > self.page_size:
+            raise ValueError(
+                f"{name} ({width}x{height}) doesn't fit in a "
+                f"{self.page_size}x{self.page_size} page"
+            )
+        self._pending[name] = surface_
+
+    def build(self) -> None:
+        """Packs every queued surface, adding pages as needed.
+
+        Surfaces already packed by an earlier build stay where they
+        are.
+        """
+
+        packers = self._packers
+        pending = sorted(self._pending.items(),
+                         key=lambda item: (item[1].get_height(),
+                                           item[1].get_width()),
+                         reverse=True)
+
+        for name, surface_ in pending:
+            width, height = surface_.get_size()
+            for page, packer in enumerate(packers):
+                if packer is None:
+                    continue
+                position = packer.insert(width + self.padding,
+                                         height + self.padding)
+                if position is not None:
+                    break
+            else:
+                self.pages.append(self._new_page())
+                packers.append(SkylinePacker(self.page_size, self.page_size))
+                page = len(packers) - 1
+                position = packers[page].insert(width + self.padding,
+                                                height + self.padding)
+
+            area = pg_rect.Rect(position, (width, height))
+            self._blit_exact(self.pages[page], surface_, area)
+            self.regions[name] = (page, area)
+            self._handles.pop(name, None)
+
+        self._pending.clear()
+
+    def _new_page(self):
+        page = surface.Surface((self.page_size, self.page_size),
+                               constants.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+        return page
+
+    @staticmethod
+    def _blit_exact(page, surface_, area):
+        if surface_.get_colorkey() is not None:
+            # Keyed pixels become transparent ones.
+            keyed = surface.Surface(surface_.get_size(), constants.SRCALPHA)
+            keyed.fill((0, 0, 0, 0))
+            keyed.blit(surface_, (0, 0))
+            surface_ = keyed
+
+        # Adding onto the cleared area copies the pixels, alpha
+        # included, instead of blending them.
+        page.fill((0, 0, 0, 0), area)
+        page.blit(surface_, area, special_flags=constants.BLEND_RGBA_ADD)
+
+    def convert(self) -> None:
+        """Converts the pages to the display pixel format. Handles got
+        before converting keep pointing at the old pages.
+        """
+
+        self.pages = [utils.convert_surface(page) for page in self.pages]
+        self._handles.clear()
+
+    def page_of(self, name: str) -> surface.Surface:
+        """Gets the page where a surface was packed."""
+
+        return self.pages[self.regions[name][0]]
+
+    def area_of(self, name: str) -> pg_rect.Rect:
+        """Gets the area of its page where a surface was packed."""
+
+        return self.regions[name][1]
+
+    def blit_sequence(self, items) -> list[tuple]:
+        """Builds the arguments of a Surface.blits call drawing packed
+        surfaces straight from their pages.
+
+        Args:
+
+            items: Iterable of (name, position) pairs.
+
+        Returns:
+            A list of (page, position, area) tuples.
+        """
+
+        regions = self.regions
+        pages = self.pages
+        sequence = []
+        for name, position in items:
+            page, area = regions[name]
+            sequence.append((pages[page], position, area))
+        return sequence
+
+    @property
+    def occupancy(self) -> float:
+        """Get the fraction of the pages taken by packed surfaces."""
+
+        if not self.pages:
+            return 0.0
+        used = sum(area.width * area.height for _, area in
+                   self.regions.values())
+        return used / (len(self.pages) * self.page_size ** 2)
+
+    def save(self, path: str) -> None:
+        """Writes the atlas into a JSON index and one PNG file per
+        page, placed next to the index.
+
+        Args:
+
+            path: Location of the index file to be written.
+        """
+
+        base = os.path.splitext(path)[0]
+        page_files = []
+        for index, page in enumerate(self.pages):
+            page_path = f"{base}_{index}.png"
+            image.save(page, page_path)
+            page_files.append(os.path.basename(page_path))
+
+        index = {
+            "page_size": self.page_size,
+            "padding": self.padding,
+            "pages": page_files,
+            "regions": {
+                name: [page, *area] for name, (page, area)
+                in self.regions.items()
+            },
+            "sources": self.sources,
+        }
+        with open(path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+
+    @classmethod
+    def load(cls, path: str) -> "TextureAtlas":
+        """Loads an atlas written by save.
+
+        Args:
+
+            path: Location of the index file.
+        """
+
+        with open(path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+
+        atlas = cls(index["page_size"], index["padding"])
+        directory = os.path.dirname(path)
+        atlas.pages = [utils.load_image(os.path.join(directory, page_file))
+                       for page_file in index["pages"]]
+        atlas._packers = [None] * len(atlas.pages)
+        atlas.regions = {
+            name: (page, pg_rect.Rect(area))
+            for name, (page, *area) in index["regions"].items()
+        }
+        atlas.sources = index.get("sources", {})
+        return atlas
+
+    @classmethod
+    def from_directory(cls, directory: str, page_size: int = 1024,
+                       padding: int = 1) -> "TextureAtlas":
+        """Packs every image under a directory. Each one is named after
+        its path relative to the directory, with forward slashes.
+        """
+
+        atlas = cls(page_size, padding)
+        for name, path in _image_files(directory):
+            atlas.add(name, image.load(path))
+            atlas.sources[name] = os.stat(path).st_mtime_ns
+        atlas.build()
+        return atlas
+
+    @classmethod
+    def cached(cls, directory: str, path: str, page_size: int = 1024,
+               padding: int = 1) -> "TextureAtlas":
+        """Loads the atlas of a directory from its cache, rebuilding
+        the cache first if images were added, removed, renamed or
+        modified since, or if it was packed with other settings.
+
+        Args:
+
+            directory: Directory with the images to be packed.
+
+            path: Location of the cached index file.
+        """
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            sources = {name: os.stat(image_path).st_mtime_ns
+                       for name, image_path in _image_files(directory)}
+            if index.get("sources") == sources \
+                    and index["page_size"] == page_size \
+                    and index["padding"] == padding:
+                return cls.load(path)
+
+        atlas = cls.from_directory(directory, page_size, padding)
+        atlas.save(path)
+        atlas.convert()
+        return atlas
+
+
+def _image_files(directory):
+    """Yields the (name, path) pairs of the images under a directory."""
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if os.path.splitext(file_name)[1].lower() in IMAGE_EXTENSIONS:
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, directory).replace(os.sep, "/")
+                yield name, path
+
+
+def main(argv: list[str] = None) -> int:
+    """Entry point of the offline atlas builder."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m basic_engine.atlas",
+        description="Packs the images of a directory into atlas pages.",
+    )
+    parser.add_argument("directory", help="directory with the images")
+    parser.add_argument("output", help="location of the JSON index")
+    parser.add_argument("--page-size", type=int, default=1024,
+                        help="width and height of each page")
+    parser.add_argument("--padding", type=int, default=1,
+                        help="empty pixels between packed images")
+    args = parser.parse_args(argv)
+
+    atlas = TextureAtlas.from_directory(args.directory, args.page_size,
+                                        args.padding)
+    atlas.save(args.output)
+    print(f"{len(atlas)} images packed into {len(atlas.pages)} pages "
+          f"({100 * atlas.occupancy:.1f}% used)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Module for running games headlessly as benchmarks.
+
+The runner boots Game instances against SDL's dummy video and audio
+drivers and runs their frames back to back, with no FPS cap, so it
+works on machines without a display. It can also be used from the
+command line:
+
+    python -m basic_engine.benchmark [TARGET ...] [--frames N]
+                                     [--duration SECONDS] [--output FILE]
+                                     [--replay RECORDING]
+
+Where each TARGET is either the name of a built-in target or a
+"module:function" string, the function returning a Game object. A
+recording made with Game.record can be replayed as the workload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+
+import pygame
+
+from . import game, replay
+
+# Built-in benchmark targets, made from the example scenes.
+TARGETS = {
+    "game": "basic_engine.tests.game:create_game",
+    "interface": "basic_engine.tests.interface:create_game",
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Frame rate simulated for games whose FPS is 0, i.e. uncapped.
+UNCAPPED_FPS = 60
+
+
+def use_dummy_drivers() -> None:
+    """Makes pygame use the SDL dummy drivers for video and audio.
+
+    It must be called before a Game object is created. If the display
+    was already initialised with another driver, it's shut down so
+    that the next initialisation picks the dummy one.
+    """
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+        pygame.display.quit()
+
+
+def percentile(values, percent: float) -> float:
+    """Computes a percentile using the nearest-rank method.
+
+    Args:
+
+        values: Sequence of numbers. It mustn't be empty.
+
+        percent: The wanted percentile, from 0 to 100.
+    """
+
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class BenchmarkReport:
+    """Frame timings collected from a benchmark run."""
+
+    def __init__(self, name: str, frame_times: list[float],
+                 scene_ids: list[str]):
+        """Initialises the BenchmarkReport object.
+
+        Args:
+
+            name: Name of the benchmark target.
+
+            frame_times: Duration of each frame, in seconds.
+
+            scene_ids: Id of the scene shown in each frame.
+        """
+
+        self.name = name
+        self.frame_times = frame_times
+        self.scene_ids = scene_ids
+
+    @property
+    def frames(self) -> int:
+        """Get the amount of frames run."""
+
+        return len(self.frame_times)
+
+    @property
+    def total_time(self) -> float:
+        """Get the time spent running frames, in seconds."""
+
+        return sum(self.frame_times)
+
+    @property
+    def throughput(self) -> float:
+        """Get the amount of frames run per second."""
+
+        total_time = self.total_time
+        return self.frames / total_time if total_time else 0.0
+
+    @staticmethod
+    def _summary(frame_times) -> dict:
+        """Summarises a list of frame times, in milliseconds."""
+
+        if not frame_times:
+            return {"frames": 0}
+
+        summary = {
+            "frames": len(frame_times),
+            "mean_ms": 1000 * sum(frame_times) / len(frame_times),
+            "max_ms": 1000 * max(frame_times),
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = 1000 * percentile(frame_times,
+                                                          percent)
+        return summary
+
+    def scenes(self) -> dict[str, dict]:
+        """Summarises the frame times of each scene shown."""
+
+        per_scene = {}
+        for scene_id, frame_time in zip(self.scene_ids, self.frame_times):
+            per_scene.setdefault(str(scene_id), []).append(frame_time)
+
+        return {
+            scene_id: self._summary(frame_times)
+            for scene_id, frame_times in per_scene.items()
+        }
+
+    def to_dict(self) -> dict:
+        """Gets the report as a JSON serialisable dict."""
+
+        return {
+            "name": self.name,
+            "total_time_s": self.total_time,
+            "throughput_fps": self.throughput,
+            "frame_time": self._summary(self.frame_times),
+            "scenes": self.scenes(),
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.name}: {self.frames} frames in {self.total_time:.3f}s "
+            f"({self.throughput:.1f} frames/s)"
+        ]
+        for scene_id, summary in {
+            "all": self._summary(self.frame_times), **self.scenes()
+        }.items():
+            if not summary["frames"]:
+                continue
+            times = " ".join(
+                f"p{percent}={summary[f'p{percent}_ms']:.3f}ms"
+                for percent in PERCENTILES
+            )
+            lines.append(f"  {scene_id:<16} {summary['frames']:>7} frames "
+                         f"mean={summary['mean_ms']:.3f}ms {times}")
+
+        return "\n".join(lines)
+
+
+def run(game_: game.Game, frames: int = None, duration: float = None,
+        name: str = None, recording: str = None) -> BenchmarkReport:
+    """Runs the game's frames back to back, with no FPS cap.
+
+    Each frame is considered to last exactly 1/FPS seconds of
+    simulated time, or 1/UNCAPPED_FPS if FPS is 0, so a game running
+    at a fixed TICK_RATE behaves the same on every machine. Given a
+    recording, its frames are replayed instead, with their events and
+    elapsed times.
+
+    Args:
+
+        game_: The Game object to be run. Preferably created after
+               calling use_dummy_drivers.
+
+        frames: Amount of frames to be run.
+
+        duration: Amount of simulated seconds to be run, used when no
+                  frames are given. If neither is given, 600 frames are
+                  run.
+
+        name: Name given to the report. Defaults to the game's name.
+
+        recording: Location of a recording made with Game.record,
+                   replayed as the workload. Its frames are all run
+                   unless frames or duration are given.
+
+    Returns:
+        A BenchmarkReport object with the collected timings.
+    """
+
+    fps = game_.FPS or UNCAPPED_FPS
+    if recording is not None:
+        player = replay.Player(recording)
+        replay.seed_rngs(player.seed)
+        workload = iter(player)
+        if frames is None and duration:
+            frames = math.ceil(duration * fps)
+    else:
+        if frames is None:
+            frames = math.ceil(duration * fps) if duration else 600
+        frame_ms = 1000 / fps
+        workload = ((frame_ms, None) for _ in range(frames))
+
+    frame_times = []
+    scene_ids = []
+    for elapsed, events in workload:
+        if frames is not None and len(frame_times) == frames:
+            break
+        scene_ids.append(game_.scene_manager.current_scene)
+
+        start = time.perf_counter()
+        if events is None:
+            running = game_.run_frame(elapsed)
+        else:
+            running = game_.replay_frame(elapsed, events)
+        frame_times.append(time.perf_counter() - start)
+
+        if not running:
+            break
+
+    return BenchmarkReport(name or game_.name, frame_times, scene_ids)
+
+
+def load_target(target: str):
+    """Imports a benchmark target.
+
+    Args:
+
+        target: Name of a built-in target or "module:function" string.
+
+    Returns:
+        The function that creates the Game object to be benchmarked.
+    """
+
+    module_name, _, function_name = TARGETS.get(target, target).partition(":")
+    if not function_name:
+        raise ValueError(f'{target} is not a target nor a "module:function"')
+
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main(argv: list[str] = None) -> int:
+    """Entry point of the benchmark runner."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m basic_engine.benchmark",
+        description="Runs games headlessly and reports frame timings.",
+    )
+    parser.add_argument("targets", nargs="*", default=list(TARGETS),
+                        help='built-in target or "module:function"')
+    parser.add_argument("--frames", type=int,
+                        help="amount of frames run for each target")
+    parser.add_argument("--duration", type=float,
+                        help="simulated seconds run for each target")
+    parser.add_argument("--output", help="writes the reports as JSON")
+    parser.add_argument("--replay", metavar="RECORDING",
+                        help="replays a recording made with Game.record "
+                             "as the workload of every target")
+    args = parser.parse_args(argv)
+
+    use_dummy_drivers()
+
+    reports = []
+    for target in args.targets:
+        report = run(load_target(target)(), args.frames, args.duration,
+                     target, args.replay)
+        reports.append(report)
+        print(report)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump([report.to_dict() for report in reports], output,
+                      indent=2)
+
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
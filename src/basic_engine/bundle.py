@@ -0,0 +1,292 @@
+"""Module for packing assets into a single, memory-mapped bundle file.
+
+A bundle stores images as pixels already decoded into the 32 bits
+layout of the display, and sounds as samples already decoded into the
+mixer format, so loading them is a copy out of the mapped file instead
+of opening and decoding a file. Other files are stored as they are.
+Bundles are built offline, either from code or from the command line:
+
+    python -m basic_engine.bundle DIRECTORY OUTPUT
+
+Mounting a bundle with utils.mount_bundle makes utils.load_image and
+utils.load_soundfx take the packed assets instead of the loose files.
+
+The file starts with a header (magic bytes, version, offset and size
+of the index) followed by the assets, each aligned to 16 bytes, and
+ends with a JSON index of the assets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+from pygame import constants, image, mixer, surface
+
+MAGIC = b"PGBUNDLE"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQ")
+ALIGNMENT = 16
+
+# Layout of the stored pixels, which is the one SDL picks for 32 bits
+# displays and for convert_alpha.
+PIXEL_FORMAT = "BGRA"
+MASKS = (0xFF0000, 0xFF00, 0xFF, 0xFF000000)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga")
+SOUND_EXTENSIONS = (".wav", ".ogg", ".mp3", ".flac")
+
+
+def build(directory: str, path: str) -> int:
+    """Packs every file under a directory into a bundle.
+
+    Images and sounds are decoded, so pygame's display and mixer
+    modules don't need a mode set, but the mixer must be initialised
+    with the format the game will use.
+
+    Args:
+
+        directory: Directory with the assets to be packed.
+
+        path: Location of the bundle file to be written.
+
+    Returns:
+        The amount of packed files.
+    """
+
+    entries = {}
+    with open(path, "wb") as bundle_file:
+        bundle_file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+
+        for name, file_path in _asset_files(directory):
+            entry, data = _encode(file_path)
+            offset = _align(bundle_file)
+            bundle_file.write(data)
+            entries[name] = entry | {"offset": offset, "size": len(data)}
+
+        index = json.dumps({
+            "mixer": mixer.get_init(),
+            "entries": entries,
+        }).encode("utf-8")
+        index_offset = _align(bundle_file)
+        bundle_file.write(index)
+
+        bundle_file.seek(0)
+        bundle_file.write(HEADER.pack(MAGIC, VERSION, index_offset,
+                                      len(index)))
+
+    return len(entries)
+
+
+def _align(bundle_file):
+    padding = -bundle_file.tell() % ALIGNMENT
+    bundle_file.write(bytes(padding))
+    return bundle_file.tell()
+
+
+def _encode(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension in IMAGE_EXTENSIONS:
+        surface_ = image.load(file_path)
+        entry = {
+            "kind": "image",
+            "width": surface_.get_width(),
+            "height": surface_.get_height(),
+            "alpha": bool(surface_.get_flags() & constants.SRCALPHA),
+            "colorkey": surface_.get_colorkey(),
+        }
+        return entry, image.tobytes(surface_, PIXEL_FORMAT)
+
+    if extension in SOUND_EXTENSIONS and mixer.get_init():
+        return {"kind": "sound"}, mixer.Sound(file_path).get_raw()
+
+    with open(file_path, "rb") as raw_file:
+        return {"kind": "raw"}, raw_file.read()
+
+
+def _asset_files(directory):
+    """Yields the (name, path) pairs of the files under a directory."""
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            path = os.path.join(root, file_name)
+            yield os.path.relpath(path, directory).replace(os.sep, "/"), path
+
+
+class Bundle:
+    """Read-only view of a bundle file.
+
+    The file is memory-mapped, so only the assets actually loaded are
+    read from the disk, the first time they're accessed.
+    """
+
+    def __init__(self, path: str, root: str = ""):
+        """Initialises the Bundle object.
+
+        Args:
+
+            path: Location of the bundle file.
+
+            root: Directory the packed files were in, relative to the
+                  working directory. Paths given to the get methods are
+                  taken relative to it, so that the paths used with the
+                  loose files keep working.
+
+        Raises:
+            ValueError: The file is not a bundle.
+        """
+
+        self.path = path
+        self.root = os.path.normpath(root)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_offset, index_size = HEADER.unpack_from(
+            self._map.read(HEADER.size).ljust(HEADER.size, b"\0")
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} bundle")
+
+        index = json.loads(self._map[index_offset:index_offset + index_size])
+        self.mixer_format = tuple(index["mixer"] or ())
+        self.entries: dict[str, dict] = index["entries"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def close(self) -> None:
+        """Unmaps and closes the bundle file. Assets already loaded
+        stay valid.
+        """
+
+        self._map.close()
+        self._file.close()
+
+    def name_of(self, path: str):
+        """Gets the name of the packed file that was at a path, or
+        None if it's outside the root directory.
+        """
+
+        name = os.path.relpath(os.path.normpath(path), self.root)
+        if name.startswith(os.pardir):
+            return None
+        return name.replace(os.sep, "/")
+
+    def _entry(self, path, kind):
+        name = self.name_of(path)
+        entry = self.entries.get(name)
+        if entry is None or entry["kind"] != kind:
+            return None
+        return entry
+
+    def _view(self, entry):
+        offset = entry["offset"]
+        return memoryview(self._map)[offset:offset + entry["size"]]
+
+    def get_image(self, path: str):
+        """Builds a packed image.
+
+        Args:
+
+            path: Path of the image file that was packed.
+
+        Returns:
+            A Surface object in the 32 bits display layout, or None if
+            the image is not in the bundle.
+        """
+
+        entry = self._entry(path, "image")
+        if entry is None:
+            return None
+
+        size = (entry["width"], entry["height"])
+        if entry["alpha"]:
+            surface_ = surface.Surface(size, constants.SRCALPHA, 32, MASKS)
+        else:
+            surface_ = surface.Surface(size, 0, 32, MASKS[:3] + (0,))
+
+        with self._view(entry) as view:
+            surface_.get_buffer().write(bytes(view))
+        if entry["colorkey"] is not None:
+            surface_.set_colorkey(tuple(entry["colorkey"]))
+        return surface_
+
+    def get_sound(self, path: str):
+        """Builds a packed sound.
+
+        Args:
+
+            path: Path of the sound file that was packed.
+
+        Returns:
+            A mixer.Sound object, or None if the sound is not in the
+            bundle.
+
+        Raises:
+            ValueError: The mixer format differs from the one the
+                        bundle was built with.
+        """
+
+        entry = self._entry(path, "sound")
+        if entry is None:
+            return None
+
+        if mixer.get_init() != self.mixer_format:
+            raise ValueError(
+                f"{self.path} was built for the mixer format "
+                f"{self.mixer_format}, not {mixer.get_init()}"
+            )
+        with self._view(entry) as view:
+            return mixer.Sound(buffer=view)
+
+    def get_bytes(self, path: str):
+        """Gets the content of a file packed as it was, or None if it's
+        not in the bundle.
+        """
+
+        entry = self._entry(path, "raw")
+        if entry is None:
+            return None
+        with self._view(entry) as view:
+            return bytes(view)
+
+
+def main(argv: list[str] = None) -> int:
+    """Entry point of the bundle builder."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m basic_engine.bundle",
+        description="Packs the assets of a directory into a bundle file.",
+    )
+    parser.add_argument("directory", help="directory with the assets")
+    parser.add_argument("output", help="location of the bundle file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.mixer.init()
+    count = build(args.directory, args.output)
+    print(f"{count} files packed into {args.output} "
+          f"({os.path.getsize(args.output)} bytes)")
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
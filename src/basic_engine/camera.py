@@ -0,0 +1,320 @@
+"""Module for viewing worlds larger than the screen.
+
+A Camera maps world positions to screen positions, with zoom, and can
+follow a target. Its draw methods skip the sprites outside the view
+before blitting them, so drawing costs what is visible instead of the
+size of the world.
+"""
+
+from __future__ import annotations
+
+import math
+
+from pygame import rect as pg_rect, transform
+
+from . import utils
+
+
+class Camera:
+    """View of an area of a world, shown in an area of the screen."""
+
+    def __init__(self, viewport, world_rect=None, zoom: float = 1.0,
+                 max_bytes: int = 16 * 2 ** 20):
+        """Initialises the Camera object.
+
+        Args:
+
+            viewport: Rect object, or anything accepted by Rect, of the
+                      area of the screen where the world is shown, e.g.
+                      the scene's screen_rect.
+
+            world_rect: Rect object with the bounds of the world, which
+                        the view doesn't leave. None means no bounds.
+
+            zoom: Screen pixels per world pixel.
+
+            max_bytes: Budget for the memory used by the images scaled
+                       by the zoom, which are cached while it doesn't
+                       change.
+        """
+
+        self.viewport = pg_rect.Rect(viewport)
+        self.world_rect = None if world_rect is None \
+            else pg_rect.Rect(world_rect)
+
+        # World position of the top left corner of the view.
+        self.x = 0.0
+        self.y = 0.0
+        self._zoom = zoom
+
+        self.target = None
+        self.smoothing = 0.0
+        self.deadzone: pg_rect.Rect = None
+
+        # Image -> image scaled by the current zoom.
+        self._scaled = utils.LRUCache(max_bytes, utils.surface_nbytes)
+
+    @property
+    def zoom(self) -> float:
+        """Get or set the screen pixels per world pixel. The center of
+        the view stays in place when it changes.
+        """
+
+        return self._zoom
+
+    @zoom.setter
+    def zoom(self, zoom: float):
+        if zoom <= 0:
+            raise ValueError("The zoom must be positive")
+
+        center = self.center
+        self._zoom = zoom
+        self._scaled.clear()
+        self.center = center
+
+    @property
+    def size(self) -> tuple[float, float]:
+        """Get the size of the view, in world pixels."""
+
+        return (self.viewport.width / self._zoom,
+                self.viewport.height / self._zoom)
+
+    @property
+    def center(self) -> tuple[float, float]:
+        """Get or set the world position at the center of the view."""
+
+        width, height = self.size
+        return (self.x + width / 2, self.y + height / 2)
+
+    @center.setter
+    def center(self, pos):
+        width, height = self.size
+        self.x = pos[0] - width / 2
+        self.y = pos[1] - height / 2
+        self._clamp()
+
+    @property
+    def view_rect(self) -> pg_rect.Rect:
+        """Get the smallest Rect object covering the visible area of
+        the world.
+        """
+
+        width, height = self.size
+        left = math.floor(self.x)
+        top = math.floor(self.y)
+        return pg_rect.Rect(left, top,
+                            math.ceil(self.x + width) - left,
+                            math.ceil(self.y + height) - top)
+
+    def _clamp(self):
+        if self.world_rect is None:
+            return
+
+        width, height = self.size
+        world = self.world_rect
+        if width >= world.width:
+            self.x = world.centerx - width / 2
+        else:
+            self.x = min(max(self.x, world.left), world.right - width)
+        if height >= world.height:
+            self.y = world.centery - height / 2
+        else:
+            self.y = min(max(self.y, world.top), world.bottom - height)
+
+    def move(self, dx: float, dy: float) -> None:
+        """Moves the view by some world pixels."""
+
+        self.x += dx
+        self.y += dy
+        self._clamp()
+
+    def world_to_screen(self, pos) -> tuple[float, float]:
+        """Converts a world position into a screen position."""
+
+        return ((pos[0] - self.x) * self._zoom + self.viewport.x,
+                (pos[1] - self.y) * self._zoom + self.viewport.y)
+
+    def screen_to_world(self, pos) -> tuple[float, float]:
+        """Converts a screen position, e.g. the mouse position, into a
+        world position.
+        """
+
+        return ((pos[0] - self.viewport.x) / self._zoom + self.x,
+                (pos[1] - self.viewport.y) / self._zoom + self.y)
+
+    def apply(self, rect) -> pg_rect.Rect:
+        """Converts a world Rect object into a screen one."""
+
+        rect = pg_rect.Rect(rect)
+        left, top = self.world_to_screen(rect.topleft)
+        right, bottom = self.world_to_screen(rect.bottomright)
+        left, top = round(left), round(top)
+        return pg_rect.Rect(left, top, round(right) - left,
+                            round(bottom) - top)
+
+    def is_visible(self, rect) -> bool:
+        """Gets whether a world Rect object is in the view."""
+
+        return self.view_rect.colliderect(rect)
+
+    def follow(self, target, smoothing: float = 0.0, deadzone=None) -> None:
+        """Makes the view follow a target on every update.
+
+        Args:
+
+            target: Object with a rect attribute in world coordinates,
+                    like a Sprite object, or None to stop following.
+
+            smoothing: Seconds it takes the view to cover about two
+                       thirds of the distance to the target. 0 keeps
+                       the target always centered.
+
+            deadzone: Rect object, or anything accepted by Rect, of the
+                      area of the viewport, relative to its top left
+                      corner, where the target moves without the view
+                      following it. None centers the target.
+        """
+
+        self.target = target
+        self.smoothing = smoothing
+        self.deadzone = None if deadzone is None else pg_rect.Rect(deadzone)
+
+    def update(self, dt: float = 0.0) -> None:
+        """Moves the view towards the followed target, if any.
+
+        Args:
+
+            dt: Seconds passed since the previous update.
+        """
+
+        if self.target is None:
+            return
+
+        goal_x, goal_y = self.target.rect.center
+        center_x, center_y = self.center
+        if self.deadzone is not None:
+            # Only follow the target out of the dead zone.
+            left, top = self.screen_to_world(
+                (self.viewport.x + self.deadzone.left,
+                 self.viewport.y + self.deadzone.top)
+            )
+            right, bottom = self.screen_to_world(
+                (self.viewport.x + self.deadzone.right,
+                 self.viewport.y + self.deadzone.bottom)
+            )
+            goal_x = center_x + min(goal_x - left, 0) \
+                + max(goal_x - right, 0)
+            goal_y = center_y + min(goal_y - top, 0) \
+                + max(goal_y - bottom, 0)
+
+        if self.smoothing > 0:
+            # Frame-rate independent exponential approach.
+            t = 1 - math.exp(-dt / self.smoothing)
+        else:
+            t = 1.0
+        self.center = (center_x + (goal_x - center_x) * t,
+                       center_y + (goal_y - center_y) * t)
+
+    def _image(self, image):
+        if self._zoom == 1:
+            return image
+
+        scaled = self._scaled.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = transform.scale(image, (
+                max(1, round(width * self._zoom)),
+                max(1, round(height * self._zoom)),
+            ))
+            self._scaled.put(image, scaled)
+        return scaled
+
+    def draw_sprite(self, screen, sprite_) -> pg_rect.Rect:
+        """Draws a sprite in the view, unless it's out of it.
+
+        Args:
+
+            screen: Surface object where the viewport is.
+
+            sprite_: Object with image and rect attributes, the rect in
+                     world coordinates, like a Sprite object.
+
+        Returns:
+            A Rect object representing the area of the screen touched,
+            or None if the sprite is not visible.
+        """
+
+        if not self.view_rect.colliderect(sprite_.rect):
+            return None
+        return self._blits(screen, [sprite_])[0]
+
+    def draw_group(self, screen, sprites) -> list[pg_rect.Rect]:
+        """Draws the visible sprites of a group with a single blits
+        call.
+
+        Args:
+
+            screen: Surface object where the viewport is.
+
+            sprites: Group object, or iterable of objects with image
+                     and rect attributes.
+
+        Returns:
+            A list of Rect objects representing the areas of the
+            screen touched.
+        """
+
+        view_rect = self.view_rect
+        rects = [sprite_.rect for sprite_ in sprites]
+        visible = view_rect.collidelistall(rects)
+        if not visible:
+            return []
+
+        sprites = sprites.sprites() if hasattr(sprites, "sprites") \
+            else list(sprites)
+        return self._blits(screen, [sprites[index] for index in visible])
+
+    def draw_indexed(self, screen, spatial_hash, key=None
+                     ) -> list[pg_rect.Rect]:
+        """Draws the visible objects of a spatial hash. Only the cells
+        in the view are looked at, so the cost doesn't depend on the
+        amount of objects out of it.
+
+        Args:
+
+            screen: Surface object where the viewport is.
+
+            spatial_hash: spatial.SpatialHash object indexing objects
+                          with image and rect attributes in world
+                          coordinates.
+
+            key: Function giving the sort key of the objects, to draw
+                 them in order, as the spatial hash doesn't keep one.
+
+        Returns:
+            A list of Rect objects representing the areas of the
+            screen touched.
+        """
+
+        visible = spatial_hash.query_rect(self.view_rect)
+        if key is not None:
+            visible.sort(key=key)
+        return self._blits(screen, visible)
+
+    def _blits(self, screen, sprites):
+        x, y = self.x, self.y
+        zoom = self._zoom
+        offset_x, offset_y = self.viewport.topleft
+        clip = screen.get_clip()
+        # Sprites partly out of the view mustn't cover the rest of the
+        # screen.
+        screen.set_clip(self.viewport.clip(clip))
+        try:
+            return screen.blits([
+                (self._image(sprite_.image),
+                 (round((sprite_.rect.x - x) * zoom + offset_x),
+                  round((sprite_.rect.y - y) * zoom + offset_y)))
+                for sprite_ in sprites
+            ])
+        finally:
+            screen.set_clip(clip)
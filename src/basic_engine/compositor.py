@@ -0,0 +1,255 @@
+"""Module for composing a scene out of z-ordered layers.
+
+Static layers, like backgrounds and decorations, are rendered once into
+cached surfaces and only rendered again when invalidated. The static
+layers under every dynamic one are baked together into a single
+background, so most of a frame is one blit. Dynamic layers, like
+particles and HUDs, are drawn on top every frame.
+
+When the dynamic layers report the areas they touch, only those areas
+are restored from the background in the next frame, instead of the
+whole screen.
+"""
+
+from __future__ import annotations
+
+from pygame import constants, rect as pg_rect, surface
+
+from . import utils
+
+
+class Layer:
+    """Named layer of a compositor."""
+
+    def __init__(self, name: str, draw, z: int = 0, static: bool = False):
+        """Initialises the Layer object.
+
+        Args:
+
+            name: Name of the layer in its compositor.
+
+            draw: Callable taking the Surface object where the layer is
+                  drawn. A dynamic layer should return the Rect object,
+                  or list of them, it touched; returning None means the
+                  whole screen has to be drawn again next frame. What a
+                  static layer returns is ignored.
+
+            z: Position of the layer in the stack. Layers with a higher
+               z are drawn over those with a lower one.
+
+            static: Whether the layer is cached, or drawn every frame.
+        """
+
+        self.name = name
+        self.draw = draw
+        self.z = z
+        self.static = static
+
+        # Rendered image of a static layer that isn't part of the
+        # background, and the area of it that isn't transparent.
+        self.cache: surface.Surface = None
+        self.area: pg_rect.Rect = None
+        self.dirty = True
+
+
+class Compositor:
+    """Stack of layers drawn onto a screen."""
+
+    def __init__(self, screen: surface.Surface):
+        """Initialises the Compositor object.
+
+        Args:
+
+            screen: Surface object where the layers are composed.
+        """
+
+        self.screen = screen
+        self.layers: dict[str, Layer] = {}
+
+        # Static layers baked into the background, and the layers
+        # drawn over it every frame, both from the bottom up.
+        self._base: list[Layer] = []
+        self._top: list[Layer] = []
+        self._background: surface.Surface = None
+
+        # Areas to be restored from the background in the next frame.
+        self._restore: list[pg_rect.Rect] = []
+        self._full = True
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.layers
+
+    def __getitem__(self, name: str) -> Layer:
+        return self.layers[name]
+
+    def add_layer(self, name: str, draw, z: int = 0,
+                  static: bool = False) -> Layer:
+        """Adds a layer to the stack. Layers with the same z are drawn
+        in the order they were added.
+
+        Args:
+
+            name: Name of the layer.
+
+            draw: Callable drawing the layer, see Layer.
+
+            z: Position of the layer in the stack.
+
+            static: Whether the layer is cached, or drawn every frame.
+
+        Returns:
+            The new Layer object.
+
+        Raises:
+            ValueError: There's already a layer with that name.
+        """
+
+        if name in self.layers:
+            raise ValueError(f"There's already a layer named {name}")
+
+        layer = Layer(name, draw, z, static)
+        self.layers[name] = layer
+        self._stack()
+        return layer
+
+    def remove_layer(self, name: str) -> None:
+        """Removes a layer from the stack.
+
+        Raises:
+            KeyError: There's no layer with that name.
+        """
+
+        del self.layers[name]
+        self._stack()
+
+    def _stack(self):
+        """Splits the layers into the background and the ones drawn
+        over it, which has to be rebuilt afterwards.
+        """
+
+        layers = sorted(self.layers.values(), key=lambda layer: layer.z)
+        split = 0
+        while split < len(layers) and layers[split].static:
+            split += 1
+        self._base = layers[:split]
+        self._top = layers[split:]
+        self._background = None
+        for layer in layers:
+            layer.cache = None
+            layer.dirty = True
+
+    def invalidate(self, name: str = None) -> None:
+        """Marks a static layer to be rendered again in the next frame.
+
+        Args:
+
+            name: Name of the layer. None marks every static layer.
+        """
+
+        layers = self.layers.values() if name is None else [self.layers[name]]
+        for layer in layers:
+            layer.dirty = True
+
+    def redraw(self) -> None:
+        """Makes the next frame draw the whole screen, without
+        rendering the static layers again.
+        """
+
+        self._full = True
+
+    def damage(self, rect) -> None:
+        """Marks an area of the screen drawn over by something other
+        than the layers, e.g. an overlay, to be restored from the
+        background in the next frame.
+        """
+
+        self._restore.append(pg_rect.Rect(rect))
+
+    def nbytes(self) -> int:
+        """Gets the memory used by the cached surfaces, in bytes."""
+
+        caches = [layer.cache for layer in self._top]
+        caches.append(self._background)
+        return sum(utils.surface_nbytes(cache) for cache in caches
+                   if cache is not None)
+
+    def _render(self) -> bool:
+        """Renders the invalidated static layers.
+
+        Returns:
+            Whether any of them was rendered.
+        """
+
+        rendered = False
+        if self._background is None or any(layer.dirty
+                                           for layer in self._base):
+            self._background = surface.Surface(self.screen.get_size(), 0,
+                                               self.screen)
+            for layer in self._base:
+                layer.draw(self._background)
+                layer.dirty = False
+            rendered = True
+
+        for layer in self._top:
+            if layer.static and layer.dirty:
+                layer.cache = surface.Surface(self.screen.get_size(),
+                                              constants.SRCALPHA)
+                layer.draw(layer.cache)
+                layer.area = layer.cache.get_bounding_rect()
+                layer.dirty = False
+                rendered = True
+
+        return rendered
+
+    def draw(self) -> list[pg_rect.Rect]:
+        """Composes the layers onto the screen.
+
+        Returns:
+            A list of Rect objects representing the areas of the screen
+            touched, or None if the whole screen was drawn, which is
+            the case when there are no layers, when a static layer was
+            rendered again and when a dynamic layer didn't report what
+            it touched.
+        """
+
+        if not self.layers:
+            return None
+
+        full = self._render() or self._full
+        touched = [] if full else self._restore
+        self._restore = []
+        self._full = False
+
+        if full:
+            self.screen.blit(self._background, (0, 0))
+        else:
+            for rect in touched:
+                self.screen.blit(self._background, rect, rect)
+
+        for layer in self._top:
+            if layer.static:
+                # Covers whatever was drawn below it in this frame.
+                areas = [layer.area] if full else [
+                    layer.area.clip(rect) for rect in touched
+                ]
+                for area in areas:
+                    if area:
+                        self.screen.blit(layer.cache, area, area)
+                continue
+
+            rects = layer.draw(self.screen)
+            if rects is None:
+                self._full = True
+                continue
+            if isinstance(rects, pg_rect.Rect):
+                rects = [rects]
+            drawn = [pg_rect.Rect(rect) for rect in rects if rect]
+            touched.extend(drawn)
+            self._restore.extend(drawn)
+
+        if full or self._full:
+            return None
+        return touched
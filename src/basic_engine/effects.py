@@ -1,10 +1,20 @@
 """Module for various effects."""
 
+from __future__ import annotations
+
+import itertools
 import random
-from pygame import sprite, surface
+from pygame import rect as pg_rect, sprite, surface
+
+from . import utils
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-class Particle(sprite.Sprite):
+
+class Particle(utils.PooledSprite):
     """Particle class."""
 
     def __init__(self, screen: surface.Surface, image: surface.Surface,
@@ -26,6 +36,18 @@ class Particle(sprite.Sprite):
         self.screen_rect = screen.get_rect()
         self.image = image
         self.rect = self.image.get_rect()
+        self.reset(x_pos, y_pos)
+
+    def reset(self, x_pos: int, y_pos: int) -> None:
+        """Puts the particle back at a given position with new random
+        speeds.
+
+        Args:
+
+            xpos: X position.
+
+            ypos: Y position.
+        """
 
         self.accel_factor = random.randint(1, 4)
 
@@ -52,7 +74,8 @@ class Particle(sprite.Sprite):
 
     @staticmethod
     def create_particles(screen: surface.Surface, image: surface.Surface,
-                         x_pos: int, y_pos: int) -> sprite.Group:
+                         x_pos: int, y_pos: int, amount: int = 10,
+                         pool: "ParticlePool" = None) -> sprite.Group:
         """Creates a Group of particles.
 
         Args:
@@ -62,10 +85,297 @@ class Particle(sprite.Sprite):
             xpos: X position.
 
             ypos: Y position.
+
+            amount: Amount of particles created.
+
+            pool: ParticlePool object the particles are taken from. The
+                  screen and image arguments are ignored when given,
+                  as the pool's ones are used instead.
         """
 
         group = sprite.Group()
-        for _ in range(10):
-            group.add(Particle(screen, image, x_pos, y_pos))
+        for _ in range(amount):
+            if pool is None:
+                group.add(Particle(screen, image, x_pos, y_pos))
+            else:
+                group.add(pool.acquire(x_pos, y_pos))
 
         return group
+
+
+class ParticlePool(utils.Pool):
+    """Pool of Particle objects sharing the same screen and image.
+
+    Killed particles go back to the pool and are reused by the next
+    create_particles call, so heavy effects don't allocate new sprites
+    and rects each time.
+    """
+
+    def __init__(self, screen: surface.Surface, image: surface.Surface,
+                 capacity: int = 100):
+        """Initialises the ParticlePool object.
+
+        Args:
+
+            screen: Game window surface.
+
+            image: Surface object of every particle.
+
+            capacity: Amount of particles created beforehand.
+        """
+
+        super().__init__(lambda: Particle(screen, image, 0, 0), capacity)
+
+
+class Emitter:
+    """Spawns particles into a ParticleSystem continuously.
+
+    Speeds, accelerations and lifetimes are measured per update, the
+    same way Particle does.
+    """
+
+    def __init__(self, x_pos: float, y_pos: float, rate: float = 0.0,
+                 burst: int = 0, lifetime: int = None,
+                 velocity=((-6, 6), (4, 4)), acceleration=((0, 0), (1, 4)),
+                 particle_lifetime: int = None):
+        """Initialises the Emitter object.
+
+        Args:
+
+            x_pos: X position where particles are spawned.
+
+            y_pos: Y position where particles are spawned.
+
+            rate: Amount of particles spawned per update. It can be
+                  fractional, e.g. 0.5 spawns a particle every two
+                  updates.
+
+            burst: Amount of particles spawned at once on the first
+                   update.
+
+            lifetime: Amount of updates the emitter keeps spawning
+                      particles. None means forever.
+
+            velocity: Pair of (min, max) ranges from which the x and y
+                      initial speeds are randomly picked.
+
+            acceleration: Pair of (min, max) ranges from which the x
+                          and y accelerations are randomly picked.
+
+            particle_lifetime: Amount of updates each particle lives.
+                               None means until it leaves the screen.
+        """
+
+        self.x_pos = x_pos
+        self.y_pos = y_pos
+        self.rate = rate
+        self.burst = burst
+        self.lifetime = lifetime
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.particle_lifetime = particle_lifetime
+
+        self.age = 0
+        self._pending = float(burst)
+
+    @property
+    def active(self) -> bool:
+        """Get whether the emitter will spawn particles again."""
+
+        return self.lifetime is None or self.age < self.lifetime
+
+    def update(self, particle_system: "ParticleSystem") -> None:
+        """Spawns the particles due in this update.
+
+        Args:
+
+            particle_system: ParticleSystem receiving the particles.
+        """
+
+        if not self.active:
+            return
+
+        self._pending += self.rate
+        amount = int(self._pending)
+        self._pending -= amount
+        self.age += 1
+
+        if amount:
+            particle_system.emit(
+                self.x_pos, self.y_pos, amount, self.velocity,
+                self.acceleration, self.particle_lifetime
+            )
+
+
+class ParticleSystem:
+    """A set of particles sharing the same image, simulated in batch.
+
+    Positions, velocities, accelerations and lifetimes are kept in
+    NumPy arrays, so every particle is integrated in a single
+    vectorised step and drawn with a single Surface.blits call. The
+    object can be appended to Scene.particles_groups like the Group
+    objects returned by Particle.create_particles.
+    """
+
+    def __init__(self, screen: surface.Surface, image: surface.Surface,
+                 capacity: int = 10000, seed: int = None):
+        """Initialises the ParticleSystem object.
+
+        Args:
+
+            screen: Game window surface. Particles leaving it are
+                    removed.
+
+            image: Surface object drawn for every particle.
+
+            capacity: Maximum amount of alive particles. Particles
+                      spawned past it are dropped.
+
+            seed: Seed of the random number generator. Defaults to
+                  one drawn from the random module, so seeding it
+                  makes the system deterministic too.
+
+        Raises:
+            ImportError: numpy is not installed.
+        """
+
+        if numpy is None:
+            raise ImportError("ParticleSystem requires numpy")
+
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.image = image
+        self.capacity = capacity
+        self.emitters: list[Emitter] = []
+
+        self.positions = numpy.zeros((capacity, 2), numpy.float32)
+        self.velocities = numpy.zeros((capacity, 2), numpy.float32)
+        self.accelerations = numpy.zeros((capacity, 2), numpy.float32)
+        self.lifetimes = numpy.zeros(capacity, numpy.float32)
+        self.count = 0
+
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._random = numpy.random.default_rng(seed)
+        self._drawn_rect = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def emitting(self) -> bool:
+        """Get whether any emitter will still spawn particles."""
+
+        return any(emitter.active for emitter in self.emitters)
+
+    def add_emitter(self, emitter: Emitter) -> Emitter:
+        """Adds an emitter to the system.
+
+        Returns:
+            The given emitter.
+        """
+
+        self.emitters.append(emitter)
+        return emitter
+
+    def emit(self, x_pos: float, y_pos: float, amount: int,
+             velocity=((-6, 6), (4, 4)), acceleration=((0, 0), (1, 4)),
+             lifetime: int = None) -> None:
+        """Spawns particles at the given position.
+
+        Args:
+
+            x_pos: X position.
+
+            y_pos: Y position.
+
+            amount: Amount of particles to be spawned.
+
+            velocity: Pair of (min, max) ranges from which the x and y
+                      initial speeds are randomly picked.
+
+            acceleration: Pair of (min, max) ranges from which the x
+                          and y accelerations are randomly picked.
+
+            lifetime: Amount of updates the particles live. None means
+                      until they leave the screen.
+        """
+
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+
+        new = slice(self.count, self.count + amount)
+        self.positions[new] = (x_pos, y_pos)
+        for axis in range(2):
+            self.velocities[new, axis] = self._random.uniform(
+                *velocity[axis], amount)
+            self.accelerations[new, axis] = self._random.uniform(
+                *acceleration[axis], amount)
+        self.lifetimes[new] = numpy.inf if lifetime is None else lifetime
+        self.count += amount
+
+    def update(self) -> None:
+        """Spawns, moves and culls every particle in one step."""
+
+        for emitter in self.emitters:
+            emitter.update(self)
+        self.emitters = [emitter for emitter in self.emitters
+                         if emitter.active]
+
+        count = self.count
+        positions = self.positions[:count]
+        velocities = self.velocities[:count]
+        positions += velocities
+        velocities += self.accelerations[:count]
+        self.lifetimes[:count] -= 1
+
+        width, height = self.image.get_size()
+        x_positions = positions[:, 0]
+        y_positions = positions[:, 1]
+        alive = (
+            (self.lifetimes[:count] > 0)
+            & (x_positions > self.screen_rect.left - width)
+            & (x_positions < self.screen_rect.right)
+            & (y_positions > self.screen_rect.top - height)
+            & (y_positions < self.screen_rect.bottom)
+        )
+
+        alive_count = int(numpy.count_nonzero(alive))
+        if alive_count != count:
+            for array in (self.positions, self.velocities,
+                          self.accelerations, self.lifetimes):
+                array[:alive_count] = array[:count][alive]
+            self.count = alive_count
+
+    def draw(self, screen: surface.Surface = None):
+        """Draws every particle with a single blits call.
+
+        Args:
+
+            screen: Surface where the particles are drawn. Defaults to
+                    the one given on initialisation.
+
+        Returns:
+            A Rect object covering the area touched by this and the
+            previous draw, or None if nothing was drawn on both.
+        """
+
+        screen = self.screen if screen is None else screen
+        touched = None
+        if self.count:
+            positions = self.positions[:self.count].astype(numpy.int32)
+            screen.blits(zip(itertools.repeat(self.image),
+                             positions.tolist()), doreturn=False)
+
+            left, top = positions.min(axis=0).tolist()
+            right, bottom = positions.max(axis=0).tolist()
+            width, height = self.image.get_size()
+            touched = pg_rect.Rect(left, top, right - left + width,
+                                   bottom - top + height)
+
+        previous = self._drawn_rect
+        self._drawn_rect = touched
+        if touched is None:
+            return previous
+        return touched if previous is None else touched.union(previous)
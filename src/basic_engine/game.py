@@ -1,8 +1,60 @@
 """Base Game class."""
 
+import asyncio
+
 import pygame
 
-from . import scene
+from . import profiler, replay, scene, tween
+
+# Event posted by wake.
+WAKE_EVENT = pygame.event.custom_type()
+
+
+def wake() -> None:
+    """Wakes up a game loop sleeping in idle mode, so the next frame
+    is run right away. It can be called from any thread, e.g. when an
+    asset finished loading in the background.
+    """
+
+    pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+
+def coalesce_motion(events: list) -> list:
+    """Merges runs of consecutive motion events into a single event.
+
+    Mouse motions keep the last position and buttons and add up their
+    relative movement, while joystick axis motions of the same axis
+    keep the last value. Other events are left untouched, so their
+    order relative to motions is kept.
+
+    Args:
+
+        events: List of pygame.event.Event objects.
+
+    Returns:
+        A new list of events.
+    """
+
+    merged = []
+    for event in events:
+        previous = merged[-1] if merged else None
+        if previous is not None and previous.type == event.type:
+            if event.type == pygame.MOUSEMOTION:
+                merged[-1] = pygame.event.Event(
+                    pygame.MOUSEMOTION,
+                    event.dict,
+                    rel=(previous.rel[0] + event.rel[0],
+                         previous.rel[1] + event.rel[1]),
+                )
+                continue
+            if event.type == pygame.JOYAXISMOTION \
+                    and previous.instance_id == event.instance_id \
+                    and previous.axis == event.axis:
+                merged[-1] = event
+                continue
+        merged.append(event)
+
+    return merged
 
 
 class Game:
@@ -10,6 +62,42 @@ class Game:
 
     FPS = 60
 
+    # When enabled, only the areas reported by the current scene are
+    # presented each frame instead of the whole window.
+    DIRTY_RECTS = False
+
+    # Simulation ticks per second. When set, scenes are updated at this
+    # fixed rate using an accumulator and FPS only caps rendering (0
+    # means rendering as fast as the display allows).
+    TICK_RATE = None
+
+    # Maximum amount of simulation ticks run in a single frame. Time
+    # that could not be simulated is dropped, so a slow frame doesn't
+    # make the following ones slower.
+    MAX_CATCH_UP_TICKS = 5
+
+    # Event types never blocked when filtering the events of a scene.
+    ALWAYS_ALLOWED_EVENTS = [pygame.QUIT, WAKE_EVENT]
+
+    # Whether consecutive motion events of a frame are merged into one.
+    COALESCE_MOTION = False
+
+    # Budget of the scenes added as factories. Once the built scenes go
+    # over it, the least recently shown ones are unloaded. None means
+    # no limit.
+    MAX_LOADED_SCENES = None
+    MAX_SCENE_BYTES = None
+
+    # When enabled, the loop sleeps waiting for events while the
+    # current scene reports no pending work, instead of redrawing it at
+    # FPS. Timers of the scene still wake it up.
+    IDLE_WAIT = False
+
+    # Seconds before a frame is due when the asyncio loop stops
+    # sleeping and keeps yielding to the event loop instead, as sleeps
+    # may overshoot by the resolution of the timers.
+    ASYNC_SLEEP_MARGIN = 0.002
+
     def __init__(self, screen_width: int, screen_height: int, name: str,
                  icon: pygame.Surface = None):
         pygame.init()
@@ -22,11 +110,28 @@ class Game:
         pygame.display.set_caption(name)
         if icon is not None:
             pygame.display.set_icon(icon)
-        self.scene_manager = scene.SceneManager()
+        self.profiler = profiler.FrameProfiler()
+        self.profiler_overlay: profiler.ProfilerOverlay = None
+        self.scene_manager = scene.SceneManager(
+            self.profiler, self.MAX_LOADED_SCENES, self.MAX_SCENE_BYTES
+        )
         self.clock = pygame.time.Clock()
+        self._accumulator = 0.0
+        self._filtered_scene = None
+        # Event that woke the loop up from the idle wait.
+        self._wake_event: pygame.event.Event = None
+        # Whether the compositor of the scene restores the area under
+        # the profiler overlay, which has to be drawn again then.
+        self._overlay_restored = False
+
+        self.recorder: replay.Recorder = None
+        # Events of the frame being replayed, used instead of the queue.
+        self._replayed_events: list = None
 
     def add_scene(self, scene_id, scene):
-        """Adds scene to game."""
+        """Adds scene to game. It can also be a callable building the
+        scene the first time it's shown.
+        """
 
         self.scene_manager.add(scene_id, scene)
 
@@ -35,22 +140,342 @@ class Game:
 
         self.scene_manager.initial_view(scene_id)
 
+    def enable_profiler(self, overlay: bool = False) -> None:
+        """Starts recording the time spent in each phase of the frames.
+
+        The recorded frames can be read or exported from the profiler
+        attribute.
+
+        Args:
+
+            overlay: Whether the recorded timings are displayed on the
+                     screen.
+        """
+
+        self.profiler.enabled = True
+        if overlay:
+            self.profiler_overlay = profiler.ProfilerOverlay(self.screen,
+                                                             self.profiler)
+
+    def disable_profiler(self) -> None:
+        """Stops recording frames and hides the profiler overlay."""
+
+        self.profiler.enabled = False
+        self.profiler_overlay = None
+
+    def filter_events(self) -> None:
+        """Makes SDL drop the events the current scene isn't
+        interested in. It's called automatically when the scene
+        changes.
+        """
+
+        current_scene = self.scene_manager.current_scene
+        self._filtered_scene = current_scene
+        scene_ = self.scene_manager.get_scene(current_scene)
+        event_types = None if scene_ is None else scene_.event_types()
+
+        if event_types is None:
+            pygame.event.set_allowed(None)
+        else:
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(
+                list(event_types.union(self.ALWAYS_ALLOWED_EVENTS))
+            )
+
     def start(self) -> None:
         """Main loop of the game."""
 
         running = True
+        elapsed = 0
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                self.scene_manager.update_on_event(event)
+            running = self.run_frame(elapsed)
+            elapsed = self.clock.tick(self.FPS)
+            if self.IDLE_WAIT and running:
+                elapsed += self.wait_idle()
+        self.stop_recording()
+        self.scene_manager.shutdown()
+        pygame.quit()
+
+    def record(self, path: str, seed: int = None) -> None:
+        """Starts recording the events and the elapsed time of every
+        frame, so the session can be replayed. The random number
+        generators are seeded, so it should be called before the
+        scenes use them.
+
+        Args:
+
+            path: Location of the recording file.
+
+            seed: Seed given to the random number generators. Defaults
+                  to a random one, stored in the recording.
+        """
+
+        self.stop_recording()
+        self.recorder = replay.Recorder(path, seed)
+
+    def stop_recording(self) -> None:
+        """Stops recording and closes the recording file, if any."""
+
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def replay_frame(self, elapsed: float, events: list) -> bool:
+        """Runs a frame of a recording, with its events instead of the
+        ones in the queue, which are dropped.
+
+        Returns:
+            False if the game was requested to quit, True otherwise.
+        """
+
+        pygame.event.clear()
+        self._replayed_events = events
+        return self.run_frame(elapsed)
+
+    def replay(self, path: str) -> int:
+        """Runs the frames of a recording back to back, with no FPS
+        cap. The random number generators are seeded as they were when
+        the recording started, so scenes behave the same if the game
+        is set up as it was then.
+
+        Args:
+
+            path: Location of the recording file.
 
-            self.scene_manager.show()
+        Returns:
+            The amount of frames run.
+        """
+
+        player = replay.Player(path)
+        replay.seed_rngs(player.seed)
+
+        frames = 0
+        for elapsed, events in player:
+            frames += 1
+            if not self.replay_frame(elapsed, events):
+                break
+        return frames
+
+    def start_async(self) -> None:
+        """Main loop of the game, run on asyncio so scenes can schedule
+        coroutines with Scene.schedule.
+        """
+
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            self.stop_recording()
+            self.scene_manager.shutdown()
+            pygame.quit()
+
+    async def run_async(self) -> None:
+        """Runs frames on the running asyncio loop until the game is
+        requested to quit.
+
+        Between two frames, the event loop runs the scheduled
+        coroutines and their I/O until the next frame is due. Frames
+        are never delayed to let them finish, so coroutines must await
+        often, but they get at least one pass of the event loop per
+        frame even when the frames take longer than 1 / FPS.
+
+        Raises:
+            Exception: The first error raised by a coroutine scheduled
+                       by a scene.
+        """
+
+        loop = asyncio.get_running_loop()
+        exception_handler = loop.get_exception_handler()
+        errors = []
+        loop.set_exception_handler(
+            lambda loop_, context: errors.append(context)
+        )
+
+        try:
+            running = True
+            elapsed = 0
+            deadline = loop.time()
+            self.clock.tick()
+            while running:
+                if not (self.IDLE_WAIT and self._frame_is_idle()):
+                    running = self.run_frame(elapsed)
+                    elapsed = 0
+                deadline = await self._wait_frame(loop, deadline)
+                elapsed += self.clock.tick()
+
+                for context in errors:
+                    if "exception" in context:
+                        raise context["exception"]
+                    loop.default_exception_handler(context)
+                errors.clear()
+        finally:
+            loop.set_exception_handler(exception_handler)
+            tasks = [task for scene_ in self.scene_manager.scenes.values()
+                     for task in scene_.tasks]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _frame_is_idle(self) -> bool:
+        """Gets whether the next frame can be skipped in idle mode."""
+
+        if self.profiler_overlay is not None or pygame.event.peek():
+            return False
+        timeout = self.scene_manager.next_wakeup()
+        return timeout is None or timeout > 1000 / (self.FPS or 1000)
+
+    async def _wait_frame(self, loop, deadline):
+        """Yields to the event loop until the next frame is due.
+
+        Args:
+
+            loop: The running asyncio loop.
+
+            deadline: Loop time when the previous frame was due.
+
+        Returns:
+            The loop time when the next frame is due.
+        """
+
+        frame_time = 1 / self.FPS if self.FPS else 0
+        deadline += frame_time
+        now = loop.time()
+        if deadline < now - frame_time:
+            # Too late to catch up, so the pace starts over.
+            deadline = now
+
+        if deadline - now > self.ASYNC_SLEEP_MARGIN:
+            await asyncio.sleep(deadline - now - self.ASYNC_SLEEP_MARGIN)
+        await asyncio.sleep(0)
+        while loop.time() < deadline:
+            await asyncio.sleep(0)
+        return deadline
+
+    def wait_idle(self) -> int:
+        """Sleeps until an event arrives, or until the current scene
+        needs the next frame, if it has no pending work.
+
+        Returns:
+            The milliseconds slept.
+        """
+
+        if self.profiler_overlay is not None:
+            return 0
+        timeout = self.scene_manager.next_wakeup()
+        if timeout == 0 or pygame.event.peek():
+            return 0
+
+        start = pygame.time.get_ticks()
+        if timeout is None:
+            event = pygame.event.wait()
+        else:
+            event = pygame.event.wait(max(1, int(timeout)))
+        if event.type != pygame.NOEVENT:
+            self._wake_event = event
+
+        # The sleep is returned apart, so the clock mustn't count it.
+        self.clock.tick()
+        return pygame.time.get_ticks() - start
+
+    def run_frame(self, elapsed: float = 0) -> bool:
+        """Runs a single iteration of the main loop, without waiting
+        for the next frame.
+
+        Args:
+
+            elapsed: Milliseconds passed since the previous frame. It
+                     advances the tweens and, when the game runs at a
+                     fixed TICK_RATE, the simulation.
+
+        Returns:
+            False if the game was requested to quit, True otherwise.
+        """
+
+        frame_profiler = self.profiler
+        frame_profiler.begin_frame()
+
+        if self.scene_manager.current_scene != self._filtered_scene:
+            self.filter_events()
+
+        running = True
+        if self._replayed_events is not None:
+            events = self._replayed_events
+            self._replayed_events = None
+        else:
+            events = pygame.event.get()
+            if self._wake_event is not None:
+                events.insert(0, self._wake_event)
+                self._wake_event = None
+        if self.recorder is not None:
+            self.recorder.write_frame(elapsed, events)
+        if self.COALESCE_MOTION:
+            events = coalesce_motion(events)
+        frame_profiler.mark("events")
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            self.scene_manager.update_on_event(event)
+        frame_profiler.mark("update_on_event")
+
+        tween.tweener.update(elapsed / 1000)
+        frame_profiler.mark("tweens")
+
+        if self.TICK_RATE is None:
+            touched = self.scene_manager.show()
             self.scene_manager.update()
+            frame_profiler.mark("update")
+        else:
+            touched = self._fixed_step(elapsed)
+
+        if self.profiler_overlay is not None:
+            overlay_rect = self.profiler_overlay.draw(self._overlay_restored)
+            self._overlay_restored = self.scene_manager.damage(overlay_rect)
+            if touched is not None:
+                touched.append(overlay_rect)
+            frame_profiler.mark("overlay")
 
+        if self.DIRTY_RECTS and touched is not None:
+            pygame.display.update(touched)
+        else:
             pygame.display.update()
-            self.clock.tick(self.FPS)
-        pygame.quit()
+        frame_profiler.mark("display")
+
+        if frame_profiler.enabled:
+            current_scene = self.scene_manager.current_scene
+            scene_ = self.scene_manager.scenes.get(current_scene)
+            frame_profiler.end_frame(
+                current_scene,
+                0 if scene_ is None else scene_.particles_count(),
+            )
+
+        return running
+
+    def _fixed_step(self, elapsed: float):
+        """Updates the scenes at the fixed TICK_RATE and draws them
+        once, interpolating between the last two simulation ticks.
+
+        Args:
+
+            elapsed: Milliseconds passed since the previous frame.
+
+        Returns:
+            The areas touched by the scene manager when showing the
+            current scene.
+        """
+
+        tick = 1000 / self.TICK_RATE
+        self._accumulator += elapsed
+
+        ticks = 0
+        while self._accumulator >= tick:
+            if ticks == self.MAX_CATCH_UP_TICKS:
+                self._accumulator %= tick
+                break
+            self.scene_manager.update()
+            self.profiler.mark("update")
+            self._accumulator -= tick
+            ticks += 1
+
+        return self.scene_manager.show(self._accumulator / tick)
 
     @property
     def name(self) -> str:
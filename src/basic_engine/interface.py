@@ -2,16 +2,216 @@
 game interface.
 """
 
+from __future__ import annotations
+
 import textwrap
 
+import pygame
 from pygame import constants, draw, font, mouse, sprite, surface, time
 
+from . import spatial, tween, utils
+
+
+class TextCache:
+    """Cache of fonts and rendered lines of text shared by every Label.
+
+    Fonts are kept by (name, size, bold, italic), and rendered lines
+    by (text, font, colour, antialias) in a LRUCache limited by the
+    bytes used by their surfaces. The cached surfaces are shared, so
+    they mustn't be modified.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        """Initialises the TextCache object.
+
+        Args:
+
+            max_bytes: Budget for the pixels of the rendered lines.
+        """
+
+        self.fonts: dict[tuple, font.Font] = {}
+        self.font_hits = 0
+        self.font_misses = 0
+        self.lines = utils.LRUCache(max_bytes, utils.surface_nbytes)
+
+    def get_font(self, name, size, bold=False, italic=False) -> font.Font:
+        """Gets a system font, loading it only the first time.
+
+        Args:
+
+            name: Name of the system font. None for the default one.
+
+            size: The character size.
+
+            bold: Indicates if the font is bold.
+
+            italic: Indicates if the font is italic.
+        """
+
+        key = (name, size, bold, italic)
+        text_font = self.fonts.get(key)
+        if text_font is None:
+            self.font_misses += 1
+            text_font = font.SysFont(name, size, bold, italic)
+            self.fonts[key] = text_font
+        else:
+            self.font_hits += 1
+
+        return text_font
+
+    def render(self, text, font_key, antialias, colour) -> surface.Surface:
+        """Renders a line of text, unless it was rendered before.
+
+        Args:
+
+            text: Line of text.
+
+            font_key: (name, size, bold, italic) tuple of the font.
+
+            antialias: Indicates if the text is antialiased.
+
+            colour: RGB colour code of the text.
+        """
+
+        key = (text, font_key, tuple(colour), antialias)
+        line = self.lines.get(key)
+        if line is None:
+            line = self.get_font(*font_key).render(text, antialias, colour)
+            self.lines.put(key, line)
+
+        return line
+
+    def clear(self) -> None:
+        """Drops every cached font and line."""
+
+        self.fonts.clear()
+        self.lines.clear()
+
+    def stats(self) -> dict:
+        """Gets the hits and misses of the fonts and lines caches."""
+
+        return {
+            "fonts": len(self.fonts),
+            "font_hits": self.font_hits,
+            "font_misses": self.font_misses,
+            "lines": self.lines.stats(),
+        }
+
+
+text_cache = TextCache()
+
+
+def _clear_text_cache():
+    """Drops the fonts of the text cache when pygame quits, as Font
+    objects can't be used afterwards, even if it's initialised again.
+    """
+
+    text_cache.clear()
+    # pygame forgets its quit functions once they are called.
+    pygame.register_quit(_clear_text_cache)
+
+
+pygame.register_quit(_clear_text_cache)
+
+
+class Widget(sprite.Sprite):
+    """Base class for widgets that keep track of whether they have to
+    be drawn again.
+
+    A widget is considered changed when it was invalidated, because
+    its state or look changed, or when its rect moved since the last
+    draw. Unchanged widgets report no touched area when drawn, so a
+    scene can skip presenting them or drawing at all.
+    """
+
+    # Event types handled by update_on_event.
+    EVENT_TYPES = ()
+
+    def __init__(self):
+        super().__init__()
+
+        self.dirty = True
+        self._drawn_rect = None
+        self._drawn_at = None
+
+        # SpatialHash object the widget is indexed in, if any.
+        self.spatial_hash: spatial.SpatialHash = None
+
+    @property
+    def changed(self) -> bool:
+        """Get whether the widget looks different since its last
+        draw.
+        """
+
+        return self.dirty or self.rect != self._drawn_at
+
+    def invalidate(self) -> None:
+        """Marks the widget as changed, so it's fully drawn again."""
+
+        self.dirty = True
+
+    def next_wakeup(self):
+        """Gets how long the widget stays the same if no event reaches
+        it, so an idle game loop knows how long it can sleep.
+
+        Returns:
+            0 if the widget has to be drawn now, the milliseconds until
+            it changes by itself, or None if it only changes because of
+            events.
+        """
 
-class Button(sprite.Sprite):
+        return 0 if self.changed else None
+
+    def moved(self) -> None:
+        """Updates the widget's area in its spatial hash. It must be
+        called after the rect of an indexed widget changes.
+        """
+
+        if self.spatial_hash is not None:
+            self.spatial_hash.update(self)
+
+    def _mark_drawn(self, rect=None):
+        """Marks the widget as drawn, computing the screen area it has
+        to report.
+
+        Both the area drawn now and the one drawn in the previous call
+        are covered, so that whatever the widget left behind when it
+        moved or shrank gets presented too.
+
+        Args:
+
+            rect: Rect object returned by the blit of the widget. None
+                  if it was drawn into another widget.
+
+        Returns:
+            A Rect object covering the touched area, or None if the
+            widget didn't change.
+        """
+
+        changed = self.dirty or self.rect != self._drawn_at
+        self.dirty = False
+        self._drawn_at = self.rect.copy()
+
+        previous = self._drawn_rect
+        self._drawn_rect = rect
+        if not changed or rect is None:
+            return None
+        if previous is None:
+            return rect
+        return rect.union(previous)
+
+
+class Button(Widget):
     """This class represents a interface button on a game. The button can have
     any look, as it has the off and on variants.
     """
 
+    EVENT_TYPES = (
+        constants.MOUSEMOTION,
+        constants.MOUSEBUTTONDOWN,
+        constants.MOUSEBUTTONUP,
+    )
+
     def __init__(self, screen, button_images, action=None):
         """Initialises the Button object.
 
@@ -39,15 +239,44 @@ class Button(sprite.Sprite):
         self.current_sprite = self.button_off_image
         self.rect = self.current_sprite.get_rect()
         self.action = action
+        self._hit_rect = None
+
+    @property
+    def image(self):
+        """Get the sprite of the button's current state."""
+
+        return self.current_sprite
 
     def draw(self):
-        """Draws the button on the screen."""
+        """Draws the button on the screen.
+
+        Returns:
+            A Rect object representing the area of the screen touched
+            by the button, or None if it didn't change.
+        """
+
+        return self._mark_drawn(self.screen.blit(self.current_sprite, self.rect))
 
-        self.screen.blit(self.current_sprite, self.rect)
+    def _set_sprite(self, button_sprite):
+        if button_sprite is not self.current_sprite:
+            self.current_sprite = button_sprite
+            self.invalidate()
+
+    def _hit_test(self, pos, pressed):
+        """Chooses the button sprite for the given mouse state."""
+
+        self._hit_rect = self.rect.copy()
+        if self.rect.collidepoint(pos):
+            if pressed:
+                self._set_sprite(self.button_clicked_image)
+            else:
+                self._set_sprite(self.button_on_image)
+        else:
+            self._set_sprite(self.button_off_image)
 
     def update_on_event(self, event):
         """Does a given action for each mouse right button releases on
-        the button.
+        the button, and follows the mouse to hover or press it.
 
         Args:
 
@@ -55,28 +284,28 @@ class Button(sprite.Sprite):
                    loop.
         """
 
-        if event.type == constants.MOUSEBUTTONUP:
-            if self.rect.collidepoint(event.pos) and event.button == 1:
-                self.current_sprite = self.button_off_image
-                if self.action is not None:
-                    self.action()
+        if event.type == constants.MOUSEMOTION:
+            self._hit_test(event.pos, event.buttons[0])
+        elif event.type == constants.MOUSEBUTTONDOWN and event.button == 1:
+            self._hit_test(event.pos, True)
+        elif event.type == constants.MOUSEBUTTONUP and event.button == 1:
+            self._hit_test(event.pos, False)
+            if self.rect.collidepoint(event.pos) and self.action is not None:
+                self.action()
 
     def update(self):
         """Updates the button according to the user actions.
 
         User actions == Hover the mouse on the button, Click the
-        button and etc.
+        button and etc. They're followed through update_on_event, so
+        the mouse is only polled when the button itself moved.
         """
 
-        if self.rect.collidepoint(mouse.get_pos()):
-            self.current_sprite = self.button_on_image
-            if mouse.get_pressed()[0]:
-                self.current_sprite = self.button_clicked_image
-        else:
-            self.current_sprite = self.button_off_image
+        if self.rect != self._hit_rect:
+            self._hit_test(mouse.get_pos(), mouse.get_pressed()[0])
 
 
-class Label(sprite.Sprite):
+class Label(Widget):
     """Class that represents a label on a game."""
 
     def __init__(self, screen, text, **text_attrs):
@@ -106,13 +335,19 @@ class Label(sprite.Sprite):
             "italic": False,
             "antialised": True,
         } | text_attrs
+        self.text = text
         self.image = self.__create_image(text, self.text_attrs)
         self.rect = self.image.get_rect()
 
     def draw(self):
-        """Draws the text into screen"""
+        """Draws the text into screen
 
-        self.screen.blit(self.image, self.rect)
+        Returns:
+            A Rect object representing the area of the screen touched
+            by the label, or None if it didn't change.
+        """
+
+        return self._mark_drawn(self.screen.blit(self.image, self.rect))
 
     def update_text(self, new_text, **text_attrs):
         """It updates the text, therefore updating the surface.
@@ -129,8 +364,12 @@ class Label(sprite.Sprite):
                 The attributes to be update as well.
         """
         text_attrs = self.text_attrs | text_attrs
+        if new_text == self.text and text_attrs == self._image_attrs:
+            return
 
+        self.text = new_text
         self.image = self.__create_image(new_text, text_attrs)
+        self.invalidate()
 
     def __create_image(self, text, text_attrs):
         """Generates a Surface object that contains a wrapped text.
@@ -178,11 +417,14 @@ class Label(sprite.Sprite):
             fact the rendered text.
         """
 
-        text_font = font.SysFont(
+        font_key = (
             None, text_attrs["size"], text_attrs["bold"], text_attrs["italic"]
         )
+        text_font = text_cache.get_font(*font_key)
         rendered_paragraph = [
-            text_font.render(phrase, text_attrs["antialised"], text_attrs["colour"])
+            text_cache.render(
+                phrase, font_key, text_attrs["antialised"], text_attrs["colour"]
+            )
             for phrase in textwrap.wrap(text, text_attrs["chars_per_line"])
         ]
 
@@ -202,10 +444,11 @@ class Label(sprite.Sprite):
             text_bg.blit(phrase, rect)
             row += text_font.get_height() + text_attrs["ypadding"]
 
+        self._image_attrs = text_attrs
         return text_bg
 
 
-class ButtonBar(sprite.Sprite):
+class ButtonBar(Widget):
     """Class that represents a right slidable bar of buttons located to the
     right of the screen.
 
@@ -214,9 +457,15 @@ class ButtonBar(sprite.Sprite):
         * A cell system, separating each available node.
     """
 
+    EVENT_TYPES = Button.EVENT_TYPES
     PADDING = 4
     SPACING = 10
-    ANIMATION_SPEED = 20
+    # Seconds the bar takes to slide in or out, and how it eases.
+    ANIMATION_DURATION = 0.25
+    # Pixels slid each frame at 60 FPS, as bars used to be animated.
+    # When set, the duration is worked out from it instead.
+    ANIMATION_SPEED = None
+    ANIMATION_EASING = staticmethod(tween.ease_out_cubic)
     BAR_COLOUR = (1, 38, 31)
     BUTTON_SPRITE_RADIUS = 4
 
@@ -247,6 +496,8 @@ class ButtonBar(sprite.Sprite):
 
         """
 
+        super().__init__()
+
         self.screen = screen
         self.screen_rect = screen.get_rect()
         self.active = False
@@ -269,6 +520,9 @@ class ButtonBar(sprite.Sprite):
             colour_args.get("bar_outline_colour") or (78, 79, 235),
         )
         self.bar_rect = self.bar_image.get_rect()
+        # The bar composed with its title and buttons.
+        self.image = self.bar_image
+        self.rect = self.bar_rect
 
         active_button_images = [
             self._create_button_sprite(
@@ -288,10 +542,16 @@ class ButtonBar(sprite.Sprite):
             ),
         ]
 
-        def button_bar_action():
-            self.on_animation = True
+        self.active_button = Button(screen, active_button_images, self.toggle)
 
-        self.active_button = Button(screen, active_button_images, button_bar_action)
+        # Index of the options, so mouse events only reach the buttons
+        # under the pointer.
+        self.buttons_hash = spatial.SpatialHash(
+            max(button.rect.height for button in self.buttons)
+        )
+        for button in self.buttons:
+            self.buttons_hash.insert(button)
+        self._hovered: list[Button] = []
 
         self.bar_rect.centery = self.screen_rect.centery
         if position == "right":
@@ -303,62 +563,110 @@ class ButtonBar(sprite.Sprite):
 
         self._update()
 
+    @property
+    def changed(self) -> bool:
+        """Get whether the bar, its title, its buttons or its pull
+        button look different since the last draw.
+        """
+
+        return (
+            super().changed
+            or self.active_button.changed
+            or any(widget.changed for widget in self._content())
+        )
+
     def draw(self):
-        self.screen.blit(self.bar_image, self.bar_rect)
-        self.active_button.draw()
-        if self.active:
-            self.label.draw()
-            for button in self.buttons:
-                button.draw()
+        if any(widget.changed for widget in self._content()):
+            self.invalidate()
+        if self.dirty:
+            self._compose()
+
+        touched = [
+            self._mark_drawn(self.screen.blit(self.image, self.bar_rect)),
+            self.active_button.draw(),
+        ]
+        touched = [rect for rect in touched if rect is not None]
+        if not touched:
+            return None
+        return touched[0].unionall(touched[1:])
+
+    def _content(self):
+        """Gets the widgets shown inside the bar."""
+
+        return [self.label] + self.buttons if self.active else []
+
+    def _compose(self):
+        """Draws the title and the buttons into the bar image."""
+
+        self.image = self.bar_image.copy()
+        for widget in self._content():
+            self.image.blit(
+                widget.image, widget.rect.move(-self.bar_rect.x, -self.bar_rect.y)
+            )
+            widget._mark_drawn()
 
     def update(self):
         self.active_button.update()
-        if self.on_animation:
-            self._slide()
-            self._update()
-        else:
-            if self.active:
-                for button in self.buttons:
-                    button.update()
+        # The slide itself is advanced by the tweener.
+        if self.active and not self.on_animation:
+            for button in self.buttons:
+                button.update()
 
     def update_on_event(self, event):
-        for button in self.buttons:
-            button.update_on_event(event)
+        if event.type not in self.EVENT_TYPES:
+            return
+
+        # The options can't be reached while the bar is hidden.
+        if self.active and not self.on_animation:
+            targets = self.buttons_hash.query_point(event.pos)
+            if event.type == constants.MOUSEMOTION:
+                # The buttons left by the pointer must stop hovering.
+                hovered = targets
+                targets = targets + [
+                    button for button in self._hovered if button not in hovered
+                ]
+                self._hovered = hovered
+            for button in targets:
+                button.update_on_event(event)
         self.active_button.update_on_event(event)
 
-    def _slide(self):
-        if self.active:
-            # We slide it out of the screen
-            if self.position == "right":
-                if self.bar_rect.x + self.ANIMATION_SPEED >= self.screen_rect.right:
-                    self.bar_rect.left = self.screen_rect.right
-                    self.on_animation = False
-                    self.active = False
-                else:
-                    self.bar_rect.x += self.ANIMATION_SPEED
-            elif self.position == "left":
-                if self.bar_rect.right - self.ANIMATION_SPEED <= self.screen_rect.left:
-                    self.bar_rect.right = self.screen_rect.left
-                    self.on_animation = False
-                    self.active = False
-                else:
-                    self.bar_rect.right -= self.ANIMATION_SPEED
+    def toggle(self) -> None:
+        """Starts sliding the bar in or out of the screen. Nothing is
+        done while it's already sliding.
+        """
+
+        if self.on_animation:
+            return
+
+        self.on_animation = True
+        if self.position == "right":
+            shown_x = self.screen_rect.right - self.bar_rect.width
+            hidden_x = self.screen_rect.right
         else:
-            # We make the button bar visible
-            if self.position == "right":
-                if self.bar_rect.right - self.ANIMATION_SPEED <= self.screen_rect.right:
-                    self.bar_rect.right = self.screen_rect.right
-                    self.on_animation = False
-                    self.active = True
-                else:
-                    self.bar_rect.right -= self.ANIMATION_SPEED
-            elif self.position == "left":
-                if self.bar_rect.x + self.ANIMATION_SPEED >= self.screen_rect.left:
-                    self.bar_rect.left = self.screen_rect.left
-                    self.on_animation = False
-                    self.active = True
-                else:
-                    self.bar_rect.x += self.ANIMATION_SPEED
+            shown_x = self.screen_rect.left
+            hidden_x = self.screen_rect.left - self.bar_rect.width
+
+        duration = self.ANIMATION_DURATION
+        if self.ANIMATION_SPEED:
+            duration = self.bar_rect.width / (60 * self.ANIMATION_SPEED)
+
+        tween.tweener.add(tween.Tween(
+            duration,
+            self._slide,
+            self.bar_rect.x,
+            hidden_x if self.active else shown_x,
+            self.ANIMATION_EASING,
+            self._end_slide,
+        ))
+
+    def _slide(self, x):
+        self.bar_rect.x = round(x)
+        self._update()
+
+    def _end_slide(self):
+        self.on_animation = False
+        self.active = not self.active
+        self.invalidate()
 
     @classmethod
     def _create_text_buttons(
@@ -513,6 +821,9 @@ class ButtonBar(sprite.Sprite):
             button.rect.centerx = self.bar_rect.centerx
             button.rect.y = y
             y = self.SPACING + button.rect.bottom
+            self.buttons_hash.update(button)
+
+        self.moved()
 
     @classmethod
     def _bar_height(cls, widgets):
@@ -523,7 +834,7 @@ class ButtonBar(sprite.Sprite):
         return 2 * all_w_height + 2 * cls.PADDING
 
 
-class Chronometer(sprite.Sprite):
+class Chronometer(Widget):
     """Graphical implementation of a Chronometer."""
 
     def __init__(self, screen, colour):
@@ -539,13 +850,30 @@ class Chronometer(sprite.Sprite):
         self.starting_ticks = 0
         self.seconds = 0
 
+    @property
+    def changed(self) -> bool:
+        return self.label.changed
+
+    def invalidate(self) -> None:
+        self.label.invalidate()
+
     def draw(self):
-        self.label.draw()
-    
+        return self.label.draw()
+
+    def next_wakeup(self):
+        if self.changed:
+            return 0
+        if not self.ticking:
+            return None
+        # Until the next second is shown.
+        return 1000 - (time.get_ticks() - self.starting_ticks) % 1000
+
     def update(self):
         if self.ticking:
-            self.seconds = (time.get_ticks() - self.starting_ticks) // 1000
-            self.label.update_text(self.next_clock_text(self.seconds))
+            seconds = (time.get_ticks() - self.starting_ticks) // 1000
+            if seconds != self.seconds:
+                self.seconds = seconds
+                self.label.update_text(self.next_clock_text(self.seconds))
 
     def start(self):
         """Starts counting."""
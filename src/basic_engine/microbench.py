@@ -0,0 +1,484 @@
+"""Module for timing the engine's hot paths, one operation at a time.
+
+Unlike the benchmark runner, which times whole frames of a game, each
+case repeats a single operation, like creating a label or updating
+particles, so a slowdown shows up in the operation that caused it. It
+uses SDL's dummy drivers, so no display is needed:
+
+    python -m basic_engine.microbench [CASE ...] [--repeat N]
+                                      [--min-time SECONDS] [--output FILE]
+                                      [--compare BASELINE]
+                                      [--threshold PERCENT]
+
+Where each CASE is the name of a case, or the start of it, e.g.
+"button_bar" runs the ButtonBar construction with every amount of
+options. With --compare, the results are checked against a file
+written with --output, and the exit status is 1 if any case got slower
+than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import functools
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import wave
+
+import pygame
+from pygame import constants, surface
+
+from . import benchmark, effects, interface, scene, transition, tween, utils
+
+SCREEN_SIZE = (600, 400)
+
+# Name -> generator function setting a case up, yielding the operation
+# to be timed and cleaning up after it.
+CASES = {}
+
+
+def case(name: str, *params):
+    """Registers a case, once for each of the given parameters, which
+    are passed to the function and appended to the name in brackets.
+
+    Args:
+
+        name: Name of the case.
+
+        params: Values the case is run with, e.g. amounts of objects.
+    """
+
+    def register(setup):
+        if not params:
+            CASES[name] = setup
+        for param in params:
+            CASES[f"{name}[{param}]"] = functools.partial(setup, param)
+        return setup
+
+    return register
+
+
+def _screen() -> surface.Surface:
+    """Gets the display surface, setting the mode if needed."""
+
+    return pygame.display.get_surface() \
+        or pygame.display.set_mode(SCREEN_SIZE)
+
+
+@case("label_create")
+def label_create():
+    screen = _screen()
+    yield lambda: interface.Label(screen, "Score: 1200", size=24)
+
+
+@case("label_update_text")
+def label_update_text():
+    label = interface.Label(_screen(), "Score: 0", size=24)
+    scores = itertools.cycle(range(0, 1000, 10))
+    yield lambda: label.update_text(f"Score: {next(scores)}")
+
+
+@case("button_bar", 4, 50, 500)
+def button_bar(options):
+    screen = _screen()
+    actions = [(f"Option {index}", None) for index in range(options)]
+    yield lambda: interface.ButtonBar(screen, "Options", "right", *actions)
+
+
+@case("particle_update", 100, 1000, 10000)
+def particle_update(amount):
+    screen = _screen()
+    pool = effects.ParticlePool(screen, surface.Surface((4, 4)), amount)
+
+    def operation():
+        # Particles leave the screen on their first update, so they
+        # are spawned again from the pool every time.
+        effects.Particle.create_particles(
+            screen, None, *screen.get_rect().center, amount, pool
+        ).update()
+
+    yield operation
+
+
+@case("particle_draw", 100, 1000, 10000)
+def particle_draw(amount):
+    screen = _screen()
+    group = effects.Particle.create_particles(
+        screen, surface.Surface((4, 4)), *screen.get_rect().center, amount
+    )
+    yield lambda: group.draw(screen)
+
+
+@case("particle_system_update", 100, 1000, 10000)
+def particle_system_update(amount):
+    screen = _screen()
+    particles = effects.ParticleSystem(screen, surface.Surface((4, 4)),
+                                       amount, seed=0)
+    # Still particles, so they all stay alive.
+    particles.emit(*screen.get_rect().center, amount,
+                   velocity=((0, 0), (0, 0)), acceleration=((0, 0), (0, 0)))
+    yield particles.update
+
+
+@case("particle_system_draw", 100, 1000, 10000)
+def particle_system_draw(amount):
+    screen = _screen()
+    particles = effects.ParticleSystem(screen, surface.Surface((4, 4)),
+                                       amount, seed=0)
+    width, height = screen.get_size()
+    particles.emit(width / 2, height / 2, amount,
+                   velocity=((-width / 2, width / 2),
+                             (-height / 2, height / 2)))
+    # Spread them over the screen.
+    particles.update()
+    yield particles.draw
+
+
+class _ColourScene(scene.Scene):
+    """Scene filling the screen with a colour."""
+
+    def __init__(self, screen: surface.Surface, colour):
+        super().__init__(screen)
+
+        self.colour = colour
+
+    def draw(self, alpha=1.0):
+        self.screen.fill(self.colour)
+
+
+@case("fade_transition")
+def fade_transition():
+    screen = _screen()
+    manager = scene.SceneManager()
+    manager.add("red", _ColourScene(screen, (255, 0, 0)))
+    manager.add("blue", _ColourScene(screen, (0, 0, 255)))
+    manager.show()
+
+    def operation():
+        if not manager.on_transition:
+            next_scene = "blue" if manager.current_scene == "red" else "red"
+            manager.change_scene(next_scene, transition.FadeTransition(
+                screen, manager, next_scene, (0, 0, 0), duration=0.5
+            ))
+        tween.tweener.update(1 / 60)
+        manager.show()
+
+    yield operation
+    manager.shutdown()
+    tween.tweener.clear()
+
+
+class _BarScene(scene.Scene):
+    """Scene giving the mouse events to an open ButtonBar."""
+
+    EVENT_TYPES = interface.ButtonBar.EVENT_TYPES
+
+    def __init__(self, screen: surface.Surface, options: int):
+        super().__init__(screen)
+
+        self.bar = interface.ButtonBar(
+            screen, "Options", "right",
+            *[(f"Option {index}", None) for index in range(options)]
+        )
+        self.listen(self.bar.update_on_event, *self.bar.EVENT_TYPES)
+
+
+@case("scene_dispatch")
+def scene_dispatch():
+    scene_ = _BarScene(_screen(), 50)
+    manager = scene.SceneManager()
+    manager.add("bar", scene_)
+
+    scene_.bar.toggle()
+    tween.tweener.update(scene_.bar.ANIMATION_DURATION)
+    # Moves the pointer from button to button.
+    events = itertools.cycle([
+        pygame.event.Event(constants.MOUSEMOTION, pos=button.rect.center,
+                           rel=(0, 1), buttons=(0, 0, 0))
+        for button in scene_.bar.buttons
+    ])
+    yield lambda: manager.update_on_event(next(events))
+    manager.shutdown()
+    tween.tweener.clear()
+
+
+@case("load_image")
+def load_image():
+    _screen()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "image.png")
+        image = surface.Surface((256, 256), constants.SRCALPHA)
+        image.fill((200, 100, 50, 128))
+        pygame.image.save(image, path)
+        yield lambda: utils.load_image(path)
+
+
+@case("load_soundfx", "cold", "decoded", "cached")
+def load_soundfx(state):
+    pygame.mixer.init()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sound.wav")
+        with wave.open(path, "wb") as sound_file:
+            sound_file.setnchannels(2)
+            sound_file.setsampwidth(2)
+            sound_file.setframerate(44100)
+            sound_file.writeframes(bytes(4 * 44100 // 2))
+
+        def operation():
+            # Drops what the state says isn't cached yet.
+            if state == "cold":
+                utils.soundfx_cache.clear()
+            elif state == "decoded":
+                utils.soundfx_cache.pop((path, 0.5))
+            utils.load_soundfx(path, 0.5)
+
+        yield operation
+        utils.soundfx_cache.clear()
+
+
+@case("game_frame", *benchmark.TARGETS)
+def game_frame(target):
+    game_ = benchmark.load_target(target)()
+
+    def operation():
+        # Everything is drawn, as if the whole scene changed.
+        game_.scene_manager.full_redraw = True
+        game_.run_frame(1000 / (game_.FPS or benchmark.UNCAPPED_FPS))
+
+    yield operation
+    game_.scene_manager.shutdown()
+
+
+class CaseResult:
+    """Timings of a case."""
+
+    def __init__(self, name: str, calls: int, times: list[float]):
+        """Initialises the CaseResult object.
+
+        Args:
+
+            name: Name of the case.
+
+            calls: Amount of times the operation was called in each
+                   round.
+
+            times: Average duration of a call in each round, in
+                   seconds.
+        """
+
+        self.name = name
+        self.calls = calls
+        self.times = times
+
+    @property
+    def best(self) -> float:
+        """Get the duration of a call in the fastest round, in seconds.
+        It's the least disturbed by whatever else the machine was doing.
+        """
+
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        """Get the median duration of a call, in seconds."""
+
+        return statistics.median(self.times)
+
+    def to_dict(self) -> dict:
+        """Gets the result as a JSON serialisable dict."""
+
+        return {
+            "calls": self.calls,
+            "best_us": 1e6 * self.best,
+            "median_us": 1e6 * self.median,
+            "rounds_us": [1e6 * round_time for round_time in self.times],
+        }
+
+    def __str__(self) -> str:
+        return (f"{self.name:<30} {1e6 * self.best:12.2f}us "
+                f"median={1e6 * self.median:.2f}us "
+                f"({len(self.times)}x{self.calls} calls)")
+
+
+def select(patterns: list[str]) -> list[str]:
+    """Gets the names of the cases matching any of the given patterns.
+
+    Args:
+
+        patterns: Names of cases or their beginnings. Every case is
+                  selected if it's empty.
+
+    Raises:
+        ValueError: A pattern matches no case.
+    """
+
+    if not patterns:
+        return list(CASES)
+
+    names = []
+    for pattern in patterns:
+        matched = [name for name in CASES if name.startswith(pattern)]
+        if not matched:
+            raise ValueError(f"{pattern} matches no case")
+        names.extend(name for name in matched if name not in names)
+    return names
+
+
+def run(name: str, repeat: int = 5, min_time: float = 0.1) -> CaseResult:
+    """Times a case. The operation is called as many times as needed
+    for a round to last min_time, and the rounds are repeated.
+
+    Args:
+
+        name: Name of the case.
+
+        repeat: Amount of rounds.
+
+        min_time: Minimum seconds a round lasts.
+
+    Returns:
+        A CaseResult object with the collected timings.
+    """
+
+    with contextlib.contextmanager(CASES[name])() as operation:
+        # Warm up caches, e.g. the text cache of labels.
+        operation()
+
+        timer = timeit.Timer(operation, timer=time.perf_counter)
+        calls = 1
+        while timer.timeit(calls) < min_time:
+            calls *= 2
+
+        rounds = timer.repeat(repeat, calls)
+
+    return CaseResult(name, calls, [round_time / calls
+                                    for round_time in rounds])
+
+
+def to_json(results: list[CaseResult]) -> dict:
+    """Gets results as a JSON serialisable dict, along with the
+    versions they were taken with.
+    """
+
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "cases": {result.name: result.to_dict() for result in results},
+    }
+
+
+def compare(baseline: dict, results: list[CaseResult],
+            threshold: float = 10.0) -> list[dict]:
+    """Compares the best times of results with the ones of a baseline.
+
+    Args:
+
+        baseline: Dict written by to_json.
+
+        results: CaseResult objects to be compared. The ones missing
+                 from the baseline are skipped.
+
+        threshold: Percentage a case can get slower before it's
+                   considered a regression.
+
+    Returns:
+        A dict for each case compared, with its name, its best times
+        in microseconds, the change in percent and whether it's a
+        regression.
+    """
+
+    comparisons = []
+    for result in results:
+        previous = baseline["cases"].get(result.name)
+        if previous is None:
+            continue
+
+        current_us = 1e6 * result.best
+        change = 100 * (current_us / previous["best_us"] - 1)
+        comparisons.append({
+            "name": result.name,
+            "baseline_us": previous["best_us"],
+            "current_us": current_us,
+            "change": change,
+            "regression": change > threshold,
+        })
+
+    return comparisons
+
+
+def main(argv: list[str] = None) -> int:
+    """Entry point of the microbenchmarks."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m basic_engine.microbench",
+        description="Times the engine's hot paths one at a time.",
+    )
+    parser.add_argument("cases", nargs="*",
+                        help="name of a case or its beginning")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="rounds run for each case")
+    parser.add_argument("--min-time", type=float, default=0.1,
+                        help="minimum seconds each round lasts")
+    parser.add_argument("--output", help="writes the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="results written with --output to compare "
+                             "with")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percentage a case can get slower before "
+                             "failing the comparison")
+    parser.add_argument("--list", action="store_true",
+                        help="lists the cases and exits")
+    args = parser.parse_args(argv)
+
+    try:
+        names = select(args.cases)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    benchmark.use_dummy_drivers()
+    pygame.init()
+
+    results = []
+    for name in names:
+        result = run(name, args.repeat, args.min_time)
+        results.append(result)
+        print(result)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(to_json(results), output, indent=2)
+
+    status = 0
+    if baseline is not None:
+        print(f"\nCompared with {args.compare}:")
+        for comparison in compare(baseline, results, args.threshold):
+            flag = "REGRESSION" if comparison["regression"] else ""
+            print(f"{comparison['name']:<30} "
+                  f"{comparison['baseline_us']:12.2f}us -> "
+                  f"{comparison['current_us']:12.2f}us "
+                  f"{comparison['change']:+7.1f}% {flag}")
+            if comparison["regression"]:
+                status = 1
+
+    pygame.quit()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,683 @@
+"""Module for finding paths on grids.
+
+Grids keep the cost of entering each cell in a flat byte array, with a
+border of blocked cells around it, so the searches walk integer
+indices without bounds checks. A*, Dijkstra, breadth-first search,
+depth-first search and jump point search are available, and queries
+can be solved in batches, on a process pool, so long searches don't
+stall the frames. Their results come back as PATH_EVENT events.
+"""
+
+from __future__ import annotations
+
+import array
+import collections
+import concurrent.futures
+import heapq
+import itertools
+import math
+
+import pygame
+
+# Event posted when a job of a PathfindingPool ends.
+PATH_EVENT = pygame.event.custom_type()
+
+# Agents sharing a goal from which a batch computes a single distance
+# field to the goal, instead of a search per agent.
+FIELD_THRESHOLD = 8
+
+SQRT2 = math.sqrt(2)
+
+
+class Grid:
+    """Grid of cells with a movement cost each.
+
+    A cost of 0 blocks the cell, and costs from 1 to 255 are what
+    entering the cell adds to a path. Breadth-first, depth-first and
+    jump point searches ignore the costs of the walkable cells.
+    """
+
+    def __init__(self, width: int, height: int, costs=None):
+        """Initialises the Grid object.
+
+        Args:
+
+            width: Width of the grid, in cells.
+
+            height: Height of the grid, in cells.
+
+            costs: Iterable of width * height costs, row by row.
+                   Defaults to every cell costing 1.
+        """
+
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.cells = bytearray(self.stride * (height + 2))
+
+        if costs is None:
+            row = bytes([1]) * width
+            for y in range(height):
+                start = self.index(0, y)
+                self.cells[start:start + width] = row
+        else:
+            costs = bytes(costs)
+            if len(costs) != width * height:
+                raise ValueError(f"The grid needs {width * height} costs, "
+                                 f"not {len(costs)}")
+            for y in range(height):
+                start = self.index(0, y)
+                self.cells[start:start + width] = \
+                    costs[y * width:(y + 1) * width]
+
+    @classmethod
+    def from_rows(cls, rows: list[str], blocked: str = "#") -> "Grid":
+        """Builds a grid from strings, one per row, where the blocked
+        character is a wall and any other one is a cell costing 1, or
+        its value if it's a digit.
+        """
+
+        costs = [
+            0 if char == blocked else int(char) if char.isdigit() else 1
+            for row in rows for char in row
+        ]
+        return cls(len(rows[0]), len(rows), costs)
+
+    def index(self, x: int, y: int) -> int:
+        """Gets the index of a cell in the cells array."""
+
+        return (y + 1) * self.stride + x + 1
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Gets the (x, y) position of an index of the cells array."""
+
+        y, x = divmod(index, self.stride)
+        return (x - 1, y - 1)
+
+    def __getitem__(self, pos) -> int:
+        return self.cells[self.index(*pos)]
+
+    def __setitem__(self, pos, cost: int):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"{pos} is out of the grid")
+        self.cells[self.index(x, y)] = cost
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """Gets whether a position is in the grid and not blocked."""
+
+        return 0 <= x < self.width and 0 <= y < self.height \
+            and self.cells[self.index(x, y)] != 0
+
+    def moves(self, diagonal: bool = False) -> list[tuple]:
+        """Gets the moves from a cell to its neighbours.
+
+        Returns:
+            A list of (offset, length, side, other side) tuples, where
+            the sides are the offsets of the cells a diagonal move
+            passes by, which must be walkable, and are 0 otherwise.
+        """
+
+        stride = self.stride
+        moves = [(1, 1, 0, 0), (-1, 1, 0, 0),
+                 (stride, 1, 0, 0), (-stride, 1, 0, 0)]
+        if diagonal:
+            for dx, dy in ((1, 1), (-1, 1), (1, -1), (-1, -1)):
+                moves.append((dx + dy * stride, SQRT2, dx, dy * stride))
+        return moves
+
+
+def _trace(grid, parents, index):
+    path = []
+    while index is not None:
+        path.append(grid.position(index))
+        index = parents[index]
+    path.reverse()
+    return path
+
+
+def _endpoints(grid, start, goal):
+    """Gets the indices of the start and the goal, or None if either
+    of them is blocked.
+    """
+
+    if not (grid.is_walkable(*start) and grid.is_walkable(*goal)):
+        return None
+    return grid.index(*start), grid.index(*goal)
+
+
+def _best_first(grid, start, goal, diagonal, heuristic):
+    endpoints = _endpoints(grid, start, goal)
+    if endpoints is None:
+        return None
+    start_index, goal_index = endpoints
+
+    cells = grid.cells
+    stride = grid.stride
+    moves = grid.moves(diagonal)
+    goal_y, goal_x = divmod(goal_index, stride)
+
+    costs = {start_index: 0}
+    parents = {start_index: None}
+    # Ties are broken towards the deepest entry, which is likely the
+    # closest to the goal.
+    heap = [(0, 0, start_index)]
+    while heap:
+        _, cost, index = heapq.heappop(heap)
+        cost = -cost
+        if index == goal_index:
+            return _trace(grid, parents, index)
+        if cost > costs[index]:
+            # Stale entry of a cell reached again for less.
+            continue
+
+        for offset, length, side, other_side in moves:
+            neighbour = index + offset
+            cell_cost = cells[neighbour]
+            if not cell_cost:
+                continue
+            if side and not (cells[index + side]
+                             and cells[index + other_side]):
+                continue
+
+            new_cost = cost + cell_cost * length
+            if new_cost < costs.get(neighbour, math.inf):
+                costs[neighbour] = new_cost
+                parents[neighbour] = index
+                estimate = new_cost
+                if heuristic is not None:
+                    y, x = divmod(neighbour, stride)
+                    estimate += heuristic(abs(x - goal_x), abs(y - goal_y))
+                heapq.heappush(heap, (estimate, -new_cost, neighbour))
+
+    return None
+
+
+def manhattan(dx: int, dy: int) -> float:
+    return dx + dy
+
+
+def octile(dx: int, dy: int) -> float:
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+def astar(grid: Grid, start, goal, diagonal: bool = False) -> list:
+    """Finds the cheapest path with the A* algorithm.
+
+    Args:
+
+        grid: Grid object.
+
+        start: (x, y) position where the path starts.
+
+        goal: (x, y) position where the path ends.
+
+        diagonal: Whether diagonal moves are allowed. They can't cut
+                  the corners of blocked cells.
+
+    Returns:
+        A list of (x, y) positions from the start to the goal, both
+        included, or None if the goal can't be reached.
+    """
+
+    return _best_first(grid, start, goal, diagonal,
+                       octile if diagonal else manhattan)
+
+
+def dijkstra(grid: Grid, start, goal, diagonal: bool = False) -> list:
+    """Finds the cheapest path with Dijkstra's algorithm. It takes the
+    same arguments and returns the same as astar.
+    """
+
+    return _best_first(grid, start, goal, diagonal, None)
+
+
+def bfs(grid: Grid, start, goal, diagonal: bool = False) -> list:
+    """Finds the path with the fewest moves with a breadth-first search.
+    It takes the same arguments and returns the same as astar.
+    """
+
+    endpoints = _endpoints(grid, start, goal)
+    if endpoints is None:
+        return None
+    start_index, goal_index = endpoints
+
+    cells = grid.cells
+    moves = grid.moves(diagonal)
+    parents = {start_index: None}
+    queue = collections.deque([start_index])
+    while queue:
+        index = queue.popleft()
+        if index == goal_index:
+            return _trace(grid, parents, index)
+
+        for offset, _, side, other_side in moves:
+            neighbour = index + offset
+            if neighbour in parents or not cells[neighbour]:
+                continue
+            if side and not (cells[index + side]
+                             and cells[index + other_side]):
+                continue
+            parents[neighbour] = index
+            queue.append(neighbour)
+
+    return None
+
+
+def dfs(grid: Grid, start, goal, diagonal: bool = False) -> list:
+    """Finds a path, not necessarily a short one, with a depth-first
+    search. It takes the same arguments and returns the same as astar.
+    """
+
+    endpoints = _endpoints(grid, start, goal)
+    if endpoints is None:
+        return None
+    start_index, goal_index = endpoints
+
+    cells = grid.cells
+    moves = grid.moves(diagonal)
+    parents = {start_index: None}
+    stack = [start_index]
+    while stack:
+        index = stack.pop()
+        if index == goal_index:
+            return _trace(grid, parents, index)
+
+        for offset, _, side, other_side in moves:
+            neighbour = index + offset
+            if neighbour in parents or not cells[neighbour]:
+                continue
+            if side and not (cells[index + side]
+                             and cells[index + other_side]):
+                continue
+            parents[neighbour] = index
+            stack.append(neighbour)
+
+    return None
+
+
+def jps(grid: Grid, start, goal, diagonal: bool = True) -> list:
+    """Finds the shortest path with jump point search, which skips the
+    cells of straight runs through open areas. The costs of the
+    walkable cells are ignored.
+
+    It takes the same arguments and returns the same as astar, but
+    allows diagonal moves by default. Without them, vertical runs stop
+    wherever a horizontal run from them would find a jump point. The
+    returned path has every cell, not only the jump points.
+    """
+
+    endpoints = _endpoints(grid, start, goal)
+    if endpoints is None:
+        return None
+    start_index, goal_index = endpoints
+
+    cells = grid.cells
+    stride = grid.stride
+    goal_y, goal_x = divmod(goal_index, stride)
+    heuristic = octile if diagonal else manhattan
+
+    def jump(index, dx, dy):
+        """Gets the next jump point from index in a direction, or None."""
+
+        step = dx + dy * stride
+        if dx and dy:
+            while True:
+                if not cells[index]:
+                    return None
+                if index == goal_index:
+                    return index
+                if jump(index + dx, dx, 0) is not None \
+                        or jump(index + dy * stride, 0, dy) is not None:
+                    return index
+                if not (cells[index + dx] and cells[index + dy * stride]):
+                    return None
+                index += step
+
+        # Cells on both sides of a straight run.
+        side = stride if dx else 1
+        while True:
+            if not cells[index]:
+                return None
+            if index == goal_index:
+                return index
+            if (cells[index + side] and not cells[index + side - step]) or \
+                    (cells[index - side] and not cells[index - side - step]):
+                return index
+            if not diagonal and dy and (jump(index + 1, 1, 0) is not None
+                                        or jump(index - 1, -1, 0) is not None):
+                return index
+            index += step
+
+    def neighbours(index, parent):
+        """Yields the directions worth jumping to from a jump point."""
+
+        if parent is None:
+            for offset, _, side, other_side in grid.moves(diagonal):
+                if cells[index + offset] and (
+                        not side or (cells[index + side]
+                                     and cells[index + other_side])):
+                    y, x = divmod(offset + stride + 1, stride)
+                    yield x - 1, y - 1
+            return
+
+        y, x = divmod(index, stride)
+        parent_y, parent_x = divmod(parent, stride)
+        dx = (x > parent_x) - (x < parent_x)
+        dy = (y > parent_y) - (y < parent_y)
+
+        if dx and dy:
+            vertical = cells[index + dy * stride]
+            horizontal = cells[index + dx]
+            if vertical:
+                yield 0, dy
+            if horizontal:
+                yield dx, 0
+            if vertical and horizontal and cells[index + dx + dy * stride]:
+                yield dx, dy
+            return
+
+        forward = dx + dy * stride
+        side = stride if dx else 1
+        ahead = cells[index + forward]
+        for sign in (1, -1):
+            if cells[index + sign * side]:
+                side_x, side_y = (0, sign) if dx else (sign, 0)
+                yield side_x, side_y
+                if ahead and diagonal:
+                    yield dx + side_x, dy + side_y
+        if ahead:
+            yield dx, dy
+
+    costs = {start_index: 0}
+    parents = {start_index: None}
+    heap = [(0, 0, start_index)]
+    while heap:
+        _, cost, index = heapq.heappop(heap)
+        cost = -cost
+        if index == goal_index:
+            return _expand(grid, _trace(grid, parents, index))
+        if cost > costs[index]:
+            continue
+
+        y, x = divmod(index, stride)
+        for dx, dy in neighbours(index, parents[index]):
+            point = jump(index + dx + dy * stride, dx, dy)
+            if point is None:
+                continue
+            point_y, point_x = divmod(point, stride)
+            new_cost = cost + heuristic(abs(point_x - x), abs(point_y - y))
+            if new_cost < costs.get(point, math.inf):
+                costs[point] = new_cost
+                parents[point] = index
+                heapq.heappush(heap, (
+                    new_cost + heuristic(abs(point_x - goal_x),
+                                         abs(point_y - goal_y)),
+                    -new_cost, point,
+                ))
+
+    return None
+
+
+def _expand(grid, jump_points):
+    """Fills the straight and diagonal runs between jump points."""
+
+    path = jump_points[:1]
+    for x, y in jump_points[1:]:
+        last_x, last_y = path[-1]
+        dx = (x > last_x) - (x < last_x)
+        dy = (y > last_y) - (y < last_y)
+        while (last_x, last_y) != (x, y):
+            last_x += dx
+            last_y += dy
+            path.append((last_x, last_y))
+    return path
+
+
+ALGORITHMS = {
+    "astar": astar,
+    "dijkstra": dijkstra,
+    "bfs": bfs,
+    "dfs": dfs,
+    "jps": jps,
+}
+
+
+def find_path(grid: Grid, start, goal, algorithm: str = "astar",
+              diagonal: bool = False) -> list:
+    """Finds a path with an algorithm picked by its name in ALGORITHMS.
+    It returns the same as astar.
+    """
+
+    return ALGORITHMS[algorithm](grid, start, goal, diagonal)
+
+
+def distance_field(grid: Grid, goal, diagonal: bool = False):
+    """Computes the cost of the cheapest path from every cell to a goal.
+
+    Args:
+
+        grid: Grid object.
+
+        goal: (x, y) position the costs are computed to.
+
+        diagonal: Whether diagonal moves are allowed.
+
+    Returns:
+        An array.array object of floats with the cost of each index of
+        the grid's cells, infinite where the goal can't be reached.
+    """
+
+    cells = grid.cells
+    moves = grid.moves(diagonal)
+    distances = array.array("d", [math.inf]) * len(cells)
+    if not grid.is_walkable(*goal):
+        return distances
+
+    goal_index = grid.index(*goal)
+    distances[goal_index] = 0
+    heap = [(0, goal_index)]
+    while heap:
+        distance, index = heapq.heappop(heap)
+        if distance > distances[index]:
+            continue
+
+        # Reaching this cell from a neighbour costs entering it.
+        entering = cells[index]
+        for offset, length, side, other_side in moves:
+            neighbour = index + offset
+            if not cells[neighbour]:
+                continue
+            if side and not (cells[index + side]
+                             and cells[index + other_side]):
+                continue
+            new_distance = distance + entering * length
+            if new_distance < distances[neighbour]:
+                distances[neighbour] = new_distance
+                heapq.heappush(heap, (new_distance, neighbour))
+
+    return distances
+
+
+def descend(grid: Grid, distances, start, diagonal: bool = False) -> list:
+    """Follows a distance field from a start to its goal.
+
+    Returns:
+        The cheapest path as a list of (x, y) positions, or None if the
+        goal can't be reached from the start.
+    """
+
+    if not grid.is_walkable(*start):
+        return None
+    index = grid.index(*start)
+    if distances[index] == math.inf:
+        return None
+
+    cells = grid.cells
+    moves = grid.moves(diagonal)
+    path = [start]
+    while distances[index]:
+        best = None
+        best_distance = math.inf
+        for offset, length, side, other_side in moves:
+            neighbour = index + offset
+            if not cells[neighbour]:
+                continue
+            if side and not (cells[index + side]
+                             and cells[index + other_side]):
+                continue
+            distance = cells[neighbour] * length + distances[neighbour]
+            if distance < best_distance:
+                best = neighbour
+                best_distance = distance
+        index = best
+        path.append(grid.position(index))
+    return path
+
+
+def find_paths(grid: Grid, queries, algorithm: str = "astar",
+               diagonal: bool = False) -> list:
+    """Finds the paths of many agents at once.
+
+    With A* and Dijkstra, agents sharing a goal with at least
+    FIELD_THRESHOLD others follow a single distance field computed
+    from the goal, instead of searching a path each.
+
+    Args:
+
+        grid: Grid object.
+
+        queries: Iterable of (start, goal) pairs of (x, y) positions.
+
+        algorithm: Name of the algorithm in ALGORITHMS.
+
+        diagonal: Whether diagonal moves are allowed.
+
+    Returns:
+        A list with the path of each query, in the same order, as
+        returned by astar.
+    """
+
+    queries = list(queries)
+    fields = {}
+    if algorithm in ("astar", "dijkstra"):
+        goals = collections.Counter(goal for _, goal in queries)
+        fields = {goal: None for goal, count in goals.items()
+                  if count >= FIELD_THRESHOLD}
+
+    paths = []
+    for start, goal in queries:
+        goal = tuple(goal)
+        if goal in fields:
+            if fields[goal] is None:
+                fields[goal] = distance_field(grid, goal, diagonal)
+            paths.append(descend(grid, fields[goal], tuple(start), diagonal))
+        else:
+            paths.append(find_path(grid, tuple(start), goal, algorithm,
+                                   diagonal))
+    return paths
+
+
+class PathfindingPool:
+    """Pool of worker processes solving batches of path queries.
+
+    When a job ends, a PATH_EVENT event is posted with the attributes:
+
+        job: Id of the job, as returned by submit.
+
+        tag: Object given to submit, e.g. to tell the agents apart.
+
+        paths: List of paths, as returned by find_paths, or None if
+               the job failed.
+
+        error: The exception raised by the job, or None.
+
+    Scenes receive it like any other event, so the event type must be
+    in their EVENT_TYPES if they declare them.
+    """
+
+    def __init__(self, max_workers: int = None,
+                 event_type: int = PATH_EVENT):
+        """Initialises the PathfindingPool object. The processes are
+        started along with the first job.
+
+        Args:
+
+            max_workers: Maximum amount of worker processes. Defaults
+                         to the amount of processors.
+
+            event_type: Type of the events posted when jobs end.
+        """
+
+        self.max_workers = max_workers
+        self.event_type = event_type
+        self.pending: dict[int, concurrent.futures.Future] = {}
+        self._executor: concurrent.futures.ProcessPoolExecutor = None
+        self._jobs = itertools.count(1)
+
+    def submit(self, grid: Grid, queries, algorithm: str = "astar",
+               diagonal: bool = False, tag=None) -> int:
+        """Starts solving a batch of queries on a worker process.
+
+        The grid is copied to the worker, so sending many queries in a
+        single job is cheaper than a job per query.
+
+        Args:
+
+            grid: Grid object.
+
+            queries: Iterable of (start, goal) pairs of (x, y)
+                     positions.
+
+            algorithm: Name of the algorithm in ALGORITHMS.
+
+            diagonal: Whether diagonal moves are allowed.
+
+            tag: Object sent back with the results.
+
+        Returns:
+            The id of the job.
+        """
+
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm}")
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.max_workers
+            )
+
+        job = next(self._jobs)
+        future = self._executor.submit(find_paths, grid, list(queries),
+                                       algorithm, diagonal)
+        self.pending[job] = future
+        future.add_done_callback(lambda future_: self._post(job, tag, future_))
+        return job
+
+    def _post(self, job, tag, future):
+        self.pending.pop(job, None)
+        if future.cancelled() or not pygame.display.get_init():
+            return
+
+        error = future.exception()
+        pygame.event.post(pygame.event.Event(
+            self.event_type, job=job, tag=tag, error=error,
+            paths=None if error is not None else future.result(),
+        ))
+
+    def cancel(self, job: int) -> bool:
+        """Cancels a job that hasn't started yet.
+
+        Returns:
+            Whether the job was cancelled.
+        """
+
+        future = self.pending.get(job)
+        return future is not None and future.cancel()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the worker processes, cancelling the jobs not started."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,253 @@
+"""Module for profiling the phases of each frame."""
+
+from __future__ import annotations
+
+import collections
+import json
+import time
+
+from pygame import surface
+
+from . import interface
+
+
+class FrameProfiler:
+    """Records how long each phase of a frame takes.
+
+    A frame is delimited by begin_frame and end_frame calls. Every
+    mark call in between attributes the time elapsed since the
+    previous mark to the given phase. The last frames are kept in a
+    ring buffer.
+
+    While disabled, every method returns right away, so the profiler
+    can be left in the main loop at almost no cost.
+    """
+
+    def __init__(self, capacity: int = 600, enabled: bool = False):
+        """Initialises the FrameProfiler object.
+
+        Args:
+
+            capacity: Amount of frames kept in the ring buffer.
+
+            enabled: Whether the profiler starts recording right away.
+        """
+
+        self.enabled = enabled
+        self.frames = collections.deque(maxlen=capacity)
+
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._phases = []
+
+    def begin_frame(self) -> None:
+        """Starts recording a new frame."""
+
+        if not self.enabled:
+            return
+
+        self._frame_start = self._last_mark = time.perf_counter()
+        self._phases = []
+
+    def mark(self, phase: str) -> None:
+        """Attributes the time elapsed since the last mark to a phase.
+
+        Args:
+
+            phase: Name of the phase that has just finished.
+        """
+
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self._phases.append((phase, self._last_mark, now))
+        self._last_mark = now
+
+    def end_frame(self, scene_id: str = None, particles: int = 0) -> None:
+        """Finishes recording the current frame.
+
+        Args:
+
+            scene_id: Id of the scene shown in the frame.
+
+            particles: Amount of particles alive in the frame.
+        """
+
+        if not self.enabled:
+            return
+
+        self.frames.append(
+            (self._frame_start, time.perf_counter(), scene_id, particles,
+             self._phases)
+        )
+
+    def clear(self) -> None:
+        """Discards every recorded frame."""
+
+        self.frames.clear()
+
+    def frame_times(self, last: int = None) -> list[float]:
+        """Gets the duration of the recorded frames, in milliseconds.
+
+        Args:
+
+            last: Only consider the given amount of most recent frames.
+        """
+
+        return [1000 * (end - start)
+                for start, end, *_ in self._recent(last)]
+
+    def phase_times(self, last: int = None) -> dict[str, float]:
+        """Gets the mean time spent in each phase per frame, in
+        milliseconds.
+
+        Args:
+
+            last: Only consider the given amount of most recent frames.
+        """
+
+        frames = self._recent(last)
+        totals = {}
+        for *_, phases in frames:
+            for phase, start, end in phases:
+                totals[phase] = totals.get(phase, 0.0) + end - start
+
+        return {phase: 1000 * total / len(frames)
+                for phase, total in totals.items()}
+
+    def scene_times(self) -> dict[str, float]:
+        """Gets the mean frame time of each scene, in milliseconds."""
+
+        totals = {}
+        for start, end, scene_id, *_ in self.frames:
+            total, count = totals.get(scene_id, (0.0, 0))
+            totals[scene_id] = (total + end - start, count + 1)
+
+        return {scene_id: 1000 * total / count
+                for scene_id, (total, count) in totals.items()}
+
+    def to_chrome_trace(self) -> dict:
+        """Gets the recorded frames in the Chrome trace event format.
+
+        The result can be loaded in chrome://tracing or Perfetto.
+        """
+
+        def event(name, start, end, **args):
+            return {
+                "name": name,
+                "ph": "X",
+                "ts": 1e6 * start,
+                "dur": 1e6 * (end - start),
+                "pid": 0,
+                "tid": 0,
+                "args": args,
+            }
+
+        trace_events = []
+        for start, end, scene_id, particles, phases in self.frames:
+            trace_events.append(event("frame", start, end,
+                                      scene=str(scene_id),
+                                      particles=particles))
+            for phase, phase_start, phase_end in phases:
+                trace_events.append(event(phase, phase_start, phase_end))
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the recorded frames into a Chrome trace JSON file.
+
+        Args:
+
+            path: Location of the file to be written.
+        """
+
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+    def _recent(self, last):
+        if last is None or last >= len(self.frames):
+            return list(self.frames)
+        return list(self.frames)[-last:]
+
+
+class ProfilerOverlay:
+    """On-screen display of the frame time, phase breakdown and
+    particle count recorded by a FrameProfiler.
+    """
+
+    # Amount of frames between two refreshes of the displayed values.
+    REFRESH_FRAMES = 30
+
+    def __init__(self, screen: surface.Surface, profiler: FrameProfiler,
+                 colour=(255, 255, 0)):
+        """Initialises the ProfilerOverlay object.
+
+        Args:
+
+            screen: Surface where the overlay will be drawn.
+
+            profiler: The FrameProfiler object being displayed.
+
+            colour: RGB colour code of the text.
+        """
+
+        self.screen = screen
+        self.profiler = profiler
+        self.colour = colour
+        self.labels: list[interface.Label] = []
+        self._frames = 0
+        self._drawn_rect = None
+
+    def draw(self, redraw: bool = False):
+        """Draws the overlay at the top left corner of the screen.
+
+        Args:
+
+            redraw: Whether the labels are drawn even if they didn't
+                    change, because the area under them was restored.
+
+        Returns:
+            A Rect object representing the area of the screen touched
+            by the overlay, or None if it didn't change.
+        """
+
+        if self._frames % self.REFRESH_FRAMES == 0:
+            self._refresh()
+        self._frames += 1
+        if redraw:
+            for label in self.labels:
+                label.invalidate()
+
+        touched = [label.draw() for label in self.labels]
+        touched = [rect for rect in touched if rect is not None]
+        if not touched:
+            return None
+
+        # Also cover the previous labels, which may have been larger.
+        rect = touched[0].unionall(touched[1:])
+        if self._drawn_rect is not None:
+            rect = rect.union(self._drawn_rect)
+        self._drawn_rect = rect
+        return rect
+
+    def _refresh(self):
+        frame_times = self.profiler.frame_times(self.REFRESH_FRAMES)
+        if not frame_times:
+            return
+
+        frame_time = sum(frame_times) / len(frame_times)
+        lines = [f"frame {frame_time:.2f}ms"]
+        for phase, phase_time in self.profiler.phase_times(
+                self.REFRESH_FRAMES).items():
+            lines.append(f"{phase} {phase_time:.2f}ms")
+        lines.append(f"particles {self.profiler.frames[-1][3]}")
+
+        self.labels = []
+        y = 0
+        for line in lines:
+            label = interface.Label(self.screen, line, size=18,
+                                    colour=self.colour)
+            label.rect.topleft = (2, y)
+            y = label.rect.bottom
+            self.labels.append(label)
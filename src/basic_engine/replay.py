@@ -0,0 +1,169 @@
+"""Module for recording the input of a game session and replaying it.
+
+A recording keeps, for every frame, the milliseconds the frame was
+given and the events pulled from the queue, along with the seed the
+random number generators were given when it started. Replaying it
+feeds the same frames back to a Game object, so the session runs the
+same, as fast as possible and without a display, e.g. to compare the
+frame timings of two versions of the engine.
+
+What a scene reads outside the events and the elapsed time, like the
+mouse state or the clock, is not recorded.
+
+The file starts with a header (magic bytes, version and seed) followed
+by the zlib compressed frames. Each frame is its elapsed time and its
+amount of events, and each event is its type and its attributes as
+JSON. Attributes that can't be written as JSON are replayed as their
+repr.
+"""
+
+import json
+import os
+import random
+import struct
+import zlib
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"PGREPLAY"
+VERSION = 1
+HEADER = struct.Struct("<8sIQ")
+FRAME = struct.Struct("<dH")
+EVENT = struct.Struct("<IH")
+
+
+def seed_rngs(seed: int) -> None:
+    """Seeds the random module, and NumPy's global generator if it's
+    installed. Particle systems created without a seed take theirs
+    from the random module.
+    """
+
+    random.seed(seed)
+    if numpy is not None:
+        numpy.random.seed(seed % 2 ** 32)
+
+
+def _tuples(value):
+    """Turns the lists decoded from JSON back into tuples, as pygame
+    gives positions and such.
+    """
+
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
+
+
+class Recorder:
+    """Writer of a recording, frame by frame."""
+
+    def __init__(self, path: str, seed: int = None):
+        """Initialises the Recorder object, seeding the random number
+        generators.
+
+        Args:
+
+            path: Location of the recording file to be written.
+
+            seed: Seed given to the random number generators. Defaults
+                  to a random one.
+        """
+
+        self.path = path
+        self.seed = int.from_bytes(os.urandom(8), "little") \
+            if seed is None else seed
+        self.frames = 0
+
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.seed))
+        self._compressor = zlib.compressobj(9)
+        seed_rngs(self.seed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_frame(self, elapsed: float, events: list) -> None:
+        """Records a frame.
+
+        Args:
+
+            elapsed: Milliseconds given to the frame.
+
+            events: pygame.event.Event objects handled in the frame.
+        """
+
+        chunks = [FRAME.pack(elapsed, len(events))]
+        for event in events:
+            attributes = json.dumps(event.dict, separators=(",", ":"),
+                                    default=repr).encode("utf-8")
+            chunks.append(EVENT.pack(event.type, len(attributes)))
+            chunks.append(attributes)
+
+        self._file.write(self._compressor.compress(b"".join(chunks)))
+        self.frames += 1
+
+    def close(self) -> None:
+        """Writes what is left of the recording and closes the file."""
+
+        if self._file.closed:
+            return
+        self._file.write(self._compressor.flush())
+        self._file.close()
+
+
+class Player:
+    """Reader of a recording."""
+
+    def __init__(self, path: str):
+        """Initialises the Player object, reading the recording.
+
+        Args:
+
+            path: Location of the recording file.
+
+        Raises:
+            ValueError: The file is not a recording.
+        """
+
+        self.path = path
+        with open(path, "rb") as replay_file:
+            header = replay_file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a recording")
+            magic, version, self.seed = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} "
+                                 f"recording")
+            self._data = zlib.decompress(replay_file.read())
+
+    def __iter__(self):
+        """Yields the (elapsed, events) pair of each frame."""
+
+        data = self._data
+        offset = 0
+        while offset < len(data):
+            elapsed, count = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+
+            events = []
+            for _ in range(count):
+                event_type, size = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                attributes = json.loads(data[offset:offset + size])
+                offset += size
+                events.append(pygame.event.Event(event_type, {
+                    name: _tuples(value)
+                    for name, value in attributes.items()
+                }))
+
+            yield elapsed, events
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -1,13 +1,101 @@
 """Module for managing scenes."""
 
-from pygame import event as pg_event, sprite, surface
+from __future__ import annotations
 
-from . import transition
+import asyncio
+import concurrent.futures
+
+from pygame import event as pg_event, rect as pg_rect, surface
+
+from . import compositor, profiler, spatial, transition, tween, utils
+
+
+def merge_rects(rects) -> list[pg_rect.Rect]:
+    """Merges overlapping rects into their union.
+
+    Args:
+
+        rects: Iterable of Rect objects. None entries are ignored.
+
+    Returns:
+        A list of Rect objects where none of them overlap.
+    """
+
+    merged = []
+    for rect in rects:
+        if rect is None:
+            continue
+        rect = pg_rect.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+
+    return merged
+
+
+class ParticleGroups:
+    """Container of the particle groups of a scene.
+
+    It keeps insertion order like a list, but removing a group takes
+    constant time. Groups mustn't be added or removed while iterating.
+    """
+
+    def __init__(self, groups=()):
+        self._groups = dict.fromkeys(groups)
+
+    def __iter__(self):
+        return iter(self._groups)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, group) -> bool:
+        return group in self._groups
+
+    def append(self, group) -> None:
+        """Adds a group to the container.
+
+        Args:
+
+            group: Group object or effects.ParticleSystem object.
+        """
+
+        self._groups[group] = None
+
+    def remove(self, group) -> None:
+        """Removes a group from the container.
+
+        Raises:
+            KeyError: The group is not in the container.
+        """
+
+        del self._groups[group]
+
+    def prune(self) -> None:
+        """Removes every group that has no particles left.
+
+        Particle systems with active emitters are kept even if they
+        have no particles alive yet.
+        """
+
+        empty = [
+            group for group in self._groups
+            if len(group) == 0 and not getattr(group, "emitting", False)
+        ]
+        for group in empty:
+            del self._groups[group]
 
 
 class Scene:
     """Base scene class for implementing game scenes."""
 
+    # Event types handled by update_on_event. None means every event.
+    # Declaring them lets the scene manager skip the others, and SDL
+    # drop them before they reach the queue.
+    EVENT_TYPES = None
+
     def __init__(self, screen: surface.Surface):
         """Initialises the Scene object.
 
@@ -22,24 +110,264 @@ class Scene:
 
         self.scene_manager: SceneManager = None
 
-        self.particles_groups: list[sprite.Group] = []
+        # Group objects or effects.ParticleSystem objects.
+        self.particles_groups = ParticleGroups()
+
+        # Widgets whose changes are tracked by the scene.
+        self.widgets = []
+
+        # Index of the widgets' areas, and of any sprite the scene
+        # inserts, for hit-testing and collision broadphase.
+        self.spatial_hash = spatial.SpatialHash()
+
+        # Z-ordered layers composed by the default draw method.
+        self.compositor = compositor.Compositor(screen)
+
+        # Event type -> handlers called by the scene manager.
+        self.event_handlers: dict[int, list] = {}
+
+        # Tasks of the coroutines scheduled by the scene.
+        self.tasks: set[asyncio.Task] = set()
+        if self.EVENT_TYPES is not None:
+            self.listen(self.update_on_event, *self.EVENT_TYPES)
+
+    def listen(self, handler, *event_types: int) -> None:
+        """Registers a handler for the given event types.
+
+        The scene manager calls it directly, so a widget can be given
+        only the events it cares about instead of going through the
+        scene's update_on_event. Handlers should be registered while
+        the scene is set up, as the events allowed by SDL are chosen
+        when the scene is shown.
+
+        Args:
+
+            handler: Callable taking a pygame.event.Event object, e.g.
+                     a widget's update_on_event.
+
+            event_types: Event types the handler is interested in.
+        """
+
+        for event_type in event_types:
+            self.event_handlers.setdefault(event_type, []).append(handler)
+
+    def event_types(self) -> set[int]:
+        """Gets the event types the scene is interested in.
+
+        Returns:
+            A set of event types, or None if the scene handles every
+            event.
+        """
+
+        if self.EVENT_TYPES is None:
+            return None
+        return set(self.event_handlers)
+
+    def add_widgets(self, *widgets) -> None:
+        """Makes the scene track the changes of the given widgets and
+        indexes their areas in the scene's spatial hash.
+
+        Args:
+
+            widgets: interface.Widget objects drawn by this scene.
+        """
+
+        self.widgets.extend(widgets)
+        for widget in widgets:
+            self.spatial_hash.insert(widget)
+            widget.spatial_hash = self.spatial_hash
+
+    def objects_at(self, pos) -> list:
+        """Gets the widgets and sprites in the scene's spatial hash
+        whose area contains a point.
+
+        Args:
+
+            pos: (x, y) position, e.g. the mouse position.
+        """
+
+        return self.spatial_hash.query_point(pos)
+
+    def widgets_changed(self) -> bool:
+        """Gets whether any tracked widget has to be drawn again.
+
+        A scene whose only moving parts are its widgets may skip
+        drawing altogether while it returns False.
+        """
+
+        return any(widget.changed for widget in self.widgets)
+
+    def invalidate(self) -> None:
+        """Marks every tracked widget as changed, so the whole scene is
+        drawn again.
+        """
+
+        for widget in self.widgets:
+            widget.invalidate()
+        self.compositor.redraw()
+
+    def next_wakeup(self):
+        """Gets how long the scene stays the same if no event reaches
+        it, so an idle game loop knows how long it can sleep.
+
+        By default the scene is busy while it has particles or its
+        tracked widgets change, and otherwise sleeps until the first of
+        its widgets changes by itself. Scenes that animate on their own
+        in update must override it.
+
+        Returns:
+            0 if the scene has to be updated and drawn now, the
+            milliseconds until it has to be, or None if it only
+            changes because of events.
+        """
+
+        for particles_group in self.particles_groups:
+            if len(particles_group) or getattr(particles_group, "emitting",
+                                               False):
+                return 0
+
+        wakeups = [widget.next_wakeup() for widget in self.widgets]
+        return min((wakeup for wakeup in wakeups if wakeup is not None),
+                   default=None)
+
+    def nbytes(self) -> int:
+        """Gets an estimate of the memory used by the scene, in bytes,
+        checked against the memory budget of the scene manager.
+
+        It adds up the images of the tracked widgets and the layers
+        cached by the compositor. Scenes holding other large surfaces
+        should add them up too.
+        """
+
+        total = self.compositor.nbytes()
+        for widget in self.widgets:
+            image = getattr(widget, "image", None)
+            if image is not None:
+                total += utils.surface_nbytes(image)
+        return total
+
+    def preload(self) -> None:
+        """Loads the assets the scene needs before being shown.
+
+        When the scene is the target of a transition, it's called on a
+        worker thread while the current scene is faded out, so it
+        should only load and decode data, like images and sounds,
+        without drawing on the screen. Otherwise it's called right
+        before the scene is first used.
+        """
+
+    def on_enter(self) -> None:
+        """Called before the scene is first shown after becoming the
+        current one.
+        """
+
+    def on_exit(self) -> None:
+        """Called when the scene stops being the current one."""
+
+    def on_unload(self) -> None:
+        """Called when the scene manager drops the scene to stay within
+        its budget or when it shuts down, e.g. as the game quits. The
+        scene won't be used again, so it should release whatever it
+        holds that isn't freed along with it, e.g. cached surfaces
+        shared with other objects or worker processes.
+        """
+
+    def schedule(self, coroutine) -> asyncio.Task:
+        """Runs a coroutine alongside the frames, e.g. one awaiting a
+        file read or a request, while the game runs with
+        Game.start_async. Blocking calls should be awaited through
+        asyncio.to_thread.
+
+        Errors raised by the coroutine stop the game loop. The task is
+        cancelled if the scene is unloaded.
+
+        Args:
+
+            coroutine: Coroutine object, e.g. self.load_save().
 
-    def draw_particles(self) -> None:
-        """Draws the particles generated by the scene."""
+        Returns:
+            The asyncio.Task object running it.
 
+        Raises:
+            RuntimeError: The game loop isn't running on asyncio.
+        """
+
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            task.get_loop().call_exception_handler({
+                "message": f"Task scheduled by {type(self).__name__} failed",
+                "exception": task.exception(),
+                "task": task,
+            })
+
+    def cancel_tasks(self) -> None:
+        """Cancels the coroutines scheduled by the scene."""
+
+        for task in list(self.tasks):
+            task.cancel()
+
+    def particles_count(self) -> int:
+        """Gets the amount of particles alive in the scene."""
+
+        return sum(len(particles_group)
+                   for particles_group in self.particles_groups)
+
+    def draw_particles(self, surface_: surface.Surface = None
+                       ) -> list[pg_rect.Rect]:
+        """Draws the particles generated by the scene. It can be given
+        to the compositor as a dynamic layer.
+
+        Args:
+
+            surface_: Surface object where the particles are drawn. The
+                      scene's screen by default.
+
+        Returns:
+            A list of Rect objects representing the areas touched.
+        """
+
+        touched = []
         for particles_group in self.particles_groups:
-            particles_group.draw(self.screen)
+            rects = particles_group.draw(surface_ or self.screen)
+            if isinstance(rects, pg_rect.Rect):
+                touched.append(rects)
+            elif rects is not None:
+                touched.extend(rects)
+        return touched
 
     def update_particles(self) -> None:
         """Updates the particles generated by the scene."""
 
         for particles_group in self.particles_groups:
-            if len(particles_group) == 0:
-                self.particles_groups.remove(particles_group)
             particles_group.update()
+        self.particles_groups.prune()
+
+    def draw(self, alpha: float = 1.0) -> list[pg_rect.Rect]:
+        """Draws the components of this scene in the screen.
+
+        By default it composes the layers added to the scene's
+        compositor. Scenes overriding it may still call it to compose
+        their layers before drawing anything else.
+
+        Args:
 
-    def draw(self) -> None:
-        """Draws the components of this scene in the screen."""
+            alpha: Interpolation factor between the previous and the
+                   current simulation tick, from 0 to 1. It's only
+                   given when the game runs at a fixed TICK_RATE.
+
+        Returns:
+            Optionally, a list of Rect objects representing the areas
+            of the screen touched by this draw. Returning None means
+            the whole screen has to be presented.
+        """
+
+        return self.compositor.draw()
 
     def update(self) -> None:
         """Updates the components everytime in the loop."""
@@ -64,15 +392,42 @@ class SceneManager:
         * Alternating from scene to scene.
     """
 
-    def __init__(self):
-        """Initialises SceneManager instance."""
+    def __init__(self, frame_profiler: profiler.FrameProfiler = None,
+                 max_scenes: int = None, max_bytes: int = None):
+        """Initialises SceneManager instance.
+
+        Args:
+
+            frame_profiler: FrameProfiler object that records how long
+                            drawing scenes and transitions take. A
+                            disabled one is created if none is given.
+
+            max_scenes: Maximum amount of scenes kept built. None means
+                        no limit.
+
+            max_bytes: Budget for the memory used by the built scenes,
+                       as estimated by their nbytes method. None means
+                       no limit.
+        """
 
+        self.profiler = frame_profiler or profiler.FrameProfiler()
+        # Built scenes, from the least to the most recently entered.
         self.scenes: dict[str, Scene] = {}
+        self.factories: dict[str, object] = {}
+        self.max_scenes = max_scenes
+        self.max_bytes = max_bytes
         self.on_transition = False
         self.fx_object: transition.Transition = None
         self.current_scene: Scene = None
+        self.full_redraw = True
+        self._entered = None
+
+        # Ids of the built scenes whose preload hook has run.
+        self._preloaded: set[str] = set()
+        self._preloading: dict[str, concurrent.futures.Future] = {}
+        self._executor: concurrent.futures.ThreadPoolExecutor = None
 
-    def add(self, scene_id: str, scene: Scene) -> None:
+    def add(self, scene_id: str, scene) -> None:
         """Adds a scene to the scene manager.
 
         Args:
@@ -80,14 +435,190 @@ class SceneManager:
             scene_id: An id for the scene. It will be used for example
                       when a scene change is requested.
 
-            scene: Any Scene object.
+            scene: Any Scene object, or a callable with no arguments
+                   building one, like a Scene subclass bound to its
+                   screen with functools.partial. It's only called when
+                   the scene is first needed, and called again if the
+                   scene was unloaded to stay within the budget.
         """
 
-        if not self.scenes:
+        if not self.scenes and not self.factories:
             self.current_scene = scene_id
 
-        scene.scene_manager = self
-        self.scenes[scene_id] = scene
+        if isinstance(scene, Scene):
+            scene.scene_manager = self
+            self.scenes[scene_id] = scene
+        else:
+            self.factories[scene_id] = scene
+
+    def get_scene(self, scene_id: str) -> Scene:
+        """Gets a scene, building and preloading it if needed. If it's
+        being preloaded in the background, it waits for it.
+
+        Args:
+
+            scene_id: Id the scene was added with.
+
+        Returns:
+            The Scene object, or None if no scene has that id.
+        """
+
+        scene_ = self.scenes.get(scene_id)
+        if scene_ is not None and scene_id in self._preloaded:
+            return scene_
+
+        future = self._preloading.pop(scene_id, None)
+        if future is not None:
+            # Waits for the worker, re-raising its errors here.
+            scene_ = future.result()
+        elif scene_ is not None or scene_id in self.factories:
+            scene_ = self._build(scene_id, scene_)
+        else:
+            return None
+
+        scene_.scene_manager = self
+        self.scenes[scene_id] = scene_
+        self._preloaded.add(scene_id)
+        self._evict(scene_id)
+        return scene_
+
+    def _build(self, scene_id, scene_=None):
+        """Builds a scene if needed and runs its preload hook."""
+
+        if scene_ is None:
+            scene_ = self.factories[scene_id]()
+        scene_.preload()
+        return scene_
+
+    def preload(self, scene_id: str) -> concurrent.futures.Future:
+        """Starts building a scene and running its preload hook on a
+        worker thread. It's done automatically for the target of a
+        transition.
+
+        Args:
+
+            scene_id: Id the scene was added with.
+
+        Returns:
+            A Future object resolving to the Scene object.
+        """
+
+        future = self._preloading.get(scene_id)
+        if future is not None:
+            return future
+
+        future = concurrent.futures.Future()
+        if scene_id in self._preloaded:
+            future.set_result(self.scenes[scene_id])
+            return future
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                1, thread_name_prefix="scenes"
+            )
+        future = self._executor.submit(self._build, scene_id,
+                                       self.scenes.get(scene_id))
+        self._preloading[scene_id] = future
+        return future
+
+    def is_ready(self, scene_id: str) -> bool:
+        """Gets whether a scene can be shown without waiting for it to
+        be built or preloaded.
+        """
+
+        if scene_id in self._preloaded:
+            return True
+        future = self._preloading.get(scene_id)
+        return future is not None and future.done()
+
+    def shutdown(self) -> None:
+        """Stops the worker thread preloading scenes, if any, and drops
+        every built scene, calling its on_unload hook and cancelling
+        its tasks. The scene manager shouldn't be used afterwards.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+        scenes = list(self.scenes.values())
+        self.scenes.clear()
+        self._preloaded.clear()
+        for scene_ in scenes:
+            scene_.on_unload()
+            scene_.cancel_tasks()
+
+    def is_loaded(self, scene_id: str) -> bool:
+        """Gets whether a scene is currently built."""
+
+        return scene_id in self.scenes
+
+    def unload(self, scene_id: str) -> None:
+        """Drops a built scene, calling its on_unload hook. It will be
+        built again by its factory the next time it's needed.
+
+        Raises:
+            ValueError: The scene is being shown or it was not added
+                        as a factory, so it couldn't be built again.
+        """
+
+        if scene_id == self.current_scene or scene_id == self._target():
+            raise ValueError(f"{scene_id} is being shown")
+        if scene_id not in self.factories:
+            raise ValueError(f"{scene_id} has no factory")
+
+        scene_ = self.scenes.pop(scene_id, None)
+        self._preloaded.discard(scene_id)
+        if scene_ is not None:
+            scene_.on_unload()
+            scene_.cancel_tasks()
+
+    def _target(self):
+        """Gets the id of the scene a transition is heading to."""
+
+        if self.fx_object is None:
+            return None
+        return self.fx_object.next_view
+
+    def _over_budget(self) -> bool:
+        if self.max_scenes is not None and len(self.scenes) > self.max_scenes:
+            return True
+        return self.max_bytes is not None and sum(
+            scene_.nbytes() for scene_ in self.scenes.values()
+        ) > self.max_bytes
+
+    def _evict(self, *keep: str) -> None:
+        """Unloads the least recently entered scenes until the built
+        ones fit in the budget.
+
+        Args:
+
+            keep: Ids of scenes that mustn't be unloaded.
+        """
+
+        if self.max_scenes is None and self.max_bytes is None:
+            return
+
+        keep = {self.current_scene, self._target(), *keep}
+        candidates = [scene_id for scene_id in self.scenes
+                      if scene_id in self.factories and scene_id not in keep]
+        while candidates and self._over_budget():
+            self.unload(candidates.pop(0))
+
+    def _current(self) -> Scene:
+        """Gets the current scene, calling its on_enter hook if it has
+        just become the current one.
+        """
+
+        scene_ = self.get_scene(self.current_scene)
+        if self._entered != self.current_scene:
+            self._entered = self.current_scene
+            # Mark it as the most recently entered.
+            self.scenes[self.current_scene] = self.scenes.pop(
+                self.current_scene
+            )
+            scene_.on_enter()
+        return scene_
 
     def validate_scenes(f):
         """It won't allow any instruction that interact with scenes
@@ -96,27 +627,113 @@ class SceneManager:
         """
 
         def wrapper(self, *args, **kwargs):
-            if self.current_scene is not None or self.scenes:
-                f(self, *args, **kwargs)
+            if self.current_scene is not None or self.scenes \
+                    or self.factories:
+                return f(self, *args, **kwargs)
+            return None
 
         return wrapper
 
     @validate_scenes
-    def show(self) -> None:
+    def show(self, alpha: float = None) -> list[pg_rect.Rect]:
         """Shows the current view, handling possible transition
         requests automatically.
+
+        Args:
+
+            alpha: Interpolation factor passed to the scene's draw
+                   method, if any.
+
+        Returns:
+            A list of non-overlapping Rect objects representing the
+            areas of the screen that changed, or None if the whole
+            screen must be presented. That is always the case on a
+            scene change and while a transition is animating.
         """
 
-        self.scenes[self.current_scene].draw()
+        if self.on_transition and not self.fx_object.LIVE:
+            # The transition composites its own snapshots of the
+            # scenes, which aren't drawn meanwhile.
+            self.fx_object.animate()
+            self.profiler.mark("animate")
+            # The screen is left with the whole incoming scene drawn.
+            self.full_redraw = False
+            return None
+
+        current_scene = self._current()
+        if self.full_redraw:
+            current_scene.invalidate()
+        if alpha is None:
+            touched = current_scene.draw()
+        else:
+            touched = current_scene.draw(alpha)
+        self.profiler.mark("show")
+
         if self.on_transition:
             self.fx_object.animate()
+            self.profiler.mark("animate")
+            self.full_redraw = True
+
+        if self.full_redraw or touched is None:
+            # Keep redrawing everything until the transition is over.
+            self.full_redraw = self.on_transition
+            return None
+
+        return merge_rects(touched)
+
+    def next_wakeup(self):
+        """Gets how long the current scene can go without being
+        updated or drawn, as Scene.next_wakeup does. Transitions,
+        running tweens and full redraws always need the next frame.
+        """
+
+        if self.on_transition or self.full_redraw or tween.tweener.tweens:
+            return 0
+        if self.current_scene is None:
+            return None
+        return self._current().next_wakeup()
+
+    def damage(self, rect) -> bool:
+        """Reports an area of the screen drawn over after the current
+        scene, e.g. by an overlay, so the scene's compositor restores
+        it in the next frame.
+
+        Args:
+
+            rect: Rect object of the area, or None if nothing was drawn.
+
+        Returns:
+            Whether the current scene composes layers, in which case
+            whatever was drawn over it has to be drawn again every
+            frame.
+        """
+
+        scene_ = self.scenes.get(self.current_scene)
+        if scene_ is None or not scene_.compositor.layers:
+            return False
+        if rect is not None:
+            scene_.compositor.damage(rect)
+        return True
+
+    def snapshot(self) -> surface.Surface:
+        """Draws the whole current scene and copies it from its screen.
+        Scenes composing layers only blit their cached static layers.
+
+        Returns:
+            A new Surface object with the scene's image.
+        """
+
+        current_scene = self._current()
+        current_scene.invalidate()
+        current_scene.draw()
+        return current_scene.screen.copy()
 
     @validate_scenes
     def update(self) -> None:
         """Updates the current scene components."""
 
         if not self.on_transition:
-            self.scenes[self.current_scene].update()
+            self._current().update()
 
     @validate_scenes
     def update_on_event(self, event: pg_event.Event) -> None:
@@ -129,7 +746,11 @@ class SceneManager:
         """
 
         if not self.on_transition:
-            self.scenes[self.current_scene].update_on_event(event)
+            current_scene = self._current()
+            if current_scene.EVENT_TYPES is None:
+                current_scene.update_on_event(event)
+            for handler in current_scene.event_handlers.get(event.type, ()):
+                handler(event)
 
     def _change_scene(self, scene_id: str) -> None:
         """It changes the current scene directly.
@@ -139,7 +760,13 @@ class SceneManager:
             scene_id: Name of the scene from where the screen will
                       change to."""
 
+        if self._entered is not None:
+            self.scenes[self._entered].on_exit()
+            self._entered = None
+
         self.current_scene = scene_id
+        self.full_redraw = True
+        self._evict()
 
     def change_scene(self, scene_id: str,
                      transition_: transition.Transition = None) -> None:
@@ -153,13 +780,16 @@ class SceneManager:
 
             transition: Transition object that will animate a
                         transition from the current scene to the new
-                        given one.
+                        given one. The new scene is preloaded in the
+                        background while the transition plays.
         """
 
         if scene_id != self.current_scene:
             if transition_ is not None:
+                self.preload(scene_id)
                 self.fx_object = transition_
                 self.on_transition = True
+                self.full_redraw = True
             else:
                 # Changes the view abruptly.
                 self._change_scene(scene_id)
@@ -172,4 +802,4 @@ class SceneManager:
             scene_id: Name of the scene to be drawn into the screen.
         """
 
-        self.current_scene = scene_id
+        self._change_scene(scene_id)
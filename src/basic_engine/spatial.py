@@ -0,0 +1,198 @@
+"""Module for spatial queries over rects, like hit-testing and
+collision broadphase.
+"""
+
+from __future__ import annotations
+
+from pygame import rect as pg_rect
+
+
+class SpatialHash:
+    """Uniform grid indexing objects by the cells their rects cover.
+
+    Point and rect queries only look at the objects sharing the cells
+    of the query, instead of every object, and colliding pairs are
+    only searched for inside each cell. Objects must be hashable, like
+    Sprite objects.
+    """
+
+    def __init__(self, cell_size: int = 64):
+        """Initialises the SpatialHash object.
+
+        Args:
+
+            cell_size: Width and height of the cells, in pixels. Cells
+                       about the size of the typical object work best.
+        """
+
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], set] = {}
+        # Object -> (rect, covered cells range)
+        self._objects: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._objects
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def _cells_range(self, rect):
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.left + max(rect.width, 1) - 1) // size,
+            (rect.top + max(rect.height, 1) - 1) // size,
+        )
+
+    def _cells_of(self, cells_range):
+        left, top, right, bottom = cells_range
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                yield (x, y)
+
+    def insert(self, obj, rect=None) -> None:
+        """Adds an object to the grid, or updates it if it's already
+        there.
+
+        Args:
+
+            obj: Object to be indexed.
+
+            rect: Area covered by the object. Defaults to its rect
+                  attribute.
+        """
+
+        if obj in self._objects:
+            self.update(obj, rect)
+            return
+
+        rect = pg_rect.Rect(obj.rect if rect is None else rect)
+        cells_range = self._cells_range(rect)
+        self._objects[obj] = (rect, cells_range)
+        for cell in self._cells_of(cells_range):
+            self._cells.setdefault(cell, set()).add(obj)
+
+    def update(self, obj, rect=None) -> None:
+        """Updates the area of an object that moved or was resized.
+
+        Only the cells it left or entered are touched, so it's cheap
+        to call for objects that moved a little.
+
+        Args:
+
+            obj: Object already in the grid.
+
+            rect: New area covered by the object. Defaults to its rect
+                  attribute.
+        """
+
+        rect = pg_rect.Rect(obj.rect if rect is None else rect)
+        old_rect, old_range = self._objects[obj]
+        if rect == old_rect:
+            return
+
+        cells_range = self._cells_range(rect)
+        self._objects[obj] = (rect, cells_range)
+        if cells_range == old_range:
+            return
+
+        old_cells = set(self._cells_of(old_range))
+        new_cells = set(self._cells_of(cells_range))
+        for cell in old_cells - new_cells:
+            self._discard_from_cell(cell, obj)
+        for cell in new_cells - old_cells:
+            self._cells.setdefault(cell, set()).add(obj)
+
+    def remove(self, obj) -> None:
+        """Removes an object from the grid.
+
+        Raises:
+            KeyError: The object is not in the grid.
+        """
+
+        _, cells_range = self._objects.pop(obj)
+        for cell in self._cells_of(cells_range):
+            self._discard_from_cell(cell, obj)
+
+    def _discard_from_cell(self, cell, obj):
+        objects = self._cells[cell]
+        objects.discard(obj)
+        if not objects:
+            del self._cells[cell]
+
+    def clear(self) -> None:
+        """Removes every object from the grid."""
+
+        self._cells.clear()
+        self._objects.clear()
+
+    def rect_of(self, obj) -> pg_rect.Rect:
+        """Gets the area an object was indexed with."""
+
+        return self._objects[obj][0]
+
+    def query_point(self, pos) -> list:
+        """Gets the objects whose area contains a point.
+
+        Args:
+
+            pos: (x, y) position, e.g. the mouse position.
+        """
+
+        x, y = pos
+        cell = (int(x) // self.cell_size, int(y) // self.cell_size)
+        return [
+            obj for obj in self._cells.get(cell, ())
+            if self._objects[obj][0].collidepoint(pos)
+        ]
+
+    def query_rect(self, rect) -> list:
+        """Gets the objects whose area collides with a rect.
+
+        Args:
+
+            rect: Rect object, or anything accepted by Rect.
+        """
+
+        rect = pg_rect.Rect(rect)
+        candidates = set()
+        for cell in self._cells_of(self._cells_range(rect)):
+            candidates.update(self._cells.get(cell, ()))
+
+        return [obj for obj in candidates
+                if self._objects[obj][0].colliderect(rect)]
+
+    def collide(self, obj) -> list:
+        """Gets the other objects colliding with an indexed object,
+        like pygame.sprite.spritecollide does.
+        """
+
+        return [other for other in self.query_rect(self._objects[obj][0])
+                if other is not obj]
+
+    def pairs(self) -> set[tuple]:
+        """Gets every pair of colliding objects.
+
+        Returns:
+            A set of (a, b) tuples. Each pair appears once, in no
+            particular order.
+        """
+
+        found = set()
+        for objects in self._cells.values():
+            if len(objects) < 2:
+                continue
+            objects = list(objects)
+            for index, obj in enumerate(objects):
+                rect = self._objects[obj][0]
+                for other in objects[index + 1:]:
+                    if (other, obj) in found:
+                        continue
+                    if rect.colliderect(self._objects[other][0]):
+                        found.add((obj, other))
+
+        return found
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+import wave
+
+from pygame import display, image, mixer, surface
+
+from .. import assets, benchmark, utils
+
+benchmark.use_dummy_drivers()
+
+
+class AssetManagerTestCase(unittest.TestCase):
+    """Tests the AssetManager class."""
+
+    @classmethod
+    def setUpClass(cls):
+        display.init()
+        display.set_mode((64, 64))
+        mixer.init()
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.image_paths = []
+        for index in range(3):
+            path = os.path.join(cls.directory.name, f"image{index}.png")
+            image.save(surface.Surface((32, 32)), path)
+            cls.image_paths.append(path)
+
+        cls.sound_path = os.path.join(cls.directory.name, "sound.wav")
+        with wave.open(cls.sound_path, "wb") as sound_file:
+            sound_file.setnchannels(1)
+            sound_file.setsampwidth(2)
+            sound_file.setframerate(22050)
+            sound_file.writeframes(b"\x00\x01" * 2205)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.manager = assets.AssetManager(workers=2)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_images_are_converted_and_cached(self):
+        handle = self.manager.request_image(self.image_paths[0])
+        loaded = handle.result(timeout=5)
+
+        self.assertTrue(handle.ready)
+        self.assertEqual(loaded.get_bitsize(),
+                         display.get_surface().get_bitsize())
+        self.assertIs(self.manager.load_image(self.image_paths[0]), loaded)
+        self.assertGreater(self.manager.stats()["hit_rate"], 0)
+
+    def test_byte_budget(self):
+        budget = 2 * utils.surface_nbytes(surface.Surface((32, 32)).convert())
+        manager = assets.AssetManager(max_bytes=budget, workers=1)
+        for path in self.image_paths:
+            manager.load_image(path)
+        manager.shutdown()
+
+        self.assertEqual(len(manager.cache), 2)
+        self.assertNotIn(("image", self.image_paths[0]), manager.cache)
+        self.assertEqual(manager.stats()["evictions"], 1)
+
+    def test_sound_volumes_share_decoding(self):
+        quiet = self.manager.load_sound(self.sound_path, 0.25)
+        loud = self.manager.load_sound(self.sound_path)
+
+        self.assertAlmostEqual(quiet.get_volume(), 0.25, places=2)
+        self.assertAlmostEqual(loud.get_volume(), 1.0, places=2)
+        self.assertEqual(quiet.get_length(), loud.get_length())
+        self.assertIs(self.manager.load_sound(self.sound_path), loud)
+
+    def test_volume_variant_caches_decoded_sound(self):
+        quiet = self.manager.load_sound(self.sound_path, 0.5)
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["size"], 2 * utils.sound_nbytes(quiet))
+        self.assertIn(("sound", self.sound_path, 1.0), self.manager.cache)
+
+    def test_shared_future_after_eviction(self):
+        first = self.manager.request_image(self.image_paths[0])
+        second = self.manager.request_image(self.image_paths[0])
+        first.result(timeout=5)
+        self.manager.evict(self.image_paths[0])
+
+        loaded = second.result(timeout=5)
+
+        self.assertEqual(loaded.get_bitsize(),
+                         display.get_surface().get_bitsize())
+        self.assertIn(("image", self.image_paths[0]), self.manager.cache)
+
+    def test_volumes_copied_without_loading_threads(self):
+        self.manager.load_sound(self.sound_path)
+        self.manager.shutdown()
+
+        # The decoded sound is cached, so its copies need no thread.
+        handles = [self.manager.request_sound(self.sound_path, volume)
+                   for volume in (0.25, 0.5, 0.75)]
+
+        self.assertTrue(all(handle.ready for handle in handles))
+        self.assertAlmostEqual(handles[1].result().get_volume(), 0.5,
+                               places=2)
+
+    def test_missing_file(self):
+        handle = self.manager.request_image("does-not-exist.png")
+
+        with self.assertRaises(FileNotFoundError):
+            handle.result(timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
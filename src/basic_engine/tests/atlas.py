@@ -0,0 +1,193 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from pygame import constants, display, init, rect, surface
+
+from .. import atlas, effects
+
+init()
+
+
+def make_surface(width, height, colour):
+    surface_ = surface.Surface((width, height), constants.SRCALPHA)
+    surface_.fill(colour)
+    return surface_
+
+
+class SkylinePackerTestCase(unittest.TestCase):
+    """Tests the SkylinePacker class."""
+
+    def test_packed_rects_do_not_overlap(self):
+        packer = atlas.SkylinePacker(256, 256)
+        generator = random.Random(0)
+        packed = []
+        for _ in range(200):
+            width, height = generator.randint(4, 40), generator.randint(4, 40)
+            position = packer.insert(width, height)
+            if position is None:
+                continue
+            area = rect.Rect(position, (width, height))
+            self.assertTrue(packer_area(packer).contains(area))
+            self.assertEqual(area.collidelist(packed), -1)
+            packed.append(area)
+
+        self.assertGreater(packer.occupancy, 0.7)
+
+    def test_full(self):
+        packer = atlas.SkylinePacker(32, 32)
+
+        self.assertEqual(packer.insert(32, 16), (0, 0))
+        self.assertEqual(packer.insert(16, 16), (0, 16))
+        self.assertEqual(packer.insert(16, 16), (16, 16))
+        self.assertIsNone(packer.insert(1, 1))
+
+
+def packer_area(packer):
+    return rect.Rect(0, 0, packer.width, packer.height)
+
+
+class TextureAtlasTestCase(unittest.TestCase):
+    """Tests the TextureAtlas class."""
+
+    def setUp(self):
+        self.atlas = atlas.TextureAtlas(page_size=64, padding=1)
+        self.atlas.add("red", make_surface(40, 40, (255, 0, 0, 255)))
+        self.atlas.add("green", make_surface(20, 10, (0, 255, 0, 128)))
+        self.atlas.add("blue", make_surface(30, 30, (0, 0, 255, 255)))
+        self.atlas.build()
+
+    def test_handles_keep_pixels(self):
+        self.assertEqual(self.atlas["red"].get_size(), (40, 40))
+        self.assertEqual(self.atlas["green"].get_at((5, 5)),
+                         (0, 255, 0, 128))
+        self.assertEqual(self.atlas["blue"].get_at((29, 29)),
+                         (0, 0, 255, 255))
+
+    def test_pages_are_added_when_full(self):
+        self.assertEqual(len(self.atlas.pages), 2)
+        self.assertEqual(len(self.atlas), 3)
+
+    def test_too_big(self):
+        with self.assertRaises(ValueError):
+            self.atlas.add("huge", make_surface(64, 64, (0, 0, 0, 255)))
+
+    def test_blit_sequence(self):
+        target = surface.Surface((100, 100), constants.SRCALPHA)
+        target.fill((0, 0, 0, 0))
+        target.blits(self.atlas.blit_sequence([("red", (0, 0)),
+                                               ("blue", (50, 50))]))
+
+        self.assertEqual(target.get_at((39, 39)), (255, 0, 0, 255))
+        self.assertEqual(target.get_at((45, 45)), (0, 0, 0, 0))
+        self.assertEqual(target.get_at((79, 79)), (0, 0, 255, 255))
+
+    def test_particle_image(self):
+        screen = surface.Surface((100, 100))
+        particle = effects.Particle(screen, self.atlas["red"], 10, 10)
+
+        self.assertEqual(particle.rect.size, (40, 40))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "atlas.json")
+            self.atlas.save(path)
+            loaded = atlas.TextureAtlas.load(path)
+
+        self.assertEqual(loaded.regions, self.atlas.regions)
+        self.assertEqual(loaded["green"].get_at((0, 0)), (0, 255, 0, 128))
+
+        # Loaded pages are never packed into again.
+        loaded.add("more", make_surface(8, 8, (1, 2, 3, 255)))
+        loaded.build()
+        self.assertEqual(loaded.regions["more"][0], 2)
+
+    def test_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            images = os.path.join(directory, "images")
+            os.makedirs(os.path.join(images, "icons"))
+            atlas.image.save(make_surface(8, 8, (255, 0, 0, 255)),
+                             os.path.join(images, "icons", "a.png"))
+            atlas.image.save(make_surface(4, 4, (0, 255, 0, 255)),
+                             os.path.join(images, "b.png"))
+            path = os.path.join(directory, "cache", "atlas.json")
+            os.makedirs(os.path.dirname(path))
+
+            built = atlas.TextureAtlas.cached(images, path, page_size=32)
+            cached = atlas.TextureAtlas.cached(images, path, page_size=32)
+
+        self.assertEqual(set(built.regions), {"icons/a.png", "b.png"})
+        self.assertEqual(cached.regions, built.regions)
+        self.assertEqual(cached["b.png"].get_at((0, 0)), (0, 255, 0, 255))
+
+    def test_cache_follows_the_images(self):
+        with tempfile.TemporaryDirectory() as directory:
+            images = os.path.join(directory, "images")
+            os.makedirs(images)
+            first = os.path.join(images, "a.png")
+            atlas.image.save(make_surface(8, 8, (255, 0, 0, 255)), first)
+            path = os.path.join(directory, "atlas.json")
+            atlas.TextureAtlas.cached(images, path, page_size=32)
+
+            # An image older than the cache, e.g. from a checkout.
+            second = os.path.join(images, "b.png")
+            atlas.image.save(make_surface(4, 4, (0, 255, 0, 255)), second)
+            os.utime(second, (0, 0))
+            added = atlas.TextureAtlas.cached(images, path, page_size=32)
+
+            os.rename(first, os.path.join(images, "c.png"))
+            renamed = atlas.TextureAtlas.cached(images, path, page_size=32)
+
+            os.remove(second)
+            removed = atlas.TextureAtlas.cached(images, path, page_size=32)
+
+        self.assertEqual(set(added.regions), {"a.png", "b.png"})
+        self.assertEqual(set(renamed.regions), {"b.png", "c.png"})
+        self.assertEqual(set(removed.regions), {"c.png"})
+
+
+def benchmark(count=500, frames=200):
+    """Compares blitting separate surfaces with blitting from an
+    atlas.
+    """
+
+    display.set_mode((800, 600))
+    screen = display.get_surface()
+    generator = random.Random(0)
+    surfaces = [
+        make_surface(generator.randint(8, 32), generator.randint(8, 32),
+                     (generator.randrange(256), 0, 0, 255)).convert_alpha()
+        for _ in range(count)
+    ]
+    texture_atlas = atlas.TextureAtlas(page_size=512)
+    for index, surface_ in enumerate(surfaces):
+        texture_atlas.add(str(index), surface_)
+    texture_atlas.build()
+    texture_atlas.convert()
+    positions = [(generator.randrange(780), generator.randrange(580))
+                 for _ in range(count)]
+
+    separate = list(zip(surfaces, positions))
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.blits(separate, False)
+    separate_time = time.perf_counter() - start
+
+    sequence = texture_atlas.blit_sequence(
+        (str(index), position) for index, position in enumerate(positions)
+    )
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.blits(sequence, False)
+    atlas_time = time.perf_counter() - start
+
+    print(f"{count} surfaces in {len(texture_atlas.pages)} pages "
+          f"({100 * texture_atlas.occupancy:.1f}% used)")
+    print(f"separate surfaces {1000 * separate_time / frames:.3f}ms/frame, "
+          f"atlas {1000 * atlas_time / frames:.3f}ms/frame")
+
+
+if __name__ == "__main__":
+    benchmark()
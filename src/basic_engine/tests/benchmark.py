@@ -0,0 +1,44 @@
+import unittest
+
+from .. import benchmark
+from . import game as game_test
+
+benchmark.use_dummy_drivers()
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    """Tests the headless benchmark runner."""
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+
+        self.assertEqual(benchmark.percentile(values, 50), 3)
+        self.assertEqual(benchmark.percentile(values, 99), 5)
+        self.assertEqual(benchmark.percentile(values, 0), 1)
+
+    def test_run_frames(self):
+        report = benchmark.run(game_test.create_game(), frames=20)
+
+        self.assertEqual(report.frames, 20)
+        self.assertEqual(list(report.scenes()), ["main_scene"])
+        self.assertEqual(report.to_dict()["frame_time"]["frames"], 20)
+
+    def test_run_duration(self):
+        game_ = game_test.create_game()
+        game_.FPS = 30
+
+        report = benchmark.run(game_, duration=0.5)
+
+        self.assertEqual(report.frames, 15)
+
+    def test_uncapped_game(self):
+        game_ = game_test.create_game()
+        game_.FPS = 0
+
+        report = benchmark.run(game_, duration=0.5)
+
+        self.assertEqual(report.frames, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import array
+import math
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import pygame
+from pygame import constants, display, image, mixer, surface
+
+from .. import bundle, utils
+
+
+def make_assets(directory, images=3, sounds=1, size=(16, 8)):
+    """Writes images, sounds and a text file into a directory."""
+
+    os.makedirs(os.path.join(directory, "images"), exist_ok=True)
+    for index in range(images):
+        picture = surface.Surface(size, constants.SRCALPHA)
+        picture.fill((index * 10 % 256, 100, 200, 128))
+        image.save(picture, os.path.join(directory, "images",
+                                         f"{index}.png"))
+
+    opaque = surface.Surface(size)
+    opaque.fill((255, 0, 255))
+    opaque.fill((10, 20, 30), (0, 0, 4, 4))
+    image.save(opaque, os.path.join(directory, "opaque.bmp"))
+
+    frequency, _, channels = mixer.get_init()
+    samples = array.array("h", (
+        int(8000 * math.sin(index / 10))
+        for index in range(frequency // 10 * channels)
+    ))
+    for index in range(sounds):
+        with open(os.path.join(directory, f"beep{index}.wav"), "wb") as wav:
+            wav.write(_wav(samples, frequency, channels))
+
+    with open(os.path.join(directory, "notes.txt"), "w") as notes:
+        notes.write("hello")
+
+
+def _wav(samples, frequency, channels):
+    data = samples.tobytes()
+    block_align = 2 * channels
+    return b"".join([
+        b"RIFF", (36 + len(data)).to_bytes(4, "little"), b"WAVE",
+        b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"),
+        channels.to_bytes(2, "little"), frequency.to_bytes(4, "little"),
+        (frequency * block_align).to_bytes(4, "little"),
+        block_align.to_bytes(2, "little"), (16).to_bytes(2, "little"),
+        b"data", len(data).to_bytes(4, "little"), data,
+    ])
+
+
+class BundleTestCase(unittest.TestCase):
+    """Tests building and loading bundles."""
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        mixer.init()
+        cls.directory = tempfile.mkdtemp()
+        cls.assets = os.path.join(cls.directory, "assets")
+        make_assets(cls.assets)
+        cls.path = os.path.join(cls.directory, "assets.bundle")
+        cls.count = bundle.build(cls.assets, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.bundle = bundle.Bundle(self.path, self.assets)
+
+    def tearDown(self):
+        self.bundle.close()
+
+    def test_index(self):
+        self.assertEqual(self.count, 6)
+        self.assertIn("images/0.png", self.bundle)
+        self.assertEqual(self.bundle.entries["beep0.wav"]["kind"], "sound")
+
+    def test_images_match_loose_files(self):
+        for name in ("images/2.png", "opaque.bmp"):
+            path = os.path.join(self.assets, name)
+            loose = image.load(path)
+            packed = self.bundle.get_image(path)
+
+            self.assertEqual(packed.get_size(), loose.get_size())
+            self.assertEqual(packed.get_at((5, 5)), loose.get_at((5, 5)))
+            self.assertEqual(packed.get_at((0, 0)), loose.get_at((0, 0)))
+
+        self.assertFalse(self.bundle.get_image(
+            os.path.join(self.assets, "opaque.bmp")
+        ).get_flags() & constants.SRCALPHA)
+
+    def test_sounds_and_raw_files(self):
+        path = os.path.join(self.assets, "beep0.wav")
+
+        self.assertEqual(self.bundle.get_sound(path).get_raw(),
+                         mixer.Sound(path).get_raw())
+        self.assertEqual(
+            self.bundle.get_bytes(os.path.join(self.assets, "notes.txt")),
+            b"hello",
+        )
+
+    def test_missing(self):
+        self.assertIsNone(self.bundle.get_image(
+            os.path.join(self.assets, "missing.png")
+        ))
+        self.assertIsNone(self.bundle.get_image("/elsewhere/0.png"))
+        self.assertIsNone(self.bundle.get_sound(
+            os.path.join(self.assets, "images", "0.png")
+        ))
+
+    def test_mounted_in_utils(self):
+        path = os.path.join(self.assets, "images", "1.png")
+        utils.mount_bundle(self.bundle)
+        try:
+            os.rename(path, path + ".moved")
+            try:
+                loaded = utils.load_image(path)
+            finally:
+                os.rename(path + ".moved", path)
+        finally:
+            utils.unmount_bundle(self.bundle)
+
+        self.assertEqual(loaded.get_at((0, 0)), (10, 100, 200, 128))
+
+    def test_not_a_bundle(self):
+        with self.assertRaises(ValueError):
+            bundle.Bundle(os.path.join(self.assets, "notes.txt"))
+
+
+def benchmark(images=300, sounds=20, size=(64, 64)):
+    """Compares loading loose files with loading them from a bundle."""
+
+    pygame.init()
+    mixer.init()
+    display.set_mode((320, 240))
+    with tempfile.TemporaryDirectory() as directory:
+        assets = os.path.join(directory, "assets")
+        make_assets(assets, images, sounds, size)
+        paths = [os.path.join(assets, "images", f"{index}.png")
+                 for index in range(images)]
+        sound_paths = [os.path.join(assets, f"beep{index}.wav")
+                       for index in range(sounds)]
+
+        start = time.perf_counter()
+        bundle.build(assets, os.path.join(directory, "assets.bundle"))
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            utils.load_image(path)
+        for path in sound_paths:
+            utils.load_soundfx(path)
+        loose_time = time.perf_counter() - start
+        utils.soundfx_cache.clear()
+
+        start = time.perf_counter()
+        assets_bundle = bundle.Bundle(os.path.join(directory,
+                                                   "assets.bundle"), assets)
+        utils.mount_bundle(assets_bundle)
+        for path in paths:
+            utils.load_image(path)
+        for path in sound_paths:
+            utils.load_soundfx(path)
+        bundle_time = time.perf_counter() - start
+        utils.unmount_bundle(assets_bundle)
+        assets_bundle.close()
+
+    print(f"{images} images of {size[0]}x{size[1]} and {sounds} sounds "
+          f"(bundle built in {1000 * build_time:.1f}ms)")
+    print(f"loose files {1000 * loose_time:.1f}ms, "
+          f"bundle {1000 * bundle_time:.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,168 @@
+import random
+import time
+import unittest
+
+from pygame import rect as pg_rect, sprite, surface
+
+from .. import camera, spatial
+
+
+class Block(sprite.Sprite):
+    """Sprite of a coloured square in world coordinates."""
+
+    def __init__(self, x, y, colour=(255, 0, 0), size=8):
+        super().__init__()
+
+        self.image = surface.Surface((size, size))
+        self.image.fill(colour)
+        self.rect = self.image.get_rect(topleft=(x, y))
+
+
+class CameraTestCase(unittest.TestCase):
+    """Tests the camera transforms, following and culled draws."""
+
+    def setUp(self):
+        self.screen = surface.Surface((100, 50))
+        self.camera = camera.Camera(self.screen.get_rect(),
+                                    world_rect=(0, 0, 1000, 500))
+
+    def test_transforms(self):
+        self.camera.move(200, 100)
+
+        self.assertEqual(self.camera.world_to_screen((210, 105)), (10, 5))
+        self.assertEqual(self.camera.screen_to_world((10, 5)), (210, 105))
+        self.assertEqual(self.camera.view_rect, (200, 100, 100, 50))
+
+        self.camera.zoom = 2
+        self.assertEqual(self.camera.center, (250, 125))
+        self.assertEqual(self.camera.view_rect, (225, 112, 50, 26))
+        self.assertEqual(self.camera.apply((225, 112.5, 10, 10)),
+                         (0, -1, 20, 20))
+
+        with self.assertRaises(ValueError):
+            self.camera.zoom = 0
+
+    def test_world_bounds(self):
+        self.camera.move(-50, 2000)
+        self.assertEqual((self.camera.x, self.camera.y), (0, 450))
+
+        self.camera.zoom = 0.05
+        self.assertEqual(self.camera.center, (500, 250))
+
+    def test_follow(self):
+        target = Block(500, 300)
+        self.camera.follow(target)
+        self.camera.update()
+        self.assertEqual(self.camera.center, target.rect.center)
+
+        self.camera.follow(target, smoothing=0.5)
+        target.rect.x += 100
+        self.camera.update(0.5)
+        self.assertAlmostEqual(self.camera.center[0], 504 + 100 * 0.632,
+                               delta=0.1)
+
+    def test_deadzone(self):
+        target = Block(500, 300)
+        self.camera.center = (504, 304)
+        self.camera.follow(target, deadzone=(25, 0, 50, 50))
+
+        target.rect.x += 20
+        self.camera.update()
+        self.assertEqual(self.camera.center, (504, 304))
+
+        target.rect.x += 20
+        self.camera.update()
+        self.assertEqual(self.camera.center[0], 519)
+
+    def test_draw_culls(self):
+        visible = Block(220, 110)
+        hidden = Block(600, 110, (0, 255, 0))
+        group = sprite.Group(visible, hidden)
+        self.camera.move(200, 100)
+
+        touched = self.camera.draw_group(self.screen, group)
+
+        self.assertEqual(touched, [(20, 10, 8, 8)])
+        self.assertEqual(self.screen.get_at((20, 10)), (255, 0, 0, 255))
+        self.assertIsNone(self.camera.draw_sprite(self.screen, hidden))
+
+    def test_draw_zoomed_and_clipped(self):
+        self.camera = camera.Camera((10, 10, 40, 20), zoom=2)
+        block = Block(16, 0)
+
+        touched = self.camera.draw_sprite(self.screen, block)
+
+        # Only the part in the viewport is drawn.
+        self.assertEqual(touched, (42, 10, 8, 16))
+        self.assertEqual(self.screen.get_at((49, 10)), (255, 0, 0, 255))
+        self.assertEqual(self.screen.get_at((50, 10)), (0, 0, 0, 255))
+        self.assertEqual(self.screen.get_clip(), self.screen.get_rect())
+
+    def test_scaled_images_budget(self):
+        budget = 4 * 16 * 16 * 4
+        self.camera = camera.Camera((0, 0, 100, 50), zoom=2,
+                                    max_bytes=budget)
+        for x in range(0, 80, 8):
+            self.camera.draw_sprite(self.screen, Block(x, 0))
+
+        self.assertEqual(len(self.camera._scaled), 4)
+        self.assertLessEqual(self.camera._scaled.size, budget)
+
+    def test_draw_indexed(self):
+        index = spatial.SpatialHash()
+        blocks = [Block(x, 0) for x in range(0, 1000, 10)]
+        for block in blocks:
+            index.insert(block)
+
+        touched = self.camera.draw_indexed(self.screen, index,
+                                           key=lambda block: block.rect.x)
+
+        self.assertEqual([rect.x for rect in touched], list(range(0, 100, 10)))
+
+
+def benchmark(sizes=(1000, 10000, 100000), frames=100):
+    """Compares drawing every sprite of growing worlds with drawing
+    only the visible ones.
+    """
+
+    screen = surface.Surface((800, 600))
+    image = surface.Surface((16, 16))
+    random.seed(1)
+
+    for size in sizes:
+        side = int((size * 16 * 16 * 4) ** 0.5)
+        blocks = sprite.Group()
+        index = spatial.SpatialHash()
+        for _ in range(size):
+            block = sprite.Sprite()
+            block.image = image
+            block.rect = pg_rect.Rect(random.randrange(side),
+                                      random.randrange(side), 16, 16)
+            blocks.add(block)
+            index.insert(block)
+        view = camera.Camera(screen.get_rect(), (0, 0, side, side))
+        view.center = (side / 2, side / 2)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            screen.blits([(block.image, view.apply(block.rect))
+                          for block in blocks])
+        everything = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            view.draw_group(screen, blocks)
+        culled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            view.draw_indexed(screen, index)
+        indexed = time.perf_counter() - start
+
+        print(f"{size} sprites: all {1000 * everything / frames:.2f}ms, "
+              f"culled {1000 * culled / frames:.2f}ms, "
+              f"indexed {1000 * indexed / frames:.2f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
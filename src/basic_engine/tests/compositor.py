@@ -0,0 +1,195 @@
+import time
+import unittest
+
+from pygame import draw, rect as pg_rect, surface
+
+from .. import compositor, scene
+
+
+class Box:
+    """Dynamic layer drawing a square that can be moved."""
+
+    def __init__(self, x, colour=(255, 0, 0)):
+        self.rect = pg_rect.Rect(x, 0, 4, 4)
+        self.colour = colour
+        self.draws = 0
+
+    def __call__(self, target):
+        self.draws += 1
+        return target.fill(self.colour, self.rect)
+
+
+class CompositorTestCase(unittest.TestCase):
+    """Tests composing static and dynamic layers."""
+
+    def setUp(self):
+        self.screen = surface.Surface((32, 16))
+        self.compositor = compositor.Compositor(self.screen)
+        self.renders = []
+
+    def background(self, target):
+        self.renders.append("background")
+        target.fill((0, 0, 255))
+
+    def test_static_layers_are_cached(self):
+        self.compositor.add_layer("background", self.background, static=True)
+
+        self.assertIsNone(self.compositor.draw())
+        self.assertEqual(self.compositor.draw(), [])
+        self.assertEqual(self.renders, ["background"])
+
+        self.compositor.invalidate("background")
+        self.assertIsNone(self.compositor.draw())
+        self.assertEqual(self.renders, ["background", "background"])
+
+        # A full redraw reuses the cache.
+        self.screen.fill((0, 0, 0))
+        self.compositor.redraw()
+        self.assertIsNone(self.compositor.draw())
+        self.assertEqual(len(self.renders), 2)
+        self.assertEqual(self.screen.get_at((0, 0)), (0, 0, 255, 255))
+
+    def test_dynamic_areas_are_restored(self):
+        box = Box(0)
+        self.compositor.add_layer("box", box, z=1)
+        self.compositor.add_layer("background", self.background, static=True)
+        self.compositor.draw()
+
+        box.rect.x = 10
+        touched = self.compositor.draw()
+
+        self.assertEqual(touched, [(0, 0, 4, 4), (10, 0, 4, 4)])
+        self.assertEqual(self.screen.get_at((0, 0)), (0, 0, 255, 255))
+        self.assertEqual(self.screen.get_at((10, 0)), (255, 0, 0, 255))
+        self.assertEqual(box.draws, 2)
+
+    def test_static_layer_over_dynamic_one(self):
+        def frame(target):
+            target.fill((0, 255, 0), (0, 0, 32, 2))
+
+        box = Box(0)
+        self.compositor.add_layer("background", self.background, static=True)
+        self.compositor.add_layer("box", box, z=1)
+        self.compositor.add_layer("frame", frame, z=2, static=True)
+        self.compositor.draw()
+
+        self.assertEqual(self.screen.get_at((0, 0)), (0, 255, 0, 255))
+        self.assertEqual(self.screen.get_at((0, 3)), (255, 0, 0, 255))
+
+        box.rect.x = 10
+        self.compositor.draw()
+
+        self.assertEqual(self.screen.get_at((10, 0)), (0, 255, 0, 255))
+        self.assertEqual(self.screen.get_at((0, 3)), (0, 0, 255, 255))
+
+    def test_untracked_dynamic_layer(self):
+        self.compositor.add_layer("background", self.background, static=True)
+        self.compositor.add_layer("hud", lambda target: None, z=1)
+        self.compositor.draw()
+
+        self.assertIsNone(self.compositor.draw())
+
+    def test_damage(self):
+        self.compositor.add_layer("background", self.background, static=True)
+        self.compositor.draw()
+
+        self.screen.fill((255, 255, 255), (20, 0, 4, 4))
+        self.compositor.damage((20, 0, 4, 4))
+
+        self.assertEqual(self.compositor.draw(), [(20, 0, 4, 4)])
+        self.assertEqual(self.screen.get_at((20, 0)), (0, 0, 255, 255))
+
+    def test_layers(self):
+        self.compositor.add_layer("background", self.background, static=True)
+
+        with self.assertRaises(ValueError):
+            self.compositor.add_layer("background", self.background)
+
+        self.compositor.draw()
+        self.assertEqual(self.compositor.nbytes(), 32 * 16 * 4)
+
+        self.compositor.remove_layer("background")
+        self.assertNotIn("background", self.compositor)
+        self.assertIsNone(self.compositor.draw())
+
+
+class ComposedScene(scene.Scene):
+    """Scene with a static background and particles on top."""
+
+    def __init__(self, screen):
+        super().__init__(screen)
+
+        self.compositor.add_layer("background", self.draw_background,
+                                  static=True)
+        self.compositor.add_layer("particles", self.draw_particles, z=1)
+
+    def draw_background(self, target):
+        target.fill((0, 0, 255))
+
+
+class SceneCompositorTestCase(unittest.TestCase):
+    """Tests scenes and the scene manager using the compositor."""
+
+    def setUp(self):
+        self.screen = surface.Surface((32, 16))
+        self.manager = scene.SceneManager()
+        self.scene = ComposedScene(self.screen)
+        self.manager.add("composed", self.scene)
+
+    def test_full_redraw_on_scene_change(self):
+        self.assertIsNone(self.manager.show())
+        self.assertEqual(self.manager.show(), [])
+
+        self.manager.full_redraw = True
+        self.assertIsNone(self.manager.show())
+
+    def test_damage(self):
+        self.manager.show()
+        self.screen.fill((255, 255, 255), (0, 0, 2, 2))
+
+        self.assertTrue(self.manager.damage(pg_rect.Rect(0, 0, 2, 2)))
+        self.assertEqual(self.manager.show(), [(0, 0, 2, 2)])
+        self.assertEqual(self.screen.get_at((0, 0)), (0, 0, 255, 255))
+
+        self.manager.add("plain", scene.Scene(self.screen))
+        self.manager.change_scene("plain")
+        self.assertFalse(self.manager.damage(None))
+
+
+def benchmark(frames=300, circles=400, size=(800, 600)):
+    """Compares repainting a busy background every frame with
+    composing it from a cached layer.
+    """
+
+    screen = surface.Surface(size)
+    box = Box(0)
+
+    def background(target):
+        target.fill((0, 0, 80))
+        for index in range(circles):
+            draw.circle(target, (index % 256, 120, 200),
+                        (index * 37 % size[0], index * 53 % size[1]), 12)
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        background(screen)
+        box.rect.x = frame
+        box(screen)
+    repaint_time = time.perf_counter() - start
+
+    layers = compositor.Compositor(screen)
+    layers.add_layer("background", background, static=True)
+    layers.add_layer("box", box, z=1)
+    start = time.perf_counter()
+    for frame in range(frames):
+        box.rect.x = frame
+        layers.draw()
+    composed_time = time.perf_counter() - start
+
+    print(f"{frames} frames over {circles} circles")
+    print(f"repainted {1000 * repaint_time / frames:.3f}ms/frame, "
+          f"composed {1000 * composed_time / frames:.3f}ms/frame")
+
+
+if __name__ == "__main__":
+    benchmark()
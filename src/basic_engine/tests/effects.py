@@ -0,0 +1,130 @@
+import unittest
+
+from pygame import sprite, surface
+
+from .. import effects, scene
+
+
+class ParticlePoolTestCase(unittest.TestCase):
+    """Tests the pooling of Particle objects."""
+
+    def setUp(self):
+        self.screen = surface.Surface((200, 100))
+        self.pool = effects.ParticlePool(self.screen, surface.Surface((2, 2)),
+                                         capacity=10)
+
+    def test_preallocated(self):
+        self.assertEqual(len(self.pool), 10)
+        self.assertEqual(self.pool.created, 10)
+
+    def test_killed_particles_are_reused(self):
+        group = effects.Particle.create_particles(self.screen, None, 5, 5,
+                                                  amount=10, pool=self.pool)
+        particles = set(group)
+
+        self.assertEqual(len(self.pool), 0)
+
+        for particle in particles:
+            particle.kill()
+            particle.kill()
+
+        self.assertEqual(len(self.pool), 10)
+
+        group = effects.Particle.create_particles(self.screen, None, 7, 9,
+                                                  amount=12, pool=self.pool)
+
+        self.assertTrue(particles < set(group))
+        self.assertEqual(self.pool.created, 12)
+        for particle in group:
+            self.assertEqual(particle.rect.topleft, (7, 9))
+
+
+class ParticleGroupsTestCase(unittest.TestCase):
+    """Tests the ParticleGroups container of the scenes."""
+
+    def test_empty_groups_are_removed(self):
+        scene_ = scene.Scene(surface.Surface((200, 100)))
+        groups = [sprite.Group(), sprite.Group(sprite.Sprite()),
+                  sprite.Group()]
+        for group in groups:
+            scene_.particles_groups.append(group)
+
+        scene_.update_particles()
+
+        self.assertEqual(list(scene_.particles_groups), [groups[1]])
+
+
+class ParticleSystemTestCase(unittest.TestCase):
+    """Tests the ParticleSystem and Emitter classes."""
+
+    def setUp(self):
+        self.screen = surface.Surface((200, 100))
+        self.image = surface.Surface((2, 2))
+        self.particles = effects.ParticleSystem(self.screen, self.image,
+                                                capacity=100, seed=0)
+
+    def test_emit_respects_capacity(self):
+        self.particles.emit(10, 10, 80)
+        self.particles.emit(10, 10, 80)
+
+        self.assertEqual(len(self.particles), 100)
+
+    def test_update_integrates(self):
+        self.particles.emit(50, 10, 1, velocity=((2, 2), (1, 1)),
+                            acceleration=((0, 0), (3, 3)))
+        self.particles.update()
+        self.particles.update()
+
+        self.assertEqual(self.particles.positions[0].tolist(), [54, 15])
+
+    def test_update_culls_particles(self):
+        self.particles.emit(50, 50, 5, velocity=((0, 0), (0, 0)),
+                            lifetime=2)
+        self.particles.emit(199, 50, 5, velocity=((5, 5), (0, 0)))
+        self.particles.update()
+
+        self.assertEqual(len(self.particles), 5)
+
+        self.particles.update()
+
+        self.assertEqual(len(self.particles), 0)
+
+    def test_emitter(self):
+        emitter = self.particles.add_emitter(
+            effects.Emitter(100, 50, rate=0.5, burst=4, lifetime=4,
+                            velocity=((0, 0), (0, 0)),
+                            acceleration=((0, 0), (0, 0)))
+        )
+
+        for _ in range(4):
+            self.assertTrue(self.particles.emitting)
+            self.particles.update()
+
+        self.assertFalse(emitter.active)
+        self.assertFalse(self.particles.emitting)
+        self.assertEqual(len(self.particles), 6)
+
+    def test_draw(self):
+        self.assertIsNone(self.particles.draw())
+
+        self.particles.emit(10, 20, 1, velocity=((0, 0), (0, 0)))
+        self.image.fill((255, 0, 0))
+        touched = self.particles.draw()
+
+        self.assertEqual((touched.x, touched.y), (10, 20))
+        self.assertEqual(self.screen.get_at((11, 21)), (255, 0, 0, 255))
+
+    def test_hosted_by_scene(self):
+        scene_ = scene.Scene(self.screen)
+        self.particles.add_emitter(effects.Emitter(100, 50, rate=1))
+        scene_.particles_groups.append(self.particles)
+
+        scene_.update_particles()
+        scene_.draw_particles()
+
+        self.assertEqual(list(scene_.particles_groups), [self.particles])
+        self.assertEqual(scene_.particles_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,8 @@
+import asyncio
+import time
+import unittest
+
+import pygame
 from pygame import draw, surface
 from .. import game, scene
 
@@ -8,19 +13,164 @@ class MainScene(scene.Scene):
     def __init__(self, screen: surface.Surface):
         super().__init__(screen)
 
-    def draw(self) -> None:
-        self.screen.fill((0, 0, 178))
-        draw.circle(self.screen, (170, 170, 170),
-                    (self.screen.get_width() / 2,
-                     self.screen.get_height() / 2), 30)
+        self.compositor.add_layer("background", self.draw_background,
+                                  static=True)
 
+    def draw_background(self, target: surface.Surface) -> None:
+        target.fill((0, 0, 178))
+        draw.circle(target, (170, 170, 170),
+                    (target.get_width() / 2, target.get_height() / 2), 30)
+
+
+class CountingScene(scene.Scene):
+    """Scene that records how it was updated and drawn."""
+
+    def __init__(self, screen: surface.Surface):
+        super().__init__(screen)
+
+        self.updates = 0
+        self.alphas = []
+
+    def draw(self, alpha=1.0) -> None:
+        self.alphas.append(alpha)
+
+    def update(self) -> None:
+        self.updates += 1
+
+
+class FixedTimestepTestCase(unittest.TestCase):
+    """Tests the fixed-timestep mode of the Game class."""
+
+    def setUp(self):
+        self.game = game.Game(60, 40, "Fixed timestep test")
+        self.game.TICK_RATE = 50  # One tick every 20ms
+        self.scene = CountingScene(self.game.screen)
+        self.game.add_scene("counting", self.scene)
+
+    def test_ticks_follow_elapsed_time(self):
+        self.game._fixed_step(50)
+
+        self.assertEqual(self.scene.updates, 2)
+        self.assertAlmostEqual(self.scene.alphas[-1], 0.5)
+
+        self.game._fixed_step(10)
+
+        self.assertEqual(self.scene.updates, 3)
+        self.assertAlmostEqual(self.scene.alphas[-1], 0.0)
+
+    def test_catch_up_is_capped(self):
+        self.game._fixed_step(1010)
+
+        self.assertEqual(self.scene.updates, self.game.MAX_CATCH_UP_TICKS)
+        self.assertAlmostEqual(self.scene.alphas[-1], 0.5)
+
+    def test_draw_without_ticks(self):
+        self.game._fixed_step(5)
+
+        self.assertEqual(self.scene.updates, 0)
+        self.assertEqual(len(self.scene.alphas), 1)
+
+
+class AsyncScene(CountingScene):
+    """Scene scheduling coroutines from its update."""
+
+    def __init__(self, screen: surface.Surface, coroutine=None):
+        super().__init__(screen)
+
+        self.coroutine = coroutine
+
+    def update(self) -> None:
+        super().update()
+        if self.coroutine is not None:
+            self.schedule(self.coroutine)
+            self.coroutine = None
+
+
+class AsyncLoopTestCase(unittest.TestCase):
+    """Tests running the main loop on asyncio."""
+
+    def setUp(self):
+        self.game = game.Game(60, 40, "Async loop test")
+        self.game.FPS = 100
+        pygame.event.clear()
+
+    def run_scene(self, coroutine):
+        self.scene = AsyncScene(self.game.screen, coroutine)
+        self.game.add_scene("async", self.scene)
+        asyncio.run(self.game.run_async())
+
+    def test_coroutines_run_between_frames(self):
+        async def load():
+            await asyncio.sleep(0.05)
+            data = await asyncio.to_thread(sum, range(10))
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return data
+
+        coroutine = load()
+        start = time.perf_counter()
+        self.run_scene(coroutine)
+        elapsed = time.perf_counter() - start
+
+        # Frames kept being paced at FPS while the coroutine waited.
+        self.assertAlmostEqual(self.scene.updates, elapsed * 100, delta=3)
+        self.assertEqual(self.scene.tasks, set())
+
+    def test_busy_coroutines_dont_starve_frames(self):
+        async def busy():
+            start = time.perf_counter()
+            while time.perf_counter() - start < 0.2:
+                time.sleep(0.001)
+                await asyncio.sleep(0)
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+        self.run_scene(busy())
+
+        self.assertGreaterEqual(self.scene.updates, 15)
+
+    def test_errors_stop_the_loop(self):
+        async def fail():
+            raise KeyError("missing save")
+
+        with self.assertRaises(KeyError):
+            self.run_scene(fail())
+
+    def test_tasks_cancelled_on_quit(self):
+        cancelled = []
+
+        async def forever():
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        self.run_scene(forever())
+
+        self.assertEqual(cancelled, [True])
+
+    def test_schedule_needs_a_running_loop(self):
+        async def nothing():
+            pass
+
+        coroutine = nothing()
+        with self.assertRaises(RuntimeError):
+            scene.Scene(self.game.screen).schedule(coroutine)
+        coroutine.close()
+
+
+def create_game() -> game.Game:
+    """Creates the example game. It's also a benchmark target."""
 
-def main():
     game_ = game.Game(600, 400, "Game example")
 
     game_.add_scene("main_scene", MainScene(game_.screen))
 
-    game_.start()
+    return game_
+
+
+def main():
+    create_game().start()
 
 
 if __name__ == "__main__":
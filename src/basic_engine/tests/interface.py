@@ -1,9 +1,11 @@
+import time
 import unittest
 from random import choice, randint
-from pygame import init
-from pygame import constants
+from pygame import init, quit as pg_quit
+from pygame import constants, event as pg_event, surface, time as pg_time
 
-from .. import game, interface, scene
+from .. import game, interface, pathfinding, scene, tween
+from .pathfinding import random_grid
 
 init()
 
@@ -11,6 +13,8 @@ init()
 class DebugScene(scene.Scene):
     """Scene for debugging the interface module."""
 
+    EVENT_TYPES = (constants.KEYDOWN, pathfinding.PATH_EVENT)
+
     def __init__(self, screen):
         super().__init__(screen)
 
@@ -19,11 +23,15 @@ class DebugScene(scene.Scene):
             self.screen, "This is merely a test text.", **self.text_attrs
         )
 
+        # Searches run on worker processes, started on the first one.
+        self.grid = random_grid(256, 256, 0.25)
+        self.pathfinder = pathfinding.PathfindingPool(max_workers=1)
         actions = [
-            ("A* algorithm", lambda: print("fatal1")),
-            ("Djikstra", lambda: print("fatal2")),
-            ("Breadth-First Search", lambda: print("fatal3")),
-            ("Depth-First Search", lambda: print("fatal4")),
+            ("A* algorithm", lambda: self.find_path("astar")),
+            ("Djikstra", lambda: self.find_path("dijkstra")),
+            ("Breadth-First Search", lambda: self.find_path("bfs")),
+            ("Depth-First Search", lambda: self.find_path("dfs")),
+            ("Jump Point Search", lambda: self.find_path("jps")),
         ]
 
         colour_args = {
@@ -41,19 +49,45 @@ class DebugScene(scene.Scene):
         self.timer.rect.bottom = self.screen_rect.bottom
         self.timer.rect.centerx = self.screen_rect.centerx
 
-    def draw(self) -> None:
+        self.add_widgets(self.button_bar, self.scene_label, self.timer)
+        self.listen(self.button_bar.update_on_event,
+                    *self.button_bar.EVENT_TYPES)
+
+    def draw(self, alpha=1.0):
+        if not self.widgets_changed():
+            return []
+
         self.screen.fill((0, 0, 0))
-        self.button_bar.draw()
-        self.scene_label.draw()
-        self.timer.draw()
+        return [
+            self.button_bar.draw(),
+            self.scene_label.draw(),
+            self.timer.draw(),
+        ]
 
     def update(self):
         self.timer.update()
         self.button_bar.update()
 
+    def on_unload(self):
+        self.pathfinder.shutdown(wait=False)
+
+    def find_path(self, algorithm):
+        goal = (self.grid.width - 1, self.grid.height - 1)
+        self.pathfinder.submit(self.grid, [((0, 0), goal)], algorithm,
+                               diagonal=algorithm == "jps", tag=algorithm)
+        self.scene_label.update_text(f"Running {algorithm}...",
+                                     **self.text_attrs)
+
     def update_on_event(self, event) -> None:
-        self.button_bar.update_on_event(event)
-        if event.type == constants.KEYDOWN:
+        if event.type == pathfinding.PATH_EVENT:
+            path = None if event.error else event.paths[0]
+            if path is None:
+                text = f"{event.tag} found no path"
+            else:
+                text = f"{event.tag} found {len(path)} cells"
+            self.scene_label.update_text(text, **self.text_attrs)
+            self.scene_label.rect.center = self.screen_rect.center
+        elif event.type == constants.KEYDOWN:
             if event.key == constants.K_c:
                 # Change the text colour
                 self.text_attrs.update(colour=[randint(0, 255) for n in range(3)])
@@ -116,13 +150,335 @@ class ButtonBarTestCase(unittest.TestCase):
         )
 
 
-def main():
-    """Main entry for testing the interface module."""
+class TextCacheTestCase(unittest.TestCase):
+    """Tests the fonts and rendered lines cache used by labels."""
+
+    def setUp(self):
+        self.cache = interface.TextCache(max_bytes=64 * 1024)
+
+    def test_fonts_are_shared(self):
+        first = self.cache.get_font(None, 20)
+        second = self.cache.get_font(None, 20)
+
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.font_hits, self.cache.font_misses),
+                         (1, 1))
+
+    def test_lines_are_cached(self):
+        font_key = (None, 20, False, False)
+        first = self.cache.render("cached", font_key, True, [1, 2, 3])
+        second = self.cache.render("cached", font_key, True, (1, 2, 3))
+        third = self.cache.render("cached", font_key, False, (1, 2, 3))
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(self.cache.lines.hits, 1)
+
+    def test_memory_cap(self):
+        font_key = (None, 30, False, False)
+        for number in range(200):
+            self.cache.render(f"line number {number}", font_key, True,
+                              (0, 0, 0))
+
+        self.assertLessEqual(self.cache.lines.size, 64 * 1024)
+        self.assertGreater(self.cache.lines.evictions, 0)
+
+    def test_label_uses_shared_cache(self):
+        interface.text_cache.clear()
+        interface.Label(None, "Same text and attributes")
+        misses = interface.text_cache.stats()["lines"]["misses"]
+        interface.Label(None, "Same text and attributes")
+
+        stats = interface.text_cache.stats()
+        self.assertEqual(stats["lines"]["misses"], misses)
+        self.assertEqual(stats["fonts"], 1)
+
+    def test_fonts_dropped_on_every_quit(self):
+        for _ in range(2):
+            interface.text_cache.get_font(None, 20)
+            pg_quit()
+            init()
+
+            self.assertEqual(interface.text_cache.fonts, {})
+
+
+class WidgetInvalidationTestCase(unittest.TestCase):
+    """Tests that widgets only report changes when they look different."""
+
+    def setUp(self):
+        self.screen = surface.Surface((800, 600))
+
+    def test_label(self):
+        label = interface.Label(self.screen, "Static text")
+
+        self.assertIsNotNone(label.draw())
+        self.assertIsNone(label.draw())
+
+        image = label.image
+        label.update_text("Static text")
+
+        self.assertIs(label.image, image)
+        self.assertFalse(label.changed)
+
+        label.rect.x += 10
+
+        self.assertTrue(label.changed)
+        self.assertIsNotNone(label.draw())
+
+        label.update_text("Other text")
+
+        self.assertTrue(label.changed)
+
+    def test_button_follows_mouse_events(self):
+        images = [surface.Surface((10, 10)) for _ in range(3)]
+        pressed = []
+        button = interface.Button(self.screen, images,
+                                  lambda: pressed.append(True))
+        button.draw()
+
+        button.update_on_event(pg_event.Event(
+            constants.MOUSEMOTION, pos=(50, 50), rel=(1, 1), buttons=(0, 0, 0)
+        ))
+        self.assertFalse(button.changed)
+
+        button.update_on_event(pg_event.Event(
+            constants.MOUSEMOTION, pos=(5, 5), rel=(1, 1), buttons=(0, 0, 0)
+        ))
+        self.assertIs(button.image, button.button_on_image)
+        self.assertIsNotNone(button.draw())
+
+        button.update_on_event(pg_event.Event(
+            constants.MOUSEBUTTONDOWN, pos=(5, 5), button=1
+        ))
+        self.assertIs(button.image, button.button_clicked_image)
+
+        button.update_on_event(pg_event.Event(
+            constants.MOUSEBUTTONUP, pos=(5, 5), button=1
+        ))
+        self.assertIs(button.image, button.button_on_image)
+        self.assertEqual(pressed, [True])
+
+    def test_button_bar(self):
+        button_bar = interface.ButtonBar(
+            self.screen, "Options", "right", ("One", None), ("Two", None)
+        )
+
+        self.assertIsNotNone(button_bar.draw())
+        self.assertIsNone(button_bar.draw())
+
+        button_bar.toggle()
+        frames = 0
+        while button_bar.on_animation:
+            tween.tweener.update(1 / 60)
+            button_bar.update()
+            button_bar.draw()
+            frames += 1
+
+        # The slide lasts the same whatever the frame rate.
+        self.assertEqual(frames, round(60 * button_bar.ANIMATION_DURATION))
+
+        self.assertTrue(button_bar.active)
+        self.assertIsNone(button_bar.draw())
+
+    def test_button_bar_speed(self):
+        class OldButtonBar(interface.ButtonBar):
+            ANIMATION_SPEED = 20
+
+        button_bar = OldButtonBar(
+            self.screen, "Options", "left", ("One", None), ("Two", None)
+        )
+        button_bar.toggle()
+        frames = 0
+        while button_bar.on_animation:
+            tween.tweener.update(1 / 60)
+            button_bar.update()
+            frames += 1
+
+        # As many frames as sliding 20 pixels each one.
+        self.assertEqual(frames, -(-button_bar.bar_rect.width // 20))
+        self.assertEqual(button_bar.bar_rect.x, 0)
+
+    def test_chronometer(self):
+        chronometer = interface.Chronometer(self.screen, (255, 255, 255))
+        chronometer.draw()
+        chronometer.start()
+        chronometer.update()
+
+        self.assertFalse(chronometer.changed)
+
+        chronometer.starting_ticks -= 1000
+        chronometer.update()
+
+        self.assertTrue(chronometer.changed)
+        self.assertEqual(chronometer.label.text, "00:01")
+
+    def test_scene_skips_unchanged_frames(self):
+        scene_ = DebugScene(self.screen)
+
+        self.assertTrue(scene_.widgets_changed())
+        self.assertTrue(scene_.draw())
+        self.assertEqual(scene_.draw(), [])
+
+        scene_.invalidate()
+
+        self.assertTrue(scene_.widgets_changed())
+
+
+class EventRoutingTestCase(unittest.TestCase):
+    """Tests the dispatching of events by their type."""
+
+    def setUp(self):
+        self.app = game.Game(800, 600, "Event routing test")
+        self.scene = DebugScene(self.app.screen)
+        self.app.add_scene("main", self.scene)
+
+    def tearDown(self):
+        pg_event.set_allowed(None)
+
+    def test_event_types(self):
+        self.assertEqual(
+            self.scene.event_types(),
+            {constants.KEYDOWN, pathfinding.PATH_EVENT,
+             constants.MOUSEMOTION, constants.MOUSEBUTTONDOWN,
+             constants.MOUSEBUTTONUP},
+        )
+
+    def test_dispatch_by_type(self):
+        received = []
+        self.scene.update_on_event = received.append
+        self.scene.event_handlers[constants.KEYDOWN] = [received.append]
+
+        self.app.scene_manager.update_on_event(
+            pg_event.Event(constants.KEYUP, key=constants.K_c)
+        )
+        self.app.scene_manager.update_on_event(
+            pg_event.Event(constants.KEYDOWN, key=constants.K_c)
+        )
+
+        self.assertEqual([event.type for event in received],
+                         [constants.KEYDOWN])
+
+    def test_blocked_events(self):
+        self.app.filter_events()
+
+        self.assertTrue(pg_event.get_blocked(constants.KEYUP))
+        self.assertFalse(pg_event.get_blocked(constants.KEYDOWN))
+        self.assertFalse(pg_event.get_blocked(constants.QUIT))
+
+        self.scene.EVENT_TYPES = None
+        self.app.filter_events()
+
+        self.assertFalse(pg_event.get_blocked(constants.KEYUP))
+
+    def test_coalesce_motion(self):
+        def motion(x, y):
+            return pg_event.Event(constants.MOUSEMOTION, pos=(x, y),
+                                  rel=(1, 2), buttons=(0, 0, 0))
+
+        click = pg_event.Event(constants.MOUSEBUTTONDOWN, pos=(3, 3),
+                               button=1)
+        events = game.coalesce_motion(
+            [motion(1, 1), motion(2, 2), click, motion(4, 4), motion(5, 5),
+             motion(6, 6)]
+        )
+
+        self.assertEqual([event.type for event in events],
+                         [constants.MOUSEMOTION, constants.MOUSEBUTTONDOWN,
+                          constants.MOUSEMOTION])
+        self.assertEqual(events[0].pos, (2, 2))
+        self.assertEqual(events[2].rel, (3, 6))
+
+
+class IdleLoopTestCase(unittest.TestCase):
+    """Tests the idle mode of the game loop with the debug scene."""
+
+    def setUp(self):
+        self.app = create_game()
+        self.app.IDLE_WAIT = True
+        self.scene = self.app.scene_manager.get_scene("main")
+        # Draw everything once, after which the scene is static.
+        self.app.run_frame()
+        self.app.run_frame()
+        pg_event.clear()
+
+    def tearDown(self):
+        pg_time.set_timer(constants.KEYDOWN, 0)
+        pg_event.set_allowed(None)
+        pg_event.clear()
+
+    def test_static_scene_sleeps_until_input(self):
+        self.assertIsNone(self.app.scene_manager.next_wakeup())
+
+        text = self.scene.scene_label.text
+        pg_time.set_timer(pg_event.Event(constants.KEYDOWN,
+                                         key=constants.K_u), 100, 1)
+        waited = self.app.wait_idle()
+        self.assertGreaterEqual(waited, 80)
+
+        # The event that woke the loop up is handled in the next frame.
+        self.app.run_frame()
+        self.assertNotEqual(self.scene.scene_label.text, text)
+
+    def test_wake(self):
+        game.wake()
+
+        self.assertLess(self.app.wait_idle(), 50)
+
+    def test_chronometer_timeout(self):
+        self.scene.timer.start()
+
+        self.assertLessEqual(self.app.scene_manager.next_wakeup(), 1000)
+        self.assertAlmostEqual(self.app.wait_idle(), 1000, delta=100)
+
+    def test_busy_while_animating(self):
+        self.scene.button_bar.toggle()
+
+        self.assertEqual(self.app.scene_manager.next_wakeup(), 0)
+        self.assertEqual(self.app.wait_idle(), 0)
+        tween.tweener.clear()
+
+
+def measure_idle_cpu(seconds=3.0):
+    """Measures the CPU used by the static debug menu with and without
+    the idle mode of the game loop.
+    """
+
+    for idle in (False, True):
+        app = create_game()
+        app.IDLE_WAIT = idle
+        frames = []
+        run_frame = app.run_frame
+        app.run_frame = lambda elapsed=0: frames.append(elapsed) \
+            or run_frame(elapsed)
+
+        pg_time.set_timer(constants.QUIT, int(1000 * seconds), 1)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        app.start()
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+
+        print(f"IDLE_WAIT={idle!s:<5} {len(frames):>4} frames in "
+              f"{wall:.2f}s, CPU {1000 * cpu:.1f}ms "
+              f"({100 * cpu / wall:.1f}% of a core)")
+
+
+def create_game():
+    """Creates the interface debugging game. It's also a benchmark
+    target.
+    """
 
     app = game.Game(800, 600, "Interface Module Test")
+    app.DIRTY_RECTS = True
     app.add_scene("main", DebugScene(app.screen))
 
-    app.start()
+    return app
+
+
+def main():
+    """Main entry for testing the interface module."""
+
+    create_game().start()
 
 
 if __name__ == "__main__":
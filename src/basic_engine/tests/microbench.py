@@ -0,0 +1,112 @@
+import contextlib
+import functools
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import pygame
+
+from .. import benchmark, microbench
+from . import game as game_test
+
+benchmark.use_dummy_drivers()
+
+
+def create_uncapped_game():
+    game_ = game_test.create_game()
+    game_.FPS = 0
+    return game_
+
+
+class MicrobenchTestCase(unittest.TestCase):
+    """Tests timing the cases and comparing their results."""
+
+    def setUp(self):
+        pygame.init()
+
+    def tearDown(self):
+        # main quits pygame when it's done.
+        pygame.init()
+
+    def test_select(self):
+        self.assertEqual(microbench.select(["button_bar", "label_create"]),
+                         ["button_bar[4]", "button_bar[50]",
+                          "button_bar[500]", "label_create"])
+        self.assertEqual(microbench.select([]), list(microbench.CASES))
+
+        with self.assertRaises(ValueError):
+            microbench.select(["nothing"])
+
+    def test_every_case_runs(self):
+        for name in microbench.CASES:
+            with self.subTest(name):
+                result = microbench.run(name, repeat=1, min_time=0)
+
+                self.assertEqual(result.calls, 1)
+                self.assertGreater(result.best, 0)
+
+    def test_uncapped_game_frame(self):
+        microbench.CASES["uncapped"] = functools.partial(
+            microbench.game_frame,
+            "basic_engine.tests.microbench:create_uncapped_game"
+        )
+        try:
+            result = microbench.run("uncapped", repeat=1, min_time=0)
+        finally:
+            del microbench.CASES["uncapped"]
+
+        self.assertGreater(result.best, 0)
+
+    def test_rounds(self):
+        result = microbench.run("scene_dispatch", repeat=3, min_time=0.001)
+
+        self.assertEqual(len(result.times), 3)
+        self.assertLessEqual(result.best, result.median)
+        self.assertEqual(result.to_dict()["best_us"], 1e6 * result.best)
+
+    def test_compare(self):
+        baseline = {"cases": {
+            "fast": {"best_us": 10.0},
+            "slow": {"best_us": 10.0},
+        }}
+        results = [
+            microbench.CaseResult("fast", 1, [10.5e-6]),
+            microbench.CaseResult("slow", 1, [12e-6]),
+            microbench.CaseResult("new", 1, [1.0]),
+        ]
+
+        comparisons = microbench.compare(baseline, results, threshold=10)
+
+        self.assertEqual([comparison["name"] for comparison in comparisons],
+                         ["fast", "slow"])
+        self.assertAlmostEqual(comparisons[1]["change"], 20)
+        self.assertEqual([comparison["regression"]
+                          for comparison in comparisons], [False, True])
+
+    def test_main_flags_regressions(self):
+        arguments = ["label_create", "--repeat", "1", "--min-time", "0"]
+        with tempfile.TemporaryDirectory() as directory, \
+                contextlib.redirect_stdout(io.StringIO()):
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(microbench.main(arguments + ["--output", path]),
+                             0)
+
+            with open(path, encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+            self.assertEqual(list(baseline["cases"]), ["label_create"])
+            self.assertEqual(baseline["pygame"], pygame.version.ver)
+
+            for best_us, status in ((1e-3, 1), (1e9, 0)):
+                baseline["cases"]["label_create"]["best_us"] = best_us
+                with open(path, "w", encoding="utf-8") as baseline_file:
+                    json.dump(baseline, baseline_file)
+
+                self.assertEqual(
+                    microbench.main(arguments + ["--compare", path]), status
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+import math
+import random
+import time
+import unittest
+
+import pygame
+
+from .. import pathfinding
+
+MAZE = [
+    "......",
+    ".####.",
+    "..9...",
+]
+
+
+def random_grid(width, height, density=0.2, seed=1):
+    """Builds a grid with a fraction of its cells randomly blocked,
+    keeping the corners walkable.
+    """
+
+    generator = random.Random(seed)
+    grid = pathfinding.Grid(width, height, [
+        0 if generator.random() < density else 1
+        for _ in range(width * height)
+    ])
+    grid[0, 0] = grid[width - 1, height - 1] = 1
+    return grid
+
+
+def path_cost(grid, path):
+    """Adds up the cost of entering every cell of a path after the
+    first one.
+    """
+
+    cost = 0
+    for (x, y), (next_x, next_y) in zip(path, path[1:]):
+        length = math.sqrt(2) if x != next_x and y != next_y else 1
+        cost += grid[next_x, next_y] * length
+    return cost
+
+
+class PathfindingTestCase(unittest.TestCase):
+    """Tests the search algorithms."""
+
+    def setUp(self):
+        self.grid = pathfinding.Grid.from_rows(MAZE)
+        self.start = (0, 2)
+        self.goal = (5, 2)
+
+    def assertValidPath(self, path, diagonal=False):
+        self.assertEqual(path[0], self.start)
+        self.assertEqual(path[-1], self.goal)
+        for (x, y), (next_x, next_y) in zip(path, path[1:]):
+            self.assertTrue(self.grid.is_walkable(next_x, next_y))
+            self.assertLessEqual(max(abs(next_x - x), abs(next_y - y)), 1)
+            if not diagonal:
+                self.assertEqual(abs(next_x - x) + abs(next_y - y), 1)
+            elif x != next_x and y != next_y:
+                # No corner cutting.
+                self.assertTrue(self.grid.is_walkable(next_x, y))
+                self.assertTrue(self.grid.is_walkable(x, next_y))
+
+    def test_grid(self):
+        self.assertEqual(self.grid[2, 2], 9)
+        self.assertFalse(self.grid.is_walkable(1, 1))
+        self.assertFalse(self.grid.is_walkable(-1, 0))
+        self.assertEqual(self.grid.position(self.grid.index(4, 2)), (4, 2))
+
+        with self.assertRaises(IndexError):
+            self.grid[6, 0] = 1
+
+    def test_cheapest_paths(self):
+        astar = pathfinding.astar(self.grid, self.start, self.goal)
+        dijkstra = pathfinding.dijkstra(self.grid, self.start, self.goal)
+
+        self.assertValidPath(astar)
+        self.assertValidPath(dijkstra)
+        # The expensive cell makes the detour through the top cheaper.
+        self.assertNotIn((2, 2), astar)
+        self.assertEqual(path_cost(self.grid, astar), 9)
+        self.assertEqual(path_cost(self.grid, dijkstra), 9)
+
+    def test_dijkstra_has_no_heuristic(self):
+        estimates = []
+
+        def manhattan(dx, dy):
+            estimates.append((dx, dy))
+            return dx + dy
+
+        original = pathfinding.manhattan
+        pathfinding.manhattan = manhattan
+        self.addCleanup(setattr, pathfinding, "manhattan", original)
+
+        pathfinding.dijkstra(self.grid, self.start, self.goal)
+        self.assertEqual(estimates, [])
+        pathfinding.astar(self.grid, self.start, self.goal)
+        self.assertNotEqual(estimates, [])
+
+    def test_fewest_moves(self):
+        path = pathfinding.bfs(self.grid, self.start, self.goal)
+
+        self.assertValidPath(path)
+        self.assertEqual(len(path), 6)
+        self.assertValidPath(pathfinding.dfs(self.grid, self.start,
+                                             self.goal))
+
+    def test_diagonal_paths(self):
+        astar = pathfinding.astar(self.grid, self.start, self.goal, True)
+        jps = pathfinding.jps(self.grid, self.start, self.goal)
+
+        self.assertValidPath(jps, diagonal=True)
+        self.assertValidPath(astar, diagonal=True)
+        uniform = pathfinding.Grid.from_rows([row.replace("9", ".")
+                                              for row in MAZE])
+        self.assertAlmostEqual(
+            path_cost(uniform, jps),
+            path_cost(uniform, pathfinding.astar(uniform, self.start,
+                                                 self.goal, True)),
+        )
+
+    def test_jps_matches_astar_on_random_grids(self):
+        for seed in range(10):
+            grid = random_grid(40, 30, 0.3, seed)
+            goal = (39, 29)
+            for diagonal in (False, True):
+                astar = pathfinding.astar(grid, (0, 0), goal, diagonal)
+                jps = pathfinding.jps(grid, (0, 0), goal, diagonal)
+
+                if astar is None:
+                    self.assertIsNone(jps)
+                else:
+                    self.assertAlmostEqual(path_cost(grid, jps),
+                                           path_cost(grid, astar))
+
+    def test_jps_without_diagonals(self):
+        path = pathfinding.jps(self.grid, self.start, self.goal, False)
+
+        self.assertValidPath(path)
+        self.assertEqual(len(path), 6)
+
+    def test_unreachable(self):
+        self.grid[0, 1] = 0
+        self.grid[1, 2] = 0
+
+        for algorithm in pathfinding.ALGORITHMS:
+            self.assertIsNone(pathfinding.find_path(
+                self.grid, self.start, self.goal, algorithm
+            ))
+        self.assertIsNone(pathfinding.astar(self.grid, self.start, (1, 1)))
+        self.assertEqual(pathfinding.astar(self.grid, (0, 0), (0, 0)),
+                         [(0, 0)])
+
+    def test_batches(self):
+        grid = random_grid(30, 30, 0.25, seed=3)
+        generator = random.Random(2)
+        starts = [(generator.randrange(30), generator.randrange(30))
+                  for _ in range(pathfinding.FIELD_THRESHOLD)]
+        queries = [(start, (29, 29)) for start in starts]
+        queries.append(((0, 0), (5, 5)))
+
+        for diagonal in (False, True):
+            paths = pathfinding.find_paths(grid, queries, diagonal=diagonal)
+
+            self.assertEqual(len(paths), len(queries))
+            for (start, goal), path in zip(queries, paths):
+                expected = pathfinding.astar(grid, start, goal, diagonal)
+                if expected is None:
+                    self.assertIsNone(path)
+                else:
+                    self.assertEqual(path[0], start)
+                    self.assertEqual(path[-1], goal)
+                    self.assertAlmostEqual(path_cost(grid, path),
+                                           path_cost(grid, expected))
+
+
+class PathfindingPoolTestCase(unittest.TestCase):
+    """Tests solving queries on worker processes."""
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((10, 10))
+        pygame.event.clear()
+        self.pool = pathfinding.PathfindingPool(max_workers=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def wait_event(self):
+        for _ in range(500):
+            found = pygame.event.get(pathfinding.PATH_EVENT)
+            if found:
+                return found[0]
+            time.sleep(0.01)
+        self.fail("No path event was posted")
+
+    def test_results_are_posted(self):
+        grid = pathfinding.Grid.from_rows(MAZE)
+        job = self.pool.submit(grid, [((0, 2), (5, 2)), ((0, 0), (1, 1))],
+                               "bfs", tag="agents")
+
+        event = self.wait_event()
+
+        self.assertEqual(event.job, job)
+        self.assertEqual(event.tag, "agents")
+        self.assertIsNone(event.error)
+        self.assertEqual(len(event.paths[0]), 6)
+        self.assertIsNone(event.paths[1])
+        self.assertNotIn(job, self.pool.pending)
+
+    def test_errors_are_posted(self):
+        self.pool.submit(pathfinding.Grid(2, 2), [((0, 0),)])
+
+        self.assertIsInstance(self.wait_event().error, ValueError)
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            self.pool.submit(pathfinding.Grid(2, 2), [], "greedy")
+
+
+def benchmark(sizes=(512, 2048), density=0.2, agents=64):
+    """Times every algorithm, corner to corner, and batches of agents
+    with and without a process pool.
+    """
+
+    for size in sizes:
+        grid = random_grid(size, size, density)
+        goal = (size - 1, size - 1)
+        print(f"{size}x{size} grid, {density:.0%} blocked")
+
+        for algorithm in ("astar", "dijkstra", "bfs", "jps"):
+            start = time.perf_counter()
+            path = pathfinding.find_path(grid, (0, 0), goal, algorithm,
+                                         algorithm == "jps")
+            elapsed = time.perf_counter() - start
+            print(f"  {algorithm:8} {1000 * elapsed:9.1f}ms "
+                  f"({0 if path is None else len(path)} cells)")
+
+        generator = random.Random(1)
+        queries = [((generator.randrange(size), generator.randrange(size)),
+                    goal) for _ in range(agents)]
+        start = time.perf_counter()
+        pathfinding.find_paths(grid, queries)
+        elapsed = time.perf_counter() - start
+        print(f"  {agents} agents sharing a goal {1000 * elapsed:9.1f}ms")
+
+        queries = [((generator.randrange(size), generator.randrange(size)),
+                    (generator.randrange(size), generator.randrange(size)))
+                   for _ in range(agents // 8)]
+        start = time.perf_counter()
+        pathfinding.find_paths(grid, queries)
+        serial = time.perf_counter() - start
+
+        pool = pathfinding.PathfindingPool()
+        start = time.perf_counter()
+        for query in queries:
+            pool.submit(grid, [query])
+        while pool.pending:
+            time.sleep(0.001)
+        pooled = time.perf_counter() - start
+        pool.shutdown()
+        print(f"  {len(queries)} separate queries: serial "
+              f"{1000 * serial:.1f}ms, pool {1000 * pooled:.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+from .. import benchmark, profiler
+from . import game as game_test
+
+benchmark.use_dummy_drivers()
+
+
+class FrameProfilerTestCase(unittest.TestCase):
+    """Tests the FrameProfiler class."""
+
+    def record_frames(self, frame_profiler, amount):
+        for _ in range(amount):
+            frame_profiler.begin_frame()
+            frame_profiler.mark("update")
+            frame_profiler.mark("show")
+            frame_profiler.end_frame("main", 3)
+
+    def test_disabled_records_nothing(self):
+        frame_profiler = profiler.FrameProfiler()
+        self.record_frames(frame_profiler, 5)
+
+        self.assertEqual(len(frame_profiler.frames), 0)
+
+    def test_ring_buffer(self):
+        frame_profiler = profiler.FrameProfiler(capacity=4, enabled=True)
+        self.record_frames(frame_profiler, 10)
+
+        self.assertEqual(len(frame_profiler.frames), 4)
+        self.assertEqual(len(frame_profiler.frame_times(2)), 2)
+        self.assertEqual(list(frame_profiler.phase_times()),
+                         ["update", "show"])
+        self.assertEqual(list(frame_profiler.scene_times()), ["main"])
+
+    def test_chrome_trace(self):
+        frame_profiler = profiler.FrameProfiler(enabled=True)
+        self.record_frames(frame_profiler, 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            frame_profiler.export_chrome_trace(path)
+            with open(path, encoding="utf-8") as trace_file:
+                trace = json.load(trace_file)
+
+        names = [event["name"] for event in trace["traceEvents"]]
+        self.assertEqual(names, ["frame", "update", "show"] * 2)
+        self.assertEqual(trace["traceEvents"][0]["args"]["particles"], 3)
+
+
+class GameProfilingTestCase(unittest.TestCase):
+    """Tests the profiling of the Game main loop."""
+
+    def test_profiled_frames(self):
+        game_ = game_test.create_game()
+        game_.enable_profiler(overlay=True)
+        benchmark.run(game_, frames=40)
+
+        self.assertEqual(len(game_.profiler.frames), 40)
+        self.assertEqual(
+            set(game_.profiler.phase_times()),
+            {"events", "update_on_event", "tweens", "show", "update",
+             "overlay", "display"},
+        )
+        self.assertTrue(game_.profiler_overlay.labels)
+
+        game_.disable_profiler()
+        benchmark.run(game_, frames=5)
+
+        self.assertEqual(len(game_.profiler.frames), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
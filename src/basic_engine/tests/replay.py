@@ -0,0 +1,172 @@
+import functools
+import os
+import random
+import tempfile
+import time
+import unittest
+
+import pygame
+from pygame import surface
+
+from .. import benchmark, effects, game, replay, scene
+
+benchmark.use_dummy_drivers()
+
+
+class RandomScene(scene.Scene):
+    """Scene spawning particles where it's clicked and wandering
+    randomly, recording what it does.
+    """
+
+    def __init__(self, screen: surface.Surface):
+        super().__init__(screen)
+
+        self.particles = effects.ParticleSystem(
+            screen, surface.Surface((2, 2)), capacity=500
+        )
+        self.particles_groups.append(self.particles)
+        self.position = [0, 0]
+        self.history = []
+
+    def update(self) -> None:
+        self.position[0] += random.randint(-3, 3)
+        self.position[1] += random.randint(-3, 3)
+        self.history.append(tuple(self.position))
+        self.update_particles()
+
+    def update_on_event(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.particles.emit(*event.pos, 20)
+            self.history.append(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            self.history.append(event.unicode)
+
+
+def create_game() -> game.Game:
+    game_ = game.Game(200, 100, "Replay test")
+    # Built on the first frame, after the random number generators
+    # are seeded.
+    game_.add_scene("random", functools.partial(RandomScene, game_.screen))
+    return game_
+
+
+def play(game_, frames=60):
+    """Runs frames with a click and a key press now and then, at an
+    irregular frame rate.
+    """
+
+    for frame in range(frames):
+        if frame % 10 == 0:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEBUTTONDOWN, pos=(frame, 50), button=1
+            ))
+        if frame % 25 == 0:
+            pygame.event.post(pygame.event.Event(
+                pygame.KEYDOWN, key=pygame.K_a, unicode="a", mod=0
+            ))
+        game_.run_frame(16 + frame % 3)
+
+
+def state(game_):
+    manager = game_.scene_manager
+    current = manager.get_scene(manager.current_scene)
+    return current.history, current.particles.positions[
+        :current.particles.count
+    ].tolist()
+
+
+class ReplayTestCase(unittest.TestCase):
+    """Tests recording sessions and replaying them."""
+
+    def setUp(self):
+        pygame.init()
+        pygame.event.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "session.replay")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, frames=60, seed=1234):
+        game_ = create_game()
+        game_.record(self.path, seed)
+        play(game_, frames)
+        game_.stop_recording()
+        return game_
+
+    def test_replay_is_deterministic(self):
+        recorded = self.record()
+
+        replayed = create_game()
+        # Events posted meanwhile are not replayed.
+        pygame.event.post(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, pos=(1, 1), button=1
+        ))
+
+        self.assertEqual(replayed.replay(self.path), 60)
+        self.assertEqual(state(replayed), state(recorded))
+        self.assertIn("a", state(replayed)[0])
+
+    def test_frames(self):
+        self.record(frames=5)
+
+        player = replay.Player(self.path)
+        frames = list(player)
+
+        self.assertEqual(player.seed, 1234)
+        self.assertEqual(len(player), 5)
+        self.assertEqual([elapsed for elapsed, _ in frames],
+                         [16, 17, 18, 16, 17])
+        click, key = frames[0][1]
+        self.assertEqual(click.type, pygame.MOUSEBUTTONDOWN)
+        self.assertEqual(click.pos, (0, 50))
+        self.assertEqual(key.unicode, "a")
+        self.assertEqual(frames[1][1], [])
+
+    def test_recording_is_compact(self):
+        self.record(frames=600)
+
+        # Mostly empty frames compress to a fraction of a byte each.
+        self.assertLess(os.path.getsize(self.path), 600)
+
+    def test_not_a_recording(self):
+        with open(self.path, "wb") as replay_file:
+            replay_file.write(b"PNG image")
+
+        with self.assertRaises(ValueError):
+            replay.Player(self.path)
+
+    def test_benchmark_workload(self):
+        self.record(frames=30)
+
+        report = benchmark.run(create_game(), recording=self.path)
+        self.assertEqual(report.frames, 30)
+
+        report = benchmark.run(create_game(), frames=10,
+                               recording=self.path)
+        self.assertEqual(report.frames, 10)
+
+
+def benchmark_replay(frames=3600):
+    """Measures the size of a recording and how long replaying it
+    takes.
+    """
+
+    pygame.init()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.replay")
+        game_ = create_game()
+        game_.record(path, 1)
+        play(game_, frames)
+        game_.stop_recording()
+
+        start = time.perf_counter()
+        create_game().replay(path)
+        elapsed = time.perf_counter() - start
+
+        print(f"{frames} frames recorded in {os.path.getsize(path)} bytes, "
+              f"replayed in {1000 * elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark_replay()
@@ -0,0 +1,276 @@
+import asyncio
+import functools
+import threading
+import unittest
+
+from pygame import rect, surface
+
+from .. import scene, transition, tween
+
+
+class DirtyScene(scene.Scene):
+    """Scene that always reports the same touched areas."""
+
+    def draw(self):
+        return [rect.Rect(0, 0, 10, 10), rect.Rect(5, 5, 10, 10),
+                rect.Rect(50, 50, 4, 4)]
+
+
+class MergeRectsTestCase(unittest.TestCase):
+    """Tests the merge_rects function."""
+
+    def test_overlapping_rects(self):
+        output = scene.merge_rects(
+            [rect.Rect(0, 0, 10, 10), None, rect.Rect(5, 5, 10, 10)]
+        )
+
+        self.assertEqual(output, [rect.Rect(0, 0, 15, 15)])
+
+    def test_chained_rects(self):
+        # The third rect only overlaps the union of the first two.
+        output = scene.merge_rects(
+            [rect.Rect(0, 0, 10, 10), rect.Rect(20, 0, 10, 10),
+             rect.Rect(5, 5, 20, 2)]
+        )
+
+        self.assertEqual(output, [rect.Rect(0, 0, 30, 10)])
+
+    def test_disjoint_rects(self):
+        rects = [rect.Rect(0, 0, 10, 10), rect.Rect(20, 20, 10, 10)]
+
+        self.assertEqual(scene.merge_rects(rects), rects)
+
+
+class SceneManagerTestCase(unittest.TestCase):
+    """Tests the SceneManager class."""
+
+    def setUp(self):
+        self.screen = surface.Surface((100, 100))
+        self.manager = scene.SceneManager()
+        self.manager.add("first", DirtyScene(self.screen))
+        self.manager.add("second", DirtyScene(self.screen))
+
+    def test_show_dirty_rects(self):
+        # The very first frame is always fully presented.
+        self.assertIsNone(self.manager.show())
+        self.assertEqual(
+            self.manager.show(),
+            [rect.Rect(0, 0, 15, 15), rect.Rect(50, 50, 4, 4)],
+        )
+
+    def test_show_full_redraw_on_scene_change(self):
+        self.manager.show()
+        self.manager.change_scene("second")
+
+        self.assertIsNone(self.manager.show())
+        self.assertIsNotNone(self.manager.show())
+
+    def test_show_full_redraw_on_transition(self):
+        self.manager.show()
+        self.manager.change_scene(
+            "second",
+            transition.FadeTransition(self.screen, self.manager, "second",
+                                      (0, 0, 0), 128),
+        )
+
+        while self.manager.on_transition:
+            tween.tweener.update(1 / 60)
+            self.assertIsNone(self.manager.show())
+        self.assertIsNotNone(self.manager.show())
+
+    def test_show_without_scenes(self):
+        self.assertIsNone(scene.SceneManager().show())
+
+
+class HookedScene(scene.Scene):
+    """Scene recording its lifecycle hooks in a shared log."""
+
+    def __init__(self, screen, name, log):
+        super().__init__(screen)
+
+        self.name = name
+        self.log = log
+        self.log.append(("build", name))
+
+    def nbytes(self):
+        return 100
+
+    def on_enter(self):
+        self.log.append(("enter", self.name))
+
+    def on_exit(self):
+        self.log.append(("exit", self.name))
+
+    def on_unload(self):
+        self.log.append(("unload", self.name))
+
+
+class LazySceneTestCase(unittest.TestCase):
+    """Tests scene factories and their eviction."""
+
+    def setUp(self):
+        self.screen = surface.Surface((100, 100))
+        self.log = []
+        self.manager = scene.SceneManager(max_scenes=2)
+        for name in ("first", "second", "third"):
+            self.manager.add(name, functools.partial(
+                HookedScene, self.screen, name, self.log
+            ))
+
+    def test_built_on_first_use(self):
+        self.assertEqual(self.log, [])
+        self.assertEqual(self.manager.current_scene, "first")
+
+        self.manager.show()
+        self.manager.show()
+
+        self.assertEqual(self.log, [("build", "first"), ("enter", "first")])
+        self.assertFalse(self.manager.is_loaded("second"))
+
+    def test_hooks_on_change(self):
+        self.manager.show()
+        self.manager.change_scene("second")
+        self.manager.show()
+
+        self.assertEqual(self.log[2:], [("exit", "first"),
+                                        ("build", "second"),
+                                        ("enter", "second")])
+
+    def test_tasks_cancelled_on_unload(self):
+        async def unload_first():
+            first = self.manager.get_scene("first")
+            task = first.schedule(asyncio.sleep(60))
+            await asyncio.sleep(0)
+            self.manager.change_scene("second")
+            self.manager.unload("first")
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(unload_first())
+
+        self.assertTrue(task.cancelled())
+
+    def test_least_recently_entered_is_unloaded(self):
+        for name in ("first", "second", "first", "third"):
+            self.manager.change_scene(name)
+            self.manager.show()
+
+        self.assertIn(("unload", "second"), self.log)
+        self.assertEqual(set(self.manager.scenes), {"first", "third"})
+
+        self.manager.change_scene("second")
+        self.manager.show()
+
+        self.assertEqual(self.log[-3:], [("build", "second"),
+                                         ("unload", "first"),
+                                         ("enter", "second")])
+
+    def test_memory_budget(self):
+        self.manager.max_scenes = None
+        self.manager.max_bytes = 150
+        self.manager.show()
+        self.manager.change_scene("second")
+        self.manager.show()
+
+        self.assertEqual(list(self.manager.scenes), ["second"])
+
+    def test_instances_are_never_unloaded(self):
+        self.manager.add("kept", HookedScene(self.screen, "kept", self.log))
+        for name in ("kept", "first", "second", "third"):
+            self.manager.change_scene(name)
+            self.manager.show()
+
+        self.assertTrue(self.manager.is_loaded("kept"))
+        with self.assertRaises(ValueError):
+            self.manager.unload("kept")
+        with self.assertRaises(ValueError):
+            self.manager.unload("third")
+
+    def test_shutdown_unloads_built_scenes(self):
+        self.manager.show()
+        self.manager.change_scene("second")
+        self.manager.show()
+        del self.log[:]
+
+        self.manager.shutdown()
+
+        self.assertEqual(sorted(self.log), [("unload", "first"),
+                                            ("unload", "second")])
+        self.assertFalse(self.manager.is_loaded("second"))
+
+
+class SlowScene(DirtyScene):
+    """Scene whose preload waits until it's allowed to finish."""
+
+    def __init__(self, screen, loaded):
+        super().__init__(screen)
+
+        self.loaded = loaded
+        self.preload_thread = None
+
+    def preload(self):
+        self.preload_thread = threading.current_thread()
+        self.loaded.wait(5)
+
+
+class PreloadTestCase(unittest.TestCase):
+    """Tests preloading the target scene of a transition."""
+
+    def setUp(self):
+        self.screen = surface.Surface((100, 100))
+        self.loaded = threading.Event()
+        self.manager = scene.SceneManager()
+        self.manager.add("first", DirtyScene(self.screen))
+        self.manager.add("slow", functools.partial(SlowScene, self.screen,
+                                                   self.loaded))
+        self.manager.show()
+
+    def tearDown(self):
+        self.loaded.set()
+        self.manager.shutdown()
+        tween.tweener.clear()
+
+    def fade(self, timeout=5.0):
+        return transition.FadeTransition(self.screen, self.manager, "slow",
+                                         (0, 0, 0), 128, timeout)
+
+    def test_transition_holds_until_ready(self):
+        self.manager.change_scene("slow", self.fade())
+        for _ in range(10):
+            tween.tweener.update(1 / 60)
+            self.manager.show()
+
+        # Fully covered, but still on the first scene.
+        self.assertTrue(self.manager.on_transition)
+        self.assertEqual(self.manager.current_scene, "first")
+        self.assertFalse(self.manager.is_ready("slow"))
+
+        self.loaded.set()
+        while self.manager.on_transition:
+            tween.tweener.update(1 / 60)
+            self.manager.show()
+
+        slow = self.manager.scenes["slow"]
+        self.assertEqual(self.manager.current_scene, "slow")
+        self.assertIsNot(slow.preload_thread, threading.current_thread())
+
+    def test_timeout_waits_for_scene(self):
+        self.manager.change_scene("slow", self.fade(timeout=0))
+        threading.Timer(0.05, self.loaded.set).start()
+        while self.manager.on_transition:
+            tween.tweener.update(1 / 60)
+            self.manager.show()
+
+        self.assertEqual(self.manager.current_scene, "slow")
+
+    def test_preloaded_on_abrupt_change(self):
+        self.loaded.set()
+        self.manager.change_scene("slow")
+        self.manager.show()
+
+        self.assertIs(self.manager.scenes["slow"].preload_thread,
+                      threading.current_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()
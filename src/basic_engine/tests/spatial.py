@@ -0,0 +1,141 @@
+import random
+import time
+import unittest
+
+from pygame import init, rect, sprite, surface
+
+from .. import interface, scene, spatial, tween
+
+init()
+
+
+class Box(sprite.Sprite):
+    """Sprite with only a rect."""
+
+    def __init__(self, x, y, width=10, height=10):
+        super().__init__()
+
+        self.rect = rect.Rect(x, y, width, height)
+
+
+class SpatialHashTestCase(unittest.TestCase):
+    """Tests the SpatialHash class."""
+
+    def setUp(self):
+        self.grid = spatial.SpatialHash(cell_size=32)
+        self.boxes = [Box(0, 0), Box(5, 5), Box(100, 100, 80, 80),
+                      Box(300, 10)]
+        for box in self.boxes:
+            self.grid.insert(box)
+
+    def test_query_point(self):
+        self.assertEqual(set(self.grid.query_point((6, 6))),
+                         set(self.boxes[:2]))
+        self.assertEqual(self.grid.query_point((170, 170)),
+                         [self.boxes[2]])
+        self.assertEqual(self.grid.query_point((200, 200)), [])
+
+    def test_query_rect(self):
+        self.assertEqual(set(self.grid.query_rect((0, 0, 120, 120))),
+                         set(self.boxes[:3]))
+
+    def test_update_moves_between_cells(self):
+        box = self.boxes[3]
+        box.rect.topleft = (150, 150)
+        self.grid.update(box)
+
+        self.assertEqual(self.grid.query_point((305, 15)), [])
+        self.assertEqual(set(self.grid.query_point((155, 155))),
+                         {self.boxes[2], box})
+
+    def test_remove(self):
+        self.grid.remove(self.boxes[0])
+
+        self.assertEqual(self.grid.query_point((1, 1)), [])
+        self.assertEqual(len(self.grid), 3)
+
+    def test_pairs_and_collide(self):
+        self.assertEqual(
+            {frozenset(pair) for pair in self.grid.pairs()},
+            {frozenset(self.boxes[:2])},
+        )
+        self.assertEqual(self.grid.collide(self.boxes[0]), [self.boxes[1]])
+
+    def test_matches_spritecollide(self):
+        generator = random.Random(1)
+        grid = spatial.SpatialHash(cell_size=16)
+        group = sprite.Group()
+        for _ in range(300):
+            box = Box(generator.randint(0, 500), generator.randint(0, 500),
+                      generator.randint(1, 40), generator.randint(1, 40))
+            grid.insert(box)
+            group.add(box)
+
+        for box in group:
+            self.assertEqual(set(grid.query_rect(box.rect)),
+                             set(sprite.spritecollide(box, group, False)))
+
+
+class SceneSpatialHashTestCase(unittest.TestCase):
+    """Tests the spatial hash integration of scenes and widgets."""
+
+    def test_button_bar_follows_slide(self):
+        screen = surface.Surface((800, 600))
+        scene_ = scene.Scene(screen)
+        button_bar = interface.ButtonBar(screen, "Options", "right",
+                                         ("One", None))
+        scene_.add_widgets(button_bar)
+
+        self.assertEqual(scene_.objects_at((799, 300)), [])
+
+        button_bar.toggle()
+        while button_bar.on_animation:
+            tween.tweener.update(1 / 60)
+
+        self.assertEqual(scene_.objects_at((799, 300)), [button_bar])
+        option = button_bar.buttons[0]
+        self.assertEqual(button_bar.buttons_hash.query_point(option.rect.center),
+                         [option])
+
+
+def benchmark(counts=(1000, 10000, 50000), queries=500, world=4000):
+    """Compares SpatialHash queries with pygame.sprite.spritecollide."""
+
+    generator = random.Random(0)
+    print(f"{'sprites':>8} {'spritecollide':>15} {'hash query':>12} "
+          f"{'hash build':>12} {'hash pairs':>12}")
+    for count in counts:
+        group = sprite.Group(
+            Box(generator.randint(0, world), generator.randint(0, world),
+                generator.randint(4, 32), generator.randint(4, 32))
+            for _ in range(count)
+        )
+        probes = generator.sample(group.sprites(), queries)
+
+        start = time.perf_counter()
+        grid = spatial.SpatialHash(cell_size=32)
+        for box in group:
+            grid.insert(box)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for probe in probes:
+            sprite.spritecollide(probe, group, False)
+        brute_force = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for probe in probes:
+            grid.query_rect(probe.rect)
+        hashed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        grid.pairs()
+        pairs = time.perf_counter() - start
+
+        print(f"{count:>8} {1000 * brute_force:>13.2f}ms "
+              f"{1000 * hashed:>10.2f}ms {1000 * build:>10.2f}ms "
+              f"{1000 * pairs:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,179 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from pygame import constants, surface
+
+from .. import camera, tilemap
+
+
+def make_tileset(colours=((255, 0, 0), (0, 255, 0), (0, 0, 255)), size=8):
+    """Builds a tileset of plain coloured tiles, in a single row."""
+
+    image = surface.Surface((size * len(colours), size), constants.SRCALPHA)
+    for index, colour in enumerate(colours):
+        image.fill(colour, (index * size, 0, size, size))
+    return tilemap.Tileset(image, size)
+
+
+def make_map(width, height, chunk_size=4, **kwargs):
+    """Builds a map with a ground layer of tiles 1 and an empty top
+    layer.
+    """
+
+    ground = tilemap.TileLayer("ground", width, height,
+                               [1] * (width * height))
+    top = tilemap.TileLayer("top", width, height)
+    return tilemap.TileMap(make_tileset(), [ground, top], chunk_size,
+                           **kwargs)
+
+
+class TileMapTestCase(unittest.TestCase):
+    """Tests rendering, caching and evicting the chunks of a map."""
+
+    def setUp(self):
+        self.screen = surface.Surface((64, 32))
+        self.map = make_map(20, 10)
+
+    def test_tileset(self):
+        tileset = tilemap.Tileset(surface.Surface((21, 10)), 4, 4,
+                                  margin=1, spacing=1)
+
+        self.assertEqual(len(tileset), 8)
+        self.assertEqual(tileset[6].get_offset(), (6, 6))
+
+    def test_draw_visible_chunks(self):
+        touched = self.map.draw(self.screen)
+
+        # 64x32 pixels are 2x1 chunks of 4x4 tiles of 8 pixels.
+        self.assertEqual(len(touched), 2)
+        self.assertEqual(self.map.chunks.keys(), [(0, 0), (1, 0)])
+        self.assertEqual(self.screen.get_at((63, 31)), (255, 0, 0, 255))
+
+    def test_chunks_are_cached(self):
+        self.map.draw(self.screen)
+        chunk = self.map.chunks.get((0, 0))
+        self.map.draw(self.screen)
+
+        self.assertIs(self.map.chunks.get((0, 0)), chunk)
+
+    def test_edits_render_their_chunk(self):
+        self.map.draw(self.screen)
+        other = self.map.chunks.get((1, 0))
+
+        self.map.set_tile("top", 1, 2, 3)
+        self.assertNotIn((0, 0), self.map.chunks)
+
+        self.map.draw(self.screen)
+        self.assertEqual(self.screen.get_at((8, 16)), (0, 0, 255, 255))
+        self.assertEqual(self.map.get_tile("top", 1, 2), 3)
+        self.assertIs(self.map.chunks.get((1, 0)), other)
+
+    def test_edits_out_of_the_map(self):
+        self.map.draw(self.screen)
+        width, height = self.map.width, self.map.height
+
+        for x, y in ((-1, 0), (0, -1), (width, 0), (0, height)):
+            with self.assertRaises(ValueError):
+                self.map.set_tile("top", x, y, 3)
+        with self.assertRaises(ValueError):
+            self.map.get_tile("top", -1, -1)
+        self.assertIn((0, 0), self.map.chunks)
+
+    def test_camera(self):
+        view = camera.Camera(self.screen.get_rect(), (0, 0) +
+                             self.map.pixel_size)
+        self.map.set_tile("ground", 12, 6, 2)
+        view.move(70, 30)
+
+        self.map.draw(self.screen, view)
+
+        self.assertEqual(self.map.chunks.keys(),
+                         [(2, 0), (3, 0), (4, 0), (2, 1), (3, 1), (4, 1)])
+        self.assertEqual(self.screen.get_at((26, 18)), (0, 255, 0, 255))
+
+        view.zoom = 2
+        self.map.draw(self.screen, view)
+        self.assertEqual(self.map.chunks.get((3, 1)).get_size(), (64, 64))
+
+    def test_lru_eviction(self):
+        chunk_bytes = 32 * 32 * 4
+        self.map = make_map(20, 10, max_bytes=3 * chunk_bytes)
+        view = camera.Camera((0, 0, 32, 32))
+
+        for x in range(0, 160, 32):
+            view.x = x
+            self.map.draw(self.screen, view)
+
+        self.assertEqual(self.map.chunks.keys(), [(2, 0), (3, 0), (4, 0)])
+        self.assertEqual(self.map.chunks.evictions, 2)
+
+    def test_load_tiled_map(self):
+        tiled_map = {
+            "tilesets": [{"firstgid": 10}],
+            "layers": [
+                {"type": "tilelayer", "name": "ground", "width": 2,
+                 "height": 1, "data": [10, 0x80000000 | 12]},
+                {"type": "objectgroup", "name": "spawns", "objects": []},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map.json")
+            with open(path, "w", encoding="utf-8") as map_file:
+                json.dump(tiled_map, map_file)
+            loaded = tilemap.TileMap.load(path, make_tileset(), chunk_size=8)
+
+        self.assertEqual(len(loaded.layers), 1)
+        self.assertEqual(list(loaded.layer("ground").data), [1, 3])
+        self.assertEqual(loaded.chunk_size, 8)
+
+    def test_layers_of_different_sizes(self):
+        with self.assertRaises(ValueError):
+            tilemap.TileMap(make_tileset(), [
+                tilemap.TileLayer("a", 2, 2), tilemap.TileLayer("b", 3, 2),
+            ])
+
+
+def benchmark(frames=200, size=(800, 600), tile_size=16):
+    """Compares blitting every visible tile with drawing cached chunks."""
+
+    screen = surface.Surface(size)
+    tiles = make_tileset(size=tile_size)
+    width, height = 256, 256
+    layers = [
+        tilemap.TileLayer("ground", width, height,
+                          [index % 3 + 1 for index in range(width * height)]),
+        tilemap.TileLayer("top", width, height,
+                          [(index % 7 == 0) * 2 for index in
+                           range(width * height)]),
+    ]
+    tile_map = tilemap.TileMap(tiles, layers)
+    columns = size[0] // tile_size
+    rows = size[1] // tile_size
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for layer in layers:
+            for y in range(rows):
+                for x in range(columns):
+                    tile_id = layer[x, y]
+                    if tile_id:
+                        screen.blit(tiles[tile_id],
+                                    (x * tile_size, y * tile_size))
+    per_tile = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        touched = tile_map.draw(screen)
+    chunked = time.perf_counter() - start
+
+    print(f"{columns}x{rows} tiles on screen, 2 layers")
+    print(f"per tile {1000 * per_tile / frames:.2f}ms/frame, "
+          f"chunked {1000 * chunked / frames:.2f}ms/frame "
+          f"({len(touched)} blits)")
+
+
+if __name__ == "__main__":
+    benchmark()
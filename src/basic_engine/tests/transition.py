@@ -0,0 +1,139 @@
+import unittest
+
+from pygame import surface
+
+from .. import scene, transition, tween
+
+
+class ColourScene(scene.Scene):
+    """Scene filling the screen with a colour, counting its calls."""
+
+    def __init__(self, screen, colour):
+        super().__init__(screen)
+
+        self.colour = colour
+        self.draws = 0
+        self.updates = 0
+
+    def draw(self, alpha=1.0):
+        self.draws += 1
+        self.screen.fill(self.colour)
+
+    def update(self):
+        self.updates += 1
+
+
+class SnapshotTransitionTestCase(unittest.TestCase):
+    """Tests the transitions compositing snapshots of the scenes."""
+
+    # Seconds passed each frame.
+    DT = 0.125
+
+    def setUp(self):
+        self.screen = surface.Surface((64, 32))
+        self.manager = scene.SceneManager()
+        self.red = ColourScene(self.screen, (255, 0, 0))
+        self.blue = ColourScene(self.screen, (0, 0, 255))
+        self.manager.add("red", self.red)
+        self.manager.add("blue", self.blue)
+        self.manager.show()
+
+    def tearDown(self):
+        self.manager.shutdown()
+        tween.tweener.clear()
+
+    def start(self, transition_class, *args, **kwargs):
+        self.manager.change_scene("blue", transition_class(
+            self.screen, self.manager, "blue", *args, **kwargs
+        ))
+        # Wait for the preloading worker, so frames are deterministic.
+        self.manager.preload("blue").result()
+
+    def run_frames(self, frames):
+        for _ in range(frames):
+            tween.tweener.update(self.DT)
+            self.manager.show()
+            self.manager.update()
+
+    def finish(self):
+        while self.manager.on_transition:
+            tween.tweener.update(self.DT)
+            self.manager.show()
+            self.manager.update()
+
+    def test_scenes_drawn_once(self):
+        self.start(transition.CrossFadeTransition, duration=10 * self.DT)
+        self.finish()
+
+        # Once before the transition and once for its snapshot.
+        self.assertEqual(self.red.draws, 2)
+        self.assertEqual(self.blue.draws, 1)
+        # Only updated in the frame the transition ended.
+        self.assertEqual(self.red.updates, 0)
+        self.assertEqual(self.blue.updates, 1)
+        self.assertEqual(self.manager.current_scene, "blue")
+        self.assertEqual(self.screen.get_at((0, 0)), (0, 0, 255, 255))
+
+    def test_cross_fade(self):
+        self.start(transition.CrossFadeTransition, duration=10 * self.DT)
+        self.run_frames(6)
+
+        red, _, blue, _ = self.screen.get_at((0, 0))
+        self.assertAlmostEqual(red, 128, delta=2)
+        self.assertAlmostEqual(blue, 128, delta=2)
+
+    def test_fade(self):
+        self.start(transition.FadeTransition, (0, 0, 0),
+                   duration=8 * self.DT)
+        self.run_frames(5)
+
+        # Halfway, the screen is fully covered.
+        self.assertEqual(self.screen.get_at((10, 10)), (0, 0, 0, 255))
+        self.finish()
+        self.assertEqual(self.screen.get_at((10, 10)), (0, 0, 255, 255))
+
+    def test_push(self):
+        self.start(transition.SlideTransition, "left", duration=4 * self.DT)
+        self.run_frames(3)
+
+        self.assertEqual(self.screen.get_at((31, 0)), (255, 0, 0, 255))
+        self.assertEqual(self.screen.get_at((32, 0)), (0, 0, 255, 255))
+
+    def test_wipe(self):
+        self.start(transition.WipeTransition, "down", duration=4 * self.DT)
+        self.run_frames(2)
+
+        self.assertEqual(self.screen.get_at((0, 7)), (0, 0, 255, 255))
+        self.assertEqual(self.screen.get_at((0, 8)), (255, 0, 0, 255))
+
+    def test_dissolve(self):
+        self.start(transition.DissolveTransition, block_size=8,
+                   duration=4 * self.DT, seed=1)
+        self.run_frames(3)
+
+        colours = {tuple(self.screen.get_at(block.topleft))
+                   for block in self.manager.fx_object.blocks}
+        self.assertEqual(colours, {(255, 0, 0, 255), (0, 0, 255, 255)})
+
+        self.finish()
+        colours = {tuple(self.screen.get_at(block.topleft))
+                   for block in transition.DissolveTransition(
+                       self.screen, self.manager, "red", 8).blocks}
+        self.assertEqual(colours, {(0, 0, 255, 255)})
+
+    def test_dissolve_under_overlay(self):
+        self.start(transition.DissolveTransition, block_size=8,
+                   duration=4 * self.DT, seed=1)
+        for _ in range(3):
+            self.run_frames(1)
+            # Like an overlay drawn over the screen after the scenes.
+            self.screen.fill((0, 255, 0))
+
+        self.run_frames(1)
+        colours = {tuple(self.screen.get_at(block.topleft))
+                   for block in self.manager.fx_object.blocks}
+        self.assertEqual(colours, {(255, 0, 0, 255), (0, 0, 255, 255)})
+
+
+if __name__ == "__main__":
+    unittest.main()
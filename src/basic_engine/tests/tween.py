@@ -0,0 +1,88 @@
+import unittest
+
+from .. import tween
+
+
+class TweenTestCase(unittest.TestCase):
+    """Tests the Tween and Tweener classes."""
+
+    def setUp(self):
+        self.tweener = tween.Tweener()
+        self.values = []
+
+    def test_time_based(self):
+        self.tweener.add(tween.Tween(1.0, self.values.append, 0, 100))
+        for _ in range(4):
+            self.tweener.update(0.25)
+
+        self.assertEqual(self.values, [25, 50, 75, 100])
+        self.assertEqual(len(self.tweener), 0)
+
+    def test_frame_rate_independent(self):
+        slow = tween.Tween(1.0, start=0, end=10)
+        fast = tween.Tween(1.0, start=0, end=10)
+        for _ in range(15):
+            slow.step(1 / 15)
+        for _ in range(120):
+            fast.step(1 / 120)
+
+        self.assertTrue(slow.finished and fast.finished)
+        self.assertEqual(slow.value, fast.value)
+
+    def test_easing_and_sequences(self):
+        self.tweener.add(tween.Tween(1.0, self.values.append, (0, 0),
+                                     (10, 20), "ease_in_quad"))
+        self.tweener.update(0.5)
+
+        self.assertEqual(self.values, [(2.5, 5.0)])
+
+    def test_chaining_and_callbacks(self):
+        done = []
+        first = self.tweener.add(tween.Tween(
+            0.5, self.values.append, 0, 1, on_complete=lambda: done.append(1)
+        ))
+        first.then(tween.Tween(
+            0.5, self.values.append, 1, 0, on_complete=lambda: done.append(2)
+        ))
+        # The time left over by the first tween goes to the second one.
+        self.tweener.update(0.75)
+
+        self.assertEqual(self.values, [1, 0.5])
+        self.assertEqual(done, [1])
+
+        self.tweener.update(0.25)
+        self.assertEqual(done, [1, 2])
+
+    def test_delay_pause_and_cancel(self):
+        running = self.tweener.add(tween.Tween(1.0, self.values.append,
+                                               delay=0.5))
+        self.tweener.update(0.25)
+        self.assertEqual(self.values, [])
+
+        running.paused = True
+        self.tweener.update(1.0)
+        self.assertEqual(self.values, [])
+
+        running.paused = False
+        self.tweener.update(0.5)
+        self.assertEqual(self.values, [0.25])
+
+        running.then(tween.Tween(1.0, self.values.append))
+        running.cancel()
+        self.tweener.update(1.0)
+        self.assertEqual(self.values, [0.25])
+        self.assertEqual(len(self.tweener), 0)
+
+    def test_attribute(self):
+        class Box:
+            x = 0
+
+        box = Box()
+        self.tweener.to(box, "x", 9, 1.0)
+        self.tweener.update(0.5)
+
+        self.assertEqual(box.x, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+import wave
+
+from pygame import mixer, surface
+
+from .. import benchmark, utils
+
+benchmark.use_dummy_drivers()
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """Tests the LRUCache class."""
+
+    def test_evicts_least_recently_used(self):
+        cache = utils.LRUCache(3)
+        for key in "abc":
+            cache.put(key, key.upper())
+        cache.get("a")
+        cache.put("d", "D")
+
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_size_budget(self):
+        cache = utils.LRUCache(300, utils.surface_nbytes)
+        cache.put("small", surface.Surface((4, 4), depth=32))
+        cache.put("large", surface.Surface((8, 8), depth=32))
+
+        self.assertEqual(cache.size, 256)
+        self.assertNotIn("small", cache)
+        self.assertIn("large", cache)
+
+        cache.put("huge", surface.Surface((16, 16), depth=32))
+
+        self.assertNotIn("huge", cache)
+        self.assertIn("large", cache)
+
+    def test_stats(self):
+        cache = utils.LRUCache(2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+
+class SoundFXTestCase(unittest.TestCase):
+    """Tests caching sound effects within a budget."""
+
+    def setUp(self):
+        # Other tests may have started the mixer with other settings
+        # already, so sizes are worked out with sound_nbytes.
+        mixer.init(22050, -16, 1)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "beep.wav")
+        with wave.open(self.path, "wb") as sound_file:
+            sound_file.setnchannels(1)
+            sound_file.setsampwidth(2)
+            sound_file.setframerate(22050)
+            sound_file.writeframes(bytes(2 * 2205))
+        utils.soundfx_cache.clear()
+
+    def tearDown(self):
+        utils.soundfx_cache.clear()
+        self.directory.cleanup()
+
+    def test_volumes_share_decoding(self):
+        loud = utils.load_soundfx(self.path)
+        quiet = utils.load_soundfx(self.path, 0.5)
+
+        self.assertIs(utils.load_soundfx(self.path), loud)
+        self.assertIs(utils.load_soundfx(self.path, 0.5), quiet)
+        self.assertAlmostEqual(quiet.get_volume(), 0.5, places=2)
+        self.assertEqual(utils.soundfx_cache.size,
+                         2 * utils.sound_nbytes(loud))
+
+    def test_budget(self):
+        size = utils.sound_nbytes(utils.load_soundfx(self.path))
+        budget = utils.soundfx_cache.max_size
+        utils.soundfx_cache.max_size = 2 * size
+        try:
+            for volume in (0.25, 0.5, 0.75):
+                utils.load_soundfx(self.path, volume)
+        finally:
+            utils.soundfx_cache.max_size = budget
+
+        # The decoded sound is used by every copy, so it's kept.
+        self.assertEqual(utils.soundfx_cache.keys(),
+                         [(self.path, 1.0), (self.path, 0.75)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,354 @@
+"""Module for drawing tile-based maps.
+
+The map is split into square chunks of tiles. Each chunk is rendered
+once, with the tiles of every layer, into a cached surface, so drawing
+the visible part of the map is a few blits of whole chunks instead of
+one blit per tile. Editing a tile only renders its chunk again, and
+the chunks not drawn for a while are evicted once their surfaces go
+over a memory budget.
+
+Maps can be loaded from the JSON format of the Tiled editor, using its
+tile layers.
+"""
+
+from __future__ import annotations
+
+import array
+import json
+import math
+
+from pygame import constants, rect as pg_rect, surface, transform
+
+from . import utils
+
+# Bits of the Tiled global tile ids used for flipping the tiles.
+TILED_FLAGS = 0xE0000000
+
+
+class Tileset:
+    """Images of the tiles of a map, cut from a single image.
+
+    Tile ids start at 1, from the top left tile of the image, row by
+    row. The id 0 means no tile.
+    """
+
+    def __init__(self, image: surface.Surface, tile_width: int,
+                 tile_height: int = None, margin: int = 0,
+                 spacing: int = 0):
+        """Initialises the Tileset object.
+
+        Args:
+
+            image: Surface object with the tiles laid out in a grid.
+
+            tile_width: Width of the tiles, in pixels.
+
+            tile_height: Height of the tiles. Defaults to tile_width.
+
+            margin: Pixels around the grid of tiles.
+
+            spacing: Pixels between two tiles.
+        """
+
+        self.image = image
+        self.tile_width = tile_width
+        self.tile_height = tile_height or tile_width
+
+        self.tiles: list[surface.Surface] = []
+        width, height = image.get_size()
+        for y in range(margin, height - self.tile_height + 1,
+                       self.tile_height + spacing):
+            for x in range(margin, width - self.tile_width + 1,
+                           self.tile_width + spacing):
+                self.tiles.append(image.subsurface(
+                    (x, y, self.tile_width, self.tile_height)
+                ))
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def __getitem__(self, tile_id: int) -> surface.Surface:
+        return self.tiles[tile_id - 1]
+
+    @property
+    def tile_size(self) -> tuple[int, int]:
+        """Get the size of the tiles, in pixels."""
+
+        return (self.tile_width, self.tile_height)
+
+
+class TileLayer:
+    """Grid of tile ids, stored in a flat array."""
+
+    def __init__(self, name: str, width: int, height: int, data=None):
+        """Initialises the TileLayer object.
+
+        Args:
+
+            name: Name of the layer.
+
+            width: Width of the grid, in tiles.
+
+            height: Height of the grid, in tiles.
+
+            data: Iterable of width * height tile ids, row by row.
+                  Defaults to no tiles.
+        """
+
+        self.name = name
+        self.width = width
+        self.height = height
+        if data is None:
+            self.data = array.array("I", bytes(4 * width * height))
+        else:
+            self.data = array.array("I", data)
+        if len(self.data) != width * height:
+            raise ValueError(f"Layer {name} needs {width * height} tiles, "
+                             f"not {len(self.data)}")
+
+    def _index(self, pos) -> int:
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"Tile {x, y} is out of layer {self.name}, "
+                             f"of {self.width}x{self.height} tiles")
+        return y * self.width + x
+
+    def __getitem__(self, pos) -> int:
+        return self.data[self._index(pos)]
+
+    def __setitem__(self, pos, tile_id: int):
+        self.data[self._index(pos)] = tile_id
+
+
+class TileMap:
+    """Tile layers drawn over each other, cached by chunks."""
+
+    def __init__(self, tileset: Tileset, layers: list[TileLayer],
+                 chunk_size: int = 16, max_bytes: int = 32 * 2 ** 20):
+        """Initialises the TileMap object.
+
+        Args:
+
+            tileset: Tileset object with the images of the tile ids.
+
+            layers: TileLayer objects of the same size, from the bottom
+                    up.
+
+            chunk_size: Width and height of the chunks, in tiles.
+
+            max_bytes: Budget for the memory used by the cached
+                       chunks. It should fit at least the chunks
+                       covering the screen, or they are rendered again
+                       every frame.
+
+        Raises:
+            ValueError: The layers are of different sizes.
+        """
+
+        if len({(layer.width, layer.height) for layer in layers}) > 1:
+            raise ValueError("Every layer must be of the same size")
+
+        self.tileset = tileset
+        self.layers = layers
+        self.chunk_size = chunk_size
+        self.width = layers[0].width if layers else 0
+        self.height = layers[0].height if layers else 0
+
+        # (chunk x, chunk y) -> rendered chunk, at the current zoom.
+        self.chunks = utils.LRUCache(max_bytes, utils.surface_nbytes)
+        self._zoom = 1.0
+
+    @classmethod
+    def load(cls, path: str, tileset: Tileset, **kwargs) -> "TileMap":
+        """Loads the tile layers of a map saved by the Tiled editor as
+        JSON, with its tile layers not compressed.
+
+        Args:
+
+            path: Location of the map file.
+
+            tileset: Tileset object with the tiles of the map's first
+                     tileset.
+
+            kwargs: Other TileMap arguments, like chunk_size.
+
+        Returns:
+            The loaded TileMap object.
+        """
+
+        with open(path, encoding="utf-8") as map_file:
+            tiled_map = json.load(map_file)
+
+        first_id = tiled_map["tilesets"][0]["firstgid"] \
+            if tiled_map.get("tilesets") else 1
+        layers = []
+        for layer in tiled_map["layers"]:
+            if layer.get("type", "tilelayer") != "tilelayer":
+                continue
+            data = [0 if gid == 0 else (gid & ~TILED_FLAGS) - first_id + 1
+                    for gid in layer["data"]]
+            layers.append(TileLayer(layer["name"], layer["width"],
+                                    layer["height"], data))
+
+        return cls(tileset, layers, **kwargs)
+
+    @property
+    def pixel_size(self) -> tuple[int, int]:
+        """Get the size of the map, in world pixels."""
+
+        return (self.width * self.tileset.tile_width,
+                self.height * self.tileset.tile_height)
+
+    @property
+    def chunk_pixel_size(self) -> tuple[int, int]:
+        """Get the size of a chunk, in world pixels."""
+
+        return (self.chunk_size * self.tileset.tile_width,
+                self.chunk_size * self.tileset.tile_height)
+
+    def layer(self, name: str) -> TileLayer:
+        """Gets a layer by its name.
+
+        Raises:
+            KeyError: There's no layer with that name.
+        """
+
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        raise KeyError(name)
+
+    def get_tile(self, layer: str, x: int, y: int) -> int:
+        """Gets the tile id at a tile position of a layer.
+
+        Raises:
+            ValueError: The position is out of the map.
+        """
+
+        return self.layer(layer)[x, y]
+
+    def set_tile(self, layer: str, x: int, y: int, tile_id: int) -> None:
+        """Changes the tile at a tile position of a layer. Its chunk is
+        rendered again the next time it's drawn.
+
+        Raises:
+            ValueError: The position is out of the map.
+        """
+
+        self.layer(layer)[x, y] = tile_id
+        self.chunks.pop((x // self.chunk_size, y // self.chunk_size))
+
+    def tile_at(self, pos) -> tuple[int, int]:
+        """Gets the tile position at a world position."""
+
+        return (int(pos[0] // self.tileset.tile_width),
+                int(pos[1] // self.tileset.tile_height))
+
+    def render_chunk(self, chunk_x: int, chunk_y: int) -> surface.Surface:
+        """Renders the tiles of every layer in a chunk.
+
+        Args:
+
+            chunk_x: Column of the chunk.
+
+            chunk_y: Row of the chunk.
+
+        Returns:
+            A new Surface object with per-pixel alpha, as places with
+            no tile are transparent.
+        """
+
+        tile_width, tile_height = self.tileset.tile_size
+        first_x = chunk_x * self.chunk_size
+        first_y = chunk_y * self.chunk_size
+        columns = min(self.chunk_size, self.width - first_x)
+        rows = min(self.chunk_size, self.height - first_y)
+
+        chunk = surface.Surface((columns * tile_width, rows * tile_height),
+                                constants.SRCALPHA)
+        tiles = self.tileset.tiles
+        for layer in self.layers:
+            data = layer.data
+            blits = []
+            for row in range(rows):
+                start = (first_y + row) * layer.width + first_x
+                y = row * tile_height
+                for column, tile_id in enumerate(data[start:start + columns]):
+                    if tile_id:
+                        blits.append((tiles[tile_id - 1],
+                                      (column * tile_width, y)))
+            chunk.blits(blits, doreturn=False)
+
+        return chunk
+
+    def _chunk(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.render_chunk(chunk_x, chunk_y)
+            if self._zoom != 1:
+                width, height = chunk.get_size()
+                chunk = transform.scale(chunk, (
+                    math.ceil(width * self._zoom),
+                    math.ceil(height * self._zoom),
+                ))
+            self.chunks.put(key, chunk)
+        return chunk
+
+    def draw(self, screen: surface.Surface, camera_=None
+             ) -> list[pg_rect.Rect]:
+        """Draws the chunks of the map in the view.
+
+        Args:
+
+            screen: Surface object where the map is drawn.
+
+            camera_: camera.Camera object viewing the map, whose world
+                     coordinates are the map's pixels. None draws the
+                     map's top left corner over the whole screen.
+
+        Returns:
+            A list of Rect objects representing the areas of the screen
+            touched.
+        """
+
+        if camera_ is None:
+            view_rect = screen.get_rect()
+            viewport = view_rect
+            x = y = 0
+            zoom = 1.0
+        else:
+            view_rect = camera_.view_rect
+            viewport = camera_.viewport
+            x, y = camera_.x, camera_.y
+            zoom = camera_.zoom
+
+        if zoom != self._zoom:
+            # The chunks are cached already scaled.
+            self.chunks.clear()
+            self._zoom = zoom
+
+        chunk_width, chunk_height = self.chunk_pixel_size
+        view_rect = view_rect.clip((0, 0) + self.pixel_size)
+        if not view_rect:
+            return []
+        first_x = view_rect.left // chunk_width
+        first_y = view_rect.top // chunk_height
+        last_x = (view_rect.right - 1) // chunk_width
+        last_y = (view_rect.bottom - 1) // chunk_height
+
+        blits = []
+        for chunk_y in range(first_y, last_y + 1):
+            screen_y = round((chunk_y * chunk_height - y) * zoom + viewport.y)
+            for chunk_x in range(first_x, last_x + 1):
+                blits.append((self._chunk(chunk_x, chunk_y), (
+                    round((chunk_x * chunk_width - x) * zoom + viewport.x),
+                    screen_y,
+                )))
+
+        clip = screen.get_clip()
+        screen.set_clip(viewport.clip(clip))
+        try:
+            return screen.blits(blits)
+        finally:
+            screen.set_clip(clip)
@@ -1,6 +1,12 @@
 """Module for in-game transitions."""
 
-from pygame import surface
+import math
+import random
+import time
+
+from pygame import rect as pg_rect, surface
+
+from . import tween
 
 
 class Transition:
@@ -10,11 +16,48 @@ class Transition:
     one that actually changes from a scene to another but animated.
     """
 
-    def __init__(self, screen: surface.Surface, scene_manager, next_scene):
+    # Whether the current scene keeps being drawn under the transition.
+    LIVE = True
+
+    def __init__(self, screen: surface.Surface, scene_manager, next_scene,
+                 preload_timeout: float = 5.0):
+        """Initialises the Transition object.
+
+        Args:
+
+            screen: Surface object where the transition is drawn.
+
+            scene_manager: SceneManager object running the transition.
+
+            next_scene: Id of the scene the transition goes to.
+
+            preload_timeout: Maximum amount of seconds the transition
+                             holds, with the screen covered, waiting
+                             for the next scene to be preloaded. Past
+                             it, the frame freezes until it's ready.
+        """
+
         self.screen = screen
         self.screen_rect = screen.get_rect()
         self.scene_manager = scene_manager
         self.next_view = next_scene
+        self.preload_timeout = preload_timeout
+        self._hold_start = None
+
+    def next_scene_ready(self) -> bool:
+        """Gets whether the transition can move on to the next scene.
+
+        It's False while the next scene is being preloaded, until the
+        transition has held for preload_timeout seconds.
+        """
+
+        if self.scene_manager.is_ready(self.next_view):
+            return True
+
+        now = time.perf_counter()
+        if self._hold_start is None:
+            self._hold_start = now
+        return now - self._hold_start >= self.preload_timeout
 
     def animate(self) -> None:
         """Simulates a transition."""
@@ -28,46 +71,261 @@ class Transition:
         self.scene_manager.fx_object = None
 
 
-class FadeTransition(Transition):
+class SnapshotTransition(Transition):
+    """Base class of transitions compositing snapshots of the scenes.
+
+    The outgoing scene is drawn once when the transition starts and the
+    incoming one once when the scene changes, so scenes are neither
+    updated nor drawn while it animates, and each frame costs the same
+    however complex the scenes are. Subclasses implement composite.
+    """
+
+    LIVE = False
+
+    # Progress at which the scene changes. The incoming snapshot isn't
+    # available before it.
+    SWITCH_AT = 0.0
+
+    def __init__(self, screen, scene_manager, next_scene, duration=0.5,
+                 easing=tween.linear, preload_timeout=5.0):
+        """Initialises the SnapshotTransition object.
+
+        Args:
+
+            screen: Surface object where the transition is drawn.
+
+            scene_manager: SceneManager object running the transition.
+
+            next_scene: Id of the scene the transition goes to.
+
+            duration: Seconds the animation lasts.
+
+            easing: Easing function of the animation progress, from the
+                    tween module.
+
+            preload_timeout: Maximum amount of seconds the transition
+                             holds waiting for the next scene to be
+                             preloaded.
+        """
+
+        super().__init__(screen, scene_manager, next_scene, preload_timeout)
+
+        self.duration = duration
+        self.easing = easing
+        self.outgoing: surface.Surface = None
+        self.incoming: surface.Surface = None
+        self.progress = 0.0
+        self._tween: tween.Tween = None
+
+    def _set_progress(self, progress):
+        self.progress = progress
+
+    def animate(self) -> None:
+        """Draws the next frame of the transition. The progress is
+        advanced by the module tweener, as time passes.
+        """
+
+        if self.outgoing is None:
+            self.outgoing = self.scene_manager.snapshot()
+            self._tween = tween.tweener.add(tween.Tween(
+                self.duration, self._set_progress, easing=self.easing
+            ))
+
+        if self.incoming is None and self.progress >= self.SWITCH_AT:
+            if not self.next_scene_ready():
+                self._tween.paused = True
+                self.composite(self.SWITCH_AT)
+                return
+            self._tween.paused = False
+            self.scene_manager.change_scene(self.next_view)
+            self.incoming = self.scene_manager.snapshot()
+
+        self.composite(self.progress)
+        if self._tween.finished:
+            self.clean()
+
+    def composite(self, progress: float) -> None:
+        """Draws the snapshots onto the screen.
+
+        Args:
+
+            progress: How far the animation is, from 0 to 1. The
+                      incoming snapshot is None up to SWITCH_AT.
+        """
+
+
+class FadeTransition(SnapshotTransition):
     """Fade-in and Fade-out Transition."""
 
+    SWITCH_AT = 0.5
+
     def __init__(self, screen, scene_manager, next_view, fade_colour,
-                 speed_factor=2):
-        super().__init__(screen, scene_manager, next_view)
+                 speed_factor=2, preload_timeout=5.0, duration=None,
+                 easing=tween.linear):
+        """Initialises the FadeTransition object.
+
+        Args:
+
+            fade_colour: RGB colour code the screen fades to.
+
+            speed_factor: Alpha added to the colour each frame at 60
+                          FPS. Only used when no duration is given.
+
+            duration: Seconds the whole fade lasts.
+        """
+
+        if duration is None:
+            duration = 2 * math.ceil(256 / speed_factor) / 60
+        super().__init__(screen, scene_manager, next_view, duration, easing,
+                         preload_timeout)
 
-        # Fade elements
         self.fade_bg = surface.Surface(screen.get_size())
-        self.fade_bg.set_alpha(0)
         self.fade_bg.fill(fade_colour)
-        self.rect = self.fade_bg.get_rect()
-        self.rect.center = self.screen_rect.center
 
-        # Fade params
-        self.on_fade = True
-        self.alpha = 0
-        self.factor = speed_factor
-        self.backwards = False
-        self.iteration = 0
+    def composite(self, progress: float) -> None:
+        if progress <= self.SWITCH_AT:
+            self.screen.blit(self.outgoing, (0, 0))
+            cover = progress / self.SWITCH_AT
+        else:
+            self.screen.blit(self.incoming, (0, 0))
+            cover = (1 - progress) / (1 - self.SWITCH_AT)
+
+        self.fade_bg.set_alpha(round(255 * cover))
+        self.screen.blit(self.fade_bg, (0, 0))
+
+
+class CrossFadeTransition(SnapshotTransition):
+    """Blends the outgoing scene into the incoming one."""
+
+    def composite(self, progress: float) -> None:
+        self.screen.blit(self.outgoing, (0, 0))
+        if self.incoming is not None:
+            self.incoming.set_alpha(round(255 * progress))
+            self.screen.blit(self.incoming, (0, 0))
 
-    def animate(self) -> None:
-        """It fades the screen to the next view."""
 
-        if self.on_fade:
-            if self.iteration == 1:
-                # The scene is covered. Change the scene
-                self.scene_manager.change_scene(self.next_view)
+# Unit vector of each direction a scene can move towards.
+DIRECTIONS = {"left": (-1, 0), "right": (1, 0), "up": (0, -1),
+              "down": (0, 1)}
 
-            self.alpha += self.factor
-            if (self.alpha > 255 and not self.backwards) \
-                    or (self.alpha < 0 and self.backwards):
-                self.backwards = not self.backwards
-                self.factor *= -1
-                self.iteration += 1
 
-            self.fade_bg.set_alpha(self.alpha)
-            self.screen.blit(self.fade_bg, self.rect)
+class SlideTransition(SnapshotTransition):
+    """Slides the incoming scene in from a side of the screen."""
 
-            if self.iteration == 2:
-                self.on_fade = False
+    def __init__(self, screen, scene_manager, next_scene, direction="left",
+                 push=True, duration=0.5, easing=tween.linear,
+                 preload_timeout=5.0):
+        """Initialises the SlideTransition object.
+
+        Args:
+
+            direction: "left", "right", "up" or "down", where the
+                       incoming scene moves towards.
+
+            push: Whether the outgoing scene is pushed away by the
+                  incoming one, instead of being covered by it.
+        """
+
+        super().__init__(screen, scene_manager, next_scene, duration, easing,
+                         preload_timeout)
+
+        self.direction = DIRECTIONS[direction]
+        self.push = push
+
+    def composite(self, progress: float) -> None:
+        width, height = self.screen_rect.size
+        dx, dy = self.direction
+        shift_x = round(dx * width * progress)
+        shift_y = round(dy * height * progress)
+
+        if self.push:
+            self.screen.blit(self.outgoing, (shift_x, shift_y))
         else:
-            self.clean()
+            self.screen.blit(self.outgoing, (0, 0))
+        if self.incoming is not None:
+            self.screen.blit(self.incoming, (shift_x - dx * width,
+                                             shift_y - dy * height))
+
+
+class WipeTransition(SnapshotTransition):
+    """Uncovers the incoming scene with an edge sweeping the screen."""
+
+    def __init__(self, screen, scene_manager, next_scene, direction="left",
+                 duration=0.5, easing=tween.linear, preload_timeout=5.0):
+        """Initialises the WipeTransition object.
+
+        Args:
+
+            direction: "left", "right", "up" or "down", where the edge
+                       moves towards.
+        """
+
+        super().__init__(screen, scene_manager, next_scene, duration, easing,
+                         preload_timeout)
+
+        self.direction = DIRECTIONS[direction]
+
+    def composite(self, progress: float) -> None:
+        self.screen.blit(self.outgoing, (0, 0))
+        if self.incoming is None:
+            return
+
+        area = pg_rect.Rect(self.screen_rect)
+        dx, dy = self.direction
+        if dx:
+            area.width = round(area.width * progress)
+            if dx < 0:
+                area.right = self.screen_rect.right
+        else:
+            area.height = round(area.height * progress)
+            if dy < 0:
+                area.bottom = self.screen_rect.bottom
+        self.screen.blit(self.incoming, area, area)
+
+
+class DissolveTransition(SnapshotTransition):
+    """Uncovers the incoming scene one block at a time, in a random
+    order.
+    """
+
+    def __init__(self, screen, scene_manager, next_scene, block_size=16,
+                 duration=0.5, easing=tween.linear, preload_timeout=5.0,
+                 seed=None):
+        """Initialises the DissolveTransition object.
+
+        Args:
+
+            block_size: Width and height of the blocks, in pixels.
+
+            seed: Seed of the order the blocks are uncovered in.
+        """
+
+        super().__init__(screen, scene_manager, next_scene, duration, easing,
+                         preload_timeout)
+
+        width, height = self.screen_rect.size
+        self.blocks = [
+            pg_rect.Rect(x, y, block_size, block_size)
+            for x in range(0, width, block_size)
+            for y in range(0, height, block_size)
+        ]
+        random.Random(seed).shuffle(self.blocks)
+        self._uncovered = 0
+        self._frame: surface.Surface = None
+
+    def composite(self, progress: float) -> None:
+        # The blocks are uncovered on a copy of the outgoing snapshot,
+        # which is blitted whole every frame, so anything drawn over the
+        # screen meanwhile, like overlays, is painted over again.
+        if self._frame is None:
+            self._frame = self.outgoing.copy()
+
+        if self.incoming is not None:
+            count = round(len(self.blocks) * progress)
+            self._frame.blits([
+                (self.incoming, block, block)
+                for block in self.blocks[self._uncovered:count]
+            ], False)
+            self._uncovered = count
+
+        self.screen.blit(self._frame, (0, 0))
@@ -0,0 +1,292 @@
+"""Module for animating values over time.
+
+Tweens are driven by the time elapsed between frames instead of the
+amount of frames, so animations last the same at any frame rate. The
+module-level tweener is updated once per frame by Game.
+"""
+
+from __future__ import annotations
+
+import math
+
+# Easing functions map the elapsed fraction of a tween, from 0 to 1, to
+# the fraction of the way from its start value to its end one.
+
+
+def linear(t: float) -> float:
+    """Keeps a constant speed."""
+
+    return t
+
+
+def ease_in_quad(t: float) -> float:
+    """Starts slow and speeds up quadratically."""
+
+    return t * t
+
+
+def ease_out_quad(t: float) -> float:
+    """Starts fast and slows down quadratically."""
+
+    return t * (2 - t)
+
+
+def ease_in_out_quad(t: float) -> float:
+    """Speeds up quadratically until halfway, then slows down."""
+
+    if t < 0.5:
+        return 2 * t * t
+    return 1 - 2 * (1 - t) ** 2
+
+
+def ease_in_cubic(t: float) -> float:
+    """Starts slow and speeds up cubically."""
+
+    return t ** 3
+
+
+def ease_out_cubic(t: float) -> float:
+    """Starts fast and slows down cubically."""
+
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_cubic(t: float) -> float:
+    """Speeds up cubically until halfway, then slows down."""
+
+    if t < 0.5:
+        return 4 * t ** 3
+    return 1 - 4 * (1 - t) ** 3
+
+
+def ease_in_out_sine(t: float) -> float:
+    """Speeds up and slows down following a cosine curve."""
+
+    return (1 - math.cos(math.pi * t)) / 2
+
+
+def ease_out_back(t: float) -> float:
+    """Slows down past the end value and then settles back on it."""
+
+    overshoot = 1.70158
+    return 1 + (overshoot + 1) * (t - 1) ** 3 + overshoot * (t - 1) ** 2
+
+
+EASINGS = {
+    "linear": linear,
+    "ease_in_quad": ease_in_quad,
+    "ease_out_quad": ease_out_quad,
+    "ease_in_out_quad": ease_in_out_quad,
+    "ease_in_cubic": ease_in_cubic,
+    "ease_out_cubic": ease_out_cubic,
+    "ease_in_out_cubic": ease_in_out_cubic,
+    "ease_in_out_sine": ease_in_out_sine,
+    "ease_out_back": ease_out_back,
+}
+
+
+def lerp(start, end, t: float):
+    """Interpolates linearly between two numbers or two sequences of
+    numbers, like colours or positions.
+    """
+
+    if isinstance(start, (int, float)):
+        return start + (end - start) * t
+    return tuple(a + (b - a) * t for a, b in zip(start, end))
+
+
+class Tween:
+    """Animation of a value from a start to an end over some time."""
+
+    def __init__(self, duration: float, on_update=None, start=0.0, end=1.0,
+                 easing=linear, on_complete=None, delay: float = 0.0):
+        """Initialises the Tween object.
+
+        Args:
+
+            duration: Seconds the animation lasts.
+
+            on_update: Callable taking the current value, called every
+                       time the tween advances.
+
+            start: Starting value. A number or a sequence of numbers.
+
+            end: Final value, of the same kind as start.
+
+            easing: Callable mapping the elapsed fraction of the
+                    duration, from 0 to 1, to the fraction of the way
+                    from start to end. The functions of this module or
+                    a name in EASINGS.
+
+            on_complete: Callable with no arguments called when the
+                         animation ends.
+
+            delay: Seconds waited before the animation begins.
+        """
+
+        self.duration = duration
+        self.on_update = on_update
+        self.start = start
+        self.end = end
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.on_complete = on_complete
+        self.delay = delay
+
+        self.value = start
+        self.elapsed = 0.0
+        self.paused = False
+        self.finished = False
+        self.cancelled = False
+        self.chained: list[Tween] = []
+
+    @property
+    def progress(self) -> float:
+        """Get the elapsed fraction of the duration, from 0 to 1."""
+
+        if self.finished:
+            return 1.0
+        if self.duration <= 0:
+            return 0.0
+        return min(1.0, max(0.0, self.elapsed - self.delay) / self.duration)
+
+    def then(self, tween: "Tween") -> "Tween":
+        """Chains a tween to be started when this one ends.
+
+        Returns:
+            The given tween, so further tweens can be chained to it.
+        """
+
+        self.chained.append(tween)
+        return tween
+
+    def cancel(self) -> None:
+        """Stops the animation without calling on_complete nor
+        starting the chained tweens.
+        """
+
+        self.finished = True
+        self.cancelled = True
+
+    def step(self, dt: float) -> float:
+        """Advances the animation.
+
+        Args:
+
+            dt: Seconds passed since the previous step.
+
+        Returns:
+            The seconds left over after the animation ended, which the
+            chained tweens start with.
+        """
+
+        if self.paused or self.finished:
+            return 0.0
+
+        self.elapsed += dt
+        active = self.elapsed - self.delay
+        if active < 0:
+            return 0.0
+
+        # Tolerates the rounding errors of adding up frame times.
+        if active >= self.duration - 1e-9:
+            t = 1.0
+        else:
+            t = active / self.duration
+        self.value = lerp(self.start, self.end, self.easing(t))
+        if self.on_update is not None:
+            self.on_update(self.value)
+
+        if t < 1.0:
+            return 0.0
+
+        self.finished = True
+        if self.on_complete is not None:
+            self.on_complete()
+        return max(0.0, active - self.duration)
+
+
+class Tweener:
+    """Collection of running tweens, advanced all at once."""
+
+    def __init__(self):
+        self.tweens: list[Tween] = []
+
+    def __len__(self) -> int:
+        return len(self.tweens)
+
+    def add(self, tween: Tween) -> Tween:
+        """Starts running a tween.
+
+        Returns:
+            The given tween.
+        """
+
+        self.tweens.append(tween)
+        return tween
+
+    def to(self, obj, attribute: str, end, duration: float,
+           **kwargs) -> Tween:
+        """Starts animating an attribute of an object from its current
+        value.
+
+        Args:
+
+            obj: Object owning the attribute, e.g. a Rect object.
+
+            attribute: Name of the attribute.
+
+            end: Final value of the attribute.
+
+            duration: Seconds the animation lasts.
+
+            kwargs: Other Tween arguments, like easing.
+
+        Returns:
+            The running Tween object.
+        """
+
+        start = getattr(obj, attribute)
+        as_int = isinstance(start, int)
+
+        def set_attribute(value):
+            setattr(obj, attribute, round(value) if as_int else value)
+
+        return self.add(Tween(duration, set_attribute, start, end, **kwargs))
+
+    def update(self, dt: float) -> None:
+        """Advances every running tween, starting the chained ones of
+        those that ended.
+
+        Args:
+
+            dt: Seconds passed since the previous update.
+        """
+
+        if not self.tweens:
+            return
+
+        tweens = self.tweens
+        # Tweens added by callbacks are kept in the new list.
+        self.tweens = []
+        running = []
+        for tween in tweens:
+            self._advance(tween, dt, running)
+
+        self.tweens = running + self.tweens
+
+    def _advance(self, tween, dt, running):
+        leftover = tween.step(dt)
+        if not tween.finished:
+            running.append(tween)
+        elif not tween.cancelled:
+            for chained in tween.chained:
+                self._advance(chained, leftover, running)
+
+    def clear(self) -> None:
+        """Drops every running tween."""
+
+        self.tweens.clear()
+
+
+# Tweener updated by Game every frame.
+tweener = Tweener()
@@ -1,9 +1,35 @@
 """Utilities functions and classes modules."""
 
-import functools
+import collections
 import os
 
-from pygame import image, mixer, surface
+from pygame import constants, display, image, mixer, sprite, surface
+
+# Bundles searched for assets before the loose files, most recently
+# mounted first.
+_bundles = []
+
+
+def convert_surface(surface_: surface.Surface) -> surface.Surface:
+    """Converts a surface to the pixel format of the display, so that
+    blitting it doesn't need a conversion every time.
+
+    Surfaces with per-pixel alpha keep it. Nothing is done if the
+    display mode wasn't set yet.
+
+    Args:
+
+        surface_: Surface object to be converted.
+
+    Returns:
+        The converted surface, or the given one if there's no display.
+    """
+
+    if display.get_surface() is None:
+        return surface_
+    if surface_.get_flags() & constants.SRCALPHA:
+        return surface_.convert_alpha()
+    return surface_.convert()
 
 
 def load_image(path: str) -> surface.Surface:
@@ -14,21 +40,311 @@ def load_image(path: str) -> surface.Surface:
         path: Image location. It can be absolute or relative.
 
     Returns:
-        The image built upon a pygame.surface.Surface object.
+        The image built upon a pygame.surface.Surface object, converted
+        to the display pixel format when possible.
     """
 
-    return image.load(os.path.join(path))
+    for bundle in _bundles:
+        surface_ = bundle.get_image(path)
+        if surface_ is not None:
+            return convert_surface(surface_)
+
+    return convert_surface(image.load(os.path.join(path)))
+
+
+def _decode_soundfx(path: str) -> mixer.Sound:
+    """Decodes a sound file, from the mounted bundles if it's in any."""
+
+    for bundle in _bundles:
+        sound_fx = bundle.get_sound(path)
+        if sound_fx is not None:
+            return sound_fx
+
+    return mixer.Sound(os.path.join(path))
 
 
-@functools.cache
 def load_soundfx(path: str, volume: float = 1.0) -> mixer.Sound:
-    """Loads a sound effect.
+    """Loads a sound effect, kept in soundfx_cache. A sound file is
+    decoded once, and its samples are only copied for the volumes
+    other than 1.
 
     Args:
 
         path: Sound effect location. It can be absolute or relative.
+
+        volume: Volume of the sound, from 0 to 1.
     """
 
-    sound_fx = mixer.Sound(os.path.join(path))
-    sound_fx.set_volume(volume)
+    key = (path, volume)
+    sound_fx = soundfx_cache.get(key)
+    if sound_fx is None:
+        if volume == 1.0:
+            sound_fx = _decode_soundfx(path)
+        else:
+            sound_fx = mixer.Sound(buffer=load_soundfx(path).get_raw())
+            sound_fx.set_volume(volume)
+        soundfx_cache.put(key, sound_fx)
+
     return sound_fx
+
+
+def mount_bundle(bundle) -> None:
+    """Makes load_image and load_soundfx take the assets packed in a
+    bundle instead of reading the loose files.
+
+    Args:
+
+        bundle: A bundle.Bundle object.
+    """
+
+    _bundles.insert(0, bundle)
+    soundfx_cache.clear()
+
+
+def unmount_bundle(bundle) -> None:
+    """Makes load_image and load_soundfx stop taking assets from a
+    bundle.
+    """
+
+    _bundles.remove(bundle)
+    soundfx_cache.clear()
+
+
+def sound_nbytes(sound: mixer.Sound) -> int:
+    """Gets the amount of bytes used by the samples of a sound."""
+
+    frequency, size, channels = mixer.get_init()
+    return round(sound.get_length() * frequency) * channels * abs(size) // 8
+
+
+def surface_nbytes(surface_: surface.Surface) -> int:
+    """Gets the amount of bytes used by the pixels of a surface."""
+
+    return surface_.get_pitch() * surface_.get_height()
+
+
+class LRUCache:
+    """Mapping that evicts the least recently used entries once the
+    total size of its values goes over a budget.
+
+    It also counts its hits and misses, so the cache effectiveness can
+    be checked.
+    """
+
+    def __init__(self, max_size: int, sizeof=None):
+        """Initialises the LRUCache object.
+
+        Args:
+
+            max_size: Budget for the total size of the cached values.
+
+            sizeof: Callable that gets the size of a value. Defaults to
+                    1 for every value, making max_size an amount of
+                    entries.
+        """
+
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 1)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def keys(self) -> list:
+        """Gets the cached keys, from the least to the most recently
+        used.
+        """
+
+        return list(self._entries)
+
+    def get(self, key, default=None):
+        """Gets a cached value, marking it as the most recently used.
+
+        Args:
+
+            key: Key of the value.
+
+            default: Value returned if the key isn't cached.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value) -> None:
+        """Caches a value, evicting the least recently used ones if
+        the budget is exceeded. Values larger than the whole budget
+        aren't cached at all.
+
+        Args:
+
+            key: Key of the value.
+
+            value: Value to be cached.
+        """
+
+        self.pop(key)
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_size:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Removes a value from the cache.
+
+        Args:
+
+            key: Key of the value.
+
+            default: Value returned if the key isn't cached.
+
+        Returns:
+            The removed value.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+
+        self.size -= entry[1]
+        return entry[0]
+
+    def clear(self) -> None:
+        """Removes every cached value. Statistics are kept."""
+
+        self._entries.clear()
+        self.size = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the ratio of lookups that found a cached value."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Gets the cache statistics."""
+
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+        }
+
+
+# Sounds loaded by load_soundfx, by (path, volume), within a budget for
+# the bytes of their samples.
+soundfx_cache = LRUCache(32 * 1024 * 1024, sound_nbytes)
+
+
+class Pool:
+    """Pool of reusable objects.
+
+    Objects are taken from the pool with acquire and given back with
+    release, instead of being created and garbage collected again and
+    again. Pooled objects must implement a reset method, which is
+    called with the acquire arguments before they're handed out.
+    """
+
+    def __init__(self, factory, capacity: int = 0):
+        """Initialises the Pool object.
+
+        Args:
+
+            factory: Callable taking no arguments that creates a new
+                     object for the pool.
+
+            capacity: Amount of objects created beforehand.
+        """
+
+        self.factory = factory
+        self.created = 0
+        self._free = []
+        for _ in range(capacity):
+            self._free.append(self._create())
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def _create(self):
+        obj = self.factory()
+        obj.pool = self
+        obj.pooled = True
+        self.created += 1
+        return obj
+
+    def acquire(self, *args, **kwargs):
+        """Takes an object from the pool, creating a new one if the
+        pool is empty.
+
+        Args:
+
+            args: Positional arguments given to the object's reset.
+
+            kwargs: Keyword arguments given to the object's reset.
+
+        Returns:
+            The reset object.
+        """
+
+        obj = self._free.pop() if self._free else self._create()
+        obj.pooled = False
+        obj.reset(*args, **kwargs)
+        return obj
+
+    def release(self, obj) -> None:
+        """Gives an object back to the pool. Releasing an object that
+        is already in the pool does nothing.
+
+        Args:
+
+            obj: Object previously acquired from this pool.
+        """
+
+        if not obj.pooled:
+            obj.pooled = True
+            self._free.append(obj)
+
+
+class PooledSprite(sprite.Sprite):
+    """Sprite that goes back to its Pool when killed."""
+
+    def __init__(self, *groups):
+        super().__init__(*groups)
+
+        self.pool: Pool = None
+        self.pooled = False
+
+    def reset(self, *args, **kwargs) -> None:
+        """Sets the sprite up again before it's reused."""
+
+    def kill(self) -> None:
+        """Removes the sprite from all groups and releases it to its
+        pool, if any.
+        """
+
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)